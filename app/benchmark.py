@@ -0,0 +1,437 @@
+import bisect
+import http.client
+import json
+import math
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .resource_sampler import ResourceSampler
+
+# Default REST port of ThetaTerminal
+DEFAULT_PORT = 25510
+DEFAULT_MIX = "/v2/system/mdds/status:1"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with ~5% relative resolution"""
+
+    MIN_SECONDS = 50e-6
+    MAX_SECONDS = 60.0
+    GROWTH = 1.05
+
+    def __init__(self):
+        count = int(math.log(self.MAX_SECONDS / self.MIN_SECONDS, self.GROWTH)) + 1
+        self.bounds = [self.MIN_SECONDS * self.GROWTH**i for i in range(count)]
+        self.counts = [0] * (count + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct):
+        """Return the upper bound of the bucket holding the given percentile"""
+        if self.total == 0:
+            return 0.0
+        target = math.ceil(self.total * pct / 100.0)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return (
+                    min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                )
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    def to_dict(self):
+        return {
+            "count": self.total,
+            "mean_ms": self.mean() * 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p90_ms": self.percentile(90) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+            "buckets": [
+                [round(self.bounds[i] * 1000, 4) if i < len(self.bounds) else None, c]
+                for i, c in enumerate(self.counts)
+                if c
+            ],
+        }
+
+
+def parse_mix(spec):
+    """Parse a request mix like "/a:3,/b:1" into [(path, weight), ...]"""
+    mix = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        path, sep, weight = item.rpartition(":")
+        if not sep or not weight.isdigit():
+            path, weight = item, "1"
+        mix.append((path, int(weight)))
+    if not mix:
+        raise ValueError("Request mix is empty")
+    return mix
+
+
+class _Worker:
+    def __init__(self, host, port, mix, deadline, seed, timeout):
+        self.host = host
+        self.port = port
+        self.paths = [path for path, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.deadline = deadline
+        self.random = random.Random(seed)
+        self.timeout = timeout
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.status_counts = {}
+        # Completions per whole second since the step started
+        self.per_second = {}
+
+    def run(self, step_start):
+        conn = None
+        while time.monotonic() < self.deadline:
+            path = self.random.choices(self.paths, self.weights)[0]
+            if conn is None:
+                conn = http.client.HTTPConnection(
+                    self.host, self.port, timeout=self.timeout
+                )
+            started = time.monotonic()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+                if response.will_close:
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                # Avoid spinning when the server is down
+                time.sleep(0.01)
+                continue
+            finished = time.monotonic()
+            self.histogram.record(finished - started)
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            second = int(finished - step_start)
+            self.per_second[second] = self.per_second.get(second, 0) + 1
+        if conn is not None:
+            conn.close()
+
+
+class LoadGenerator:
+    """Drive concurrent request mixes at the terminal's HTTP port"""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=DEFAULT_PORT,
+        mix=None,
+        timeout=10.0,
+        sampled="jvm",
+    ):
+        self.host = host
+        self.port = port
+        self.mix = mix or parse_mix(DEFAULT_MIX)
+        self.timeout = timeout
+        # Result key of the sampler's CPU/RSS: "jvm" for the terminal, or
+        # "host_process" when the sampler watches this process
+        self.sampled = sampled
+
+    def run_step(self, concurrency, duration, sampler=None):
+        """Run one load step and return its result dictionary"""
+        step_start = time.monotonic()
+        deadline = step_start + duration
+        workers = [
+            _Worker(self.host, self.port, self.mix, deadline, i, self.timeout)
+            for i in range(concurrency)
+        ]
+        threads = [
+            threading.Thread(target=w.run, args=(step_start,), daemon=True)
+            for w in workers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        step_end = time.monotonic()
+
+        histogram = LatencyHistogram()
+        errors = 0
+        status_counts = {}
+        per_second = {}
+        for worker in workers:
+            histogram.merge(worker.histogram)
+            errors += worker.errors
+            for status, count in worker.status_counts.items():
+                status_counts[status] = status_counts.get(status, 0) + count
+            for second, count in worker.per_second.items():
+                per_second[second] = per_second.get(second, 0) + count
+
+        elapsed = step_end - step_start
+        result = {
+            "concurrency": concurrency,
+            "duration_s": elapsed,
+            "requests": histogram.total,
+            "errors": errors,
+            "throughput_rps": histogram.total / elapsed if elapsed > 0 else 0.0,
+            "status_counts": {str(k): v for k, v in sorted(status_counts.items())},
+            "latency": histogram.to_dict(),
+            "timeline": [],
+        }
+
+        samples = sampler.samples_between(step_start, step_end) if sampler else []
+        for second in range(int(math.ceil(elapsed))):
+            window = [
+                s
+                for s in samples
+                if step_start + second <= s.timestamp < step_start + second + 1
+            ]
+            point = {"second": second, "requests": per_second.get(second, 0)}
+            if window:
+                point["cpu_percent"] = window[-1].cpu_percent
+                point["rss_mb"] = window[-1].rss_bytes / (1024 * 1024)
+            result["timeline"].append(point)
+
+        if samples:
+            result[self.sampled] = {
+                "cpu_percent_mean": sum(s.cpu_percent for s in samples) / len(samples),
+                "cpu_percent_max": max(s.cpu_percent for s in samples),
+                "rss_mb_max": max(s.rss_bytes for s in samples) / (1024 * 1024),
+                "rps_cpu_correlation": _correlation(
+                    [p["requests"] for p in result["timeline"] if "cpu_percent" in p],
+                    [
+                        p["cpu_percent"]
+                        for p in result["timeline"]
+                        if "cpu_percent" in p
+                    ],
+                ),
+            }
+        return result
+
+    def run(self, concurrency_levels, duration, sampler=None, log=print):
+        """Run a step for every concurrency level"""
+        results = []
+        for concurrency in concurrency_levels:
+            log(f"Running {concurrency} concurrent client(s) for {duration:.0f}s...")
+            result = self.run_step(concurrency, duration, sampler)
+            log(format_step(result))
+            results.append(result)
+        return results
+
+
+def _correlation(xs, ys):
+    """Pearson correlation, or None if it is undefined"""
+    n = len(xs)
+    if n < 3:
+        return None
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    var_y = sum((y - mean_y) ** 2 for y in ys)
+    if var_x == 0 or var_y == 0:
+        return None
+    return cov / math.sqrt(var_x * var_y)
+
+
+def format_step(result):
+    """Format one step result as a single report line"""
+    latency = result["latency"]
+    line = (
+        f"  c={result['concurrency']:<4} {result['throughput_rps']:8.1f} req/s  "
+        f"p50={latency['p50_ms']:.2f}ms p90={latency['p90_ms']:.2f}ms "
+        f"p99={latency['p99_ms']:.2f}ms max={latency['max_ms']:.2f}ms "
+        f"errors={result['errors']}"
+    )
+    for key, label in (("jvm", "jvm"), ("host_process", "host")):
+        usage = result.get(key)
+        if usage:
+            line += (
+                f"  {label} cpu={usage['cpu_percent_mean']:.0f}%"
+                f" (max {usage['cpu_percent_max']:.0f}%)"
+                f" rss={usage['rss_mb_max']:.0f}MB"
+            )
+    return line
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        delay = self.server.response_delay
+        if delay:
+            time.sleep(random.uniform(0, 2 * delay))
+        body = json.dumps(
+            {"header": {"format": None, "error_type": "null"}, "response": ["OK"]}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """Local HTTP server answering like the terminal, for CI runs"""
+
+    def __init__(self, host="127.0.0.1", port=0, response_delay=0.0):
+        self.server = ThreadingHTTPServer((host, port), _StandInHandler)
+        self.server.daemon_threads = True
+        self.server.response_delay = response_delay
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def find_terminal_pid(jar_name="ThetaTerminal.jar"):
+    """Find a running terminal JVM by scanning /proc, or with psutil where
+    there is no /proc (Windows, macOS)"""
+    if not os.path.isdir("/proc"):
+        return _find_terminal_pid_psutil(jar_name)
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read().split(b"\0")
+        except OSError:
+            continue
+        if (
+            cmdline
+            and b"java" in os.path.basename(cmdline[0])
+            and any(arg.endswith(jar_name.encode()) for arg in cmdline)
+        ):
+            return int(entry)
+    return None
+
+
+def _find_terminal_pid_psutil(jar_name):
+    try:
+        import psutil
+    except ImportError:
+        return None
+    for process in psutil.process_iter(["cmdline"]):
+        cmdline = process.info["cmdline"]  # None if access is denied
+        if (
+            cmdline
+            and "java" in os.path.basename(cmdline[0]).lower()
+            and any(arg.endswith(jar_name) for arg in cmdline)
+        ):
+            return process.pid
+    return None
+
+
+def run_benchmark_command(args):
+    """Entry point for the `benchmark` subcommand"""
+    standin = None
+    manager = None
+    sampler = None
+    port = args.port
+    sampled = "jvm"
+
+    try:
+        if args.standin:
+            standin = StandInServer(response_delay=args.standin_delay / 1000).start()
+            port = standin.port
+            print(f"Started stand-in server on 127.0.0.1:{port}")
+            # Sample our own process, which hosts the stand-in server and the
+            # load generator; reported as host_process, not as the JVM
+            sampler = ResourceSampler(os.getpid(), interval=args.sample_interval)
+            sampled = "host_process"
+        elif args.launch:
+            from .terminal_manager import TerminalManager
+
+            manager = TerminalManager()
+            manager.set_log_callback(print)
+            if not manager.start_terminal(manager.username, manager.password):
+                print("Failed to launch the terminal.")
+                return 1
+            port = manager.http_port
+            if not _wait_for_port(args.host, port, args.ready_timeout):
+                print(f"Terminal did not open port {port} in time.")
+                return 1
+            sampler = manager.resource_sampler
+        else:
+            pid = args.pid or find_terminal_pid()
+            if pid:
+                print(f"Sampling terminal JVM PID {pid}")
+                sampler = ResourceSampler(pid, interval=args.sample_interval)
+            else:
+                print("Terminal JVM not found; running without resource samples.")
+
+        if sampler and not sampler.is_running():
+            sampler.start()
+
+        generator = LoadGenerator(
+            args.host, port, parse_mix(args.mix), args.timeout, sampled
+        )
+        levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+        results = generator.run(levels, args.duration, sampler)
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(
+                    {"host": args.host, "port": port, "steps": results}, f, indent=2
+                )
+            print(f"Results written to {args.json}")
+        return 0 if all(r["requests"] > 0 for r in results) else 1
+    finally:
+        if sampler and not manager:
+            sampler.stop()
+        if manager:
+            manager.stop_terminal()
+        if standin:
+            standin.stop()
+
+
+def _wait_for_port(host, port, timeout):
+    import socket
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1.0):
+                return True
+        except OSError:
+            time.sleep(0.5)
+    return False
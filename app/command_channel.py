@@ -0,0 +1,272 @@
+import re
+import threading
+import time
+
+# asyncio and concurrent.futures are imported on first use: this module is
+# imported by terminal_manager before the GUI's first paint
+
+
+class CommandResult:
+    """Outcome of one command and the output that followed it.
+
+    status is "ok", "timeout" (no matching output in time, or the write
+    blocked), "broken_pipe" (stdin is gone, or an earlier write is still
+    blocked) or "closed" (the terminal stopped or exited first).
+    """
+
+    __slots__ = ("command", "status", "lines", "matched", "dropped", "elapsed", "error")
+
+    def __init__(
+        self,
+        command,
+        status,
+        lines=(),
+        matched=None,
+        dropped=0,
+        elapsed=0.0,
+        error=None,
+    ):
+        self.command = command
+        self.status = status
+        self.lines = list(lines)
+        self.matched = matched  # The line that matched `expect`
+        self.dropped = dropped  # Lines beyond the channel's max_lines
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.status == "ok"
+
+    def to_dict(self):
+        return {
+            "command": self.command,
+            "status": self.status,
+            "lines": self.lines,
+            "matched": self.matched,
+            "dropped": self.dropped,
+            "elapsed": self.elapsed,
+            "error": self.error,
+        }
+
+
+class _Pending:
+    __slots__ = (
+        "command",
+        "timeout",
+        "settle",
+        "expect",
+        "future",
+        "lines",
+        "dropped",
+        "matched",
+        "last",
+    )
+
+    def __init__(self, command, timeout, settle, expect):
+        from concurrent.futures import Future
+
+        self.command = command
+        self.timeout = timeout
+        self.settle = settle
+        self.expect = re.compile(expect) if expect else None
+        self.future = Future()
+        self.lines = []
+        self.dropped = 0
+        self.matched = None
+        self.last = None  # time.monotonic() of the latest output line
+
+
+class CommandChannel:
+    """Queue commands to the terminal's stdin without blocking the caller.
+
+    submit() may be called from any thread and returns a Future of a
+    CommandResult. Commands run one at a time on an asyncio loop in a
+    background thread, so output can be attributed to the command in flight:
+    the manager's reader thread passes every output line to feed(), which
+    only does work while a command waits for its response. A command ends
+    when a line matches `expect`, or without `expect` once the output has
+    been quiet for `settle` seconds; either way it gives up at `timeout`.
+    Writes go through a single writer thread with the same timeout, so a
+    full or broken pipe fails the command instead of hanging the channel. A
+    write that times out is still blocked in that thread, so it also breaks
+    the channel: later commands fail at once rather than queue behind it.
+    """
+
+    def __init__(self, stdin, max_lines=1000):
+        self.stdin = stdin
+        self.max_lines = max_lines  # Kept per command; later ones are counted
+        self._loop = None
+        self._queue = None  # asyncio.Queue, once started
+        self._writer = None
+        self._active = None
+        self._event = None  # asyncio.Event, once started
+        self._lock = threading.Lock()
+        self._wakeup_pending = False
+        self._closed = False
+        self._broken = None  # Error that broke the pipe
+        self._writing = False  # The writer thread is inside stdin.write
+
+    def submit(self, command, timeout=5.0, settle=0.5, expect=None):
+        """Queue a command (one line, without the newline)"""
+        if "\n" in command or "\r" in command:
+            raise ValueError("A command must be a single line")
+        pending = _Pending(command, timeout, settle, expect)
+        with self._lock:
+            if self._closed or self._broken:
+                pending.future.set_result(self._refused(command))
+                return pending.future
+            if self._loop is None:
+                self._start()
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, pending)
+        return pending.future
+
+    def feed(self, line):
+        """Attach an output line to the command in flight (reader thread)"""
+        pending = self._active
+        if pending is None:
+            return
+        if len(pending.lines) < self.max_lines:
+            pending.lines.append(line)
+        else:
+            pending.dropped += 1
+        if pending.expect and pending.matched is None:
+            if pending.expect.search(line):
+                pending.matched = line
+        pending.last = time.monotonic()
+        self._wake()
+
+    def write_pending(self):
+        """Whether a write to stdin has started and not finished"""
+        return self._writing
+
+    def close(self):
+        """Fail queued and in-flight commands with "closed" and stop"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        self._wake()
+
+    def _start(self):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._loop = asyncio.new_event_loop()
+        self._queue = asyncio.Queue()
+        self._event = asyncio.Event()
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="command-writer")
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        import asyncio
+
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._process())
+        finally:
+            self._loop.close()
+            self._writer.shutdown(wait=False)
+
+    async def _process(self):
+        while True:
+            pending = await self._queue.get()
+            if pending is None:
+                return
+            if self._closed or self._broken:
+                result = self._refused(pending.command)
+            else:
+                result = await self._execute(pending)
+            pending.future.set_result(result)
+
+    def _refused(self, command):
+        if self._broken:
+            return CommandResult(command, "broken_pipe", error=self._broken)
+        return CommandResult(command, "closed")
+
+    def _write(self, command):
+        self._writing = True
+        try:
+            self.stdin.write(command + "\n")
+            self.stdin.flush()
+        finally:
+            self._writing = False
+
+    async def _execute(self, pending):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        deadline = started + pending.timeout
+
+        def result(status, error=None):
+            self._active = None
+            return CommandResult(
+                pending.command,
+                status,
+                pending.lines,
+                pending.matched,
+                pending.dropped,
+                time.monotonic() - started,
+                error,
+            )
+
+        # Collect from before the write so a fast response isn't missed
+        self._active = pending
+        try:
+            await asyncio.wait_for(
+                loop.run_in_executor(self._writer, self._write, pending.command),
+                pending.timeout,
+            )
+        except TimeoutError:
+            # The writer thread is still blocked; nothing else can be sent
+            self._broken = "stdin write did not complete"
+            return result("timeout", self._broken)
+        except (OSError, ValueError) as e:
+            # ValueError: the pipe was closed on our side
+            self._broken = str(e) or type(e).__name__
+            return result("broken_pipe", self._broken)
+
+        sent = time.monotonic()
+        while True:
+            if pending.expect:
+                if pending.matched is not None:
+                    return result("ok")
+                wake_at = deadline
+            else:
+                quiet_at = (pending.last or sent) + pending.settle
+                if time.monotonic() >= quiet_at:
+                    return result("ok")
+                wake_at = min(quiet_at, deadline)
+            if self._closed:
+                return result("closed")
+            now = time.monotonic()
+            if now >= deadline:
+                return result("timeout", "no matching output")
+            remaining = wake_at - now
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(self._event.wait(), remaining)
+                except TimeoutError:
+                    pass
+            self._event.clear()
+
+    def _wake(self):
+        # At most one call_soon_threadsafe per loop iteration, however many
+        # lines arrive in between
+        with self._lock:
+            if self._loop is None or self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        try:
+            self._loop.call_soon_threadsafe(self._on_wake)
+        except RuntimeError:
+            pass  # Loop closed
+
+    def _on_wake(self):
+        with self._lock:
+            self._wakeup_pending = False
+        self._event.set()
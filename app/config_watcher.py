@@ -0,0 +1,231 @@
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _file_signature(path):
+    """(mtime_ns, size, inode) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class _Inotify:
+    """Minimal ctypes binding to Linux inotify"""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        self._ctypes = ctypes
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, directory, mask):
+        wd = self._add_watch(self.fd, os.fsencode(directory), mask)
+        if wd < 0:
+            raise OSError(
+                self._ctypes.get_errno(), f"inotify_add_watch failed: {directory}"
+            )
+        return wd
+
+    def read_events(self):
+        """Yield (wd, mask, name) for all queued events"""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            yield wd, mask, os.fsdecode(name)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ConfigWatcher:
+    """Watch config files and call back once per debounced change.
+
+    Uses inotify on Linux and falls back to cheap stat polling elsewhere (or if
+    inotify is unavailable). Callbacks run on the watcher thread.
+    """
+
+    def __init__(self, debounce=0.5, poll_interval=1.0, use_inotify=True):
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+        self.backend = None
+        self.callbacks = {}  # absolute path -> callback(path)
+        self.signatures = {}  # absolute path -> last reported file signature
+        self.observed = {}  # absolute path -> last polled file signature
+        # absolute path -> (first_seen, last_seen, first write's mtime_ns)
+        self.pending = {}
+        self.detection_latencies = deque(maxlen=100)  # seconds
+        self.changes = 0
+        self.wakeups = 0
+        self.error_callback = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._cpu_seconds = 0.0
+        self._started_at = None
+
+    def watch(self, path, callback):
+        """Register a file; must be called before start()"""
+        path = os.path.abspath(path)
+        self.callbacks[path] = callback
+        self.signatures[path] = self.observed[path] = _file_signature(path)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.poll_interval + 1.0)
+
+    def stats(self):
+        """Detection latency and the CPU cost of the watcher thread so far"""
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        latencies = list(self.detection_latencies)
+        return {
+            "backend": self.backend,
+            "changes": self.changes,
+            "wakeups": self.wakeups,
+            "detection_latency_ms_last": latencies[-1] * 1000 if latencies else None,
+            "detection_latency_ms_mean": (
+                sum(latencies) / len(latencies) * 1000 if latencies else None
+            ),
+            "cpu_seconds": self._cpu_seconds,
+            "cpu_percent": self._cpu_seconds / uptime * 100 if uptime else 0.0,
+        }
+
+    def _run(self):
+        inotify = None
+        unwatched = list(self.callbacks)  # Paths whose directory has no watch
+        if self.use_inotify:
+            try:
+                inotify = _Inotify()
+                watches = {}
+                for directory in {os.path.dirname(p) for p in self.callbacks}:
+                    if os.path.isdir(directory):
+                        watches[inotify.add_watch(directory, WATCH_MASK)] = directory
+                unwatched = [
+                    p
+                    for p in self.callbacks
+                    if os.path.dirname(p) not in watches.values()
+                ]
+                self.backend = "inotify"
+            except (OSError, AttributeError, TypeError):
+                if inotify:
+                    inotify.close()
+                inotify = None
+        if inotify is None:
+            self.backend = "polling"
+
+        try:
+            while not self._stop_event.is_set():
+                if inotify:
+                    # Only wake up early for events or to flush a debounce
+                    timeout = self.debounce if self.pending else self.poll_interval
+                    ready, _, _ = select.select([inotify.fd], [], [], timeout)
+                    self.wakeups += 1
+                    if ready:
+                        for wd, _mask, name in inotify.read_events():
+                            directory = watches.get(wd)
+                            if directory:
+                                self._mark(os.path.join(directory, name))
+                    elif unwatched:
+                        # Directory did not exist at start (e.g. before first run)
+                        self._poll(unwatched)
+                else:
+                    interval = (
+                        min(self.debounce, self.poll_interval)
+                        if self.pending
+                        else self.poll_interval
+                    )
+                    if self._stop_event.wait(interval):
+                        break
+                    self.wakeups += 1
+                    self._poll(self.callbacks)
+                self._flush()
+                self._cpu_seconds = time.thread_time()
+        finally:
+            if inotify:
+                inotify.close()
+
+    def _poll(self, paths):
+        for path in paths:
+            signature = _file_signature(path)
+            if signature != self.observed[path]:
+                self.observed[path] = signature
+                self._mark(path)
+
+    def _mark(self, path):
+        if path not in self.callbacks:
+            return
+        now = time.monotonic()
+        if path in self.pending:
+            first_seen, _, written = self.pending[path]
+        else:
+            # Stat at the first event of a burst, so a multi-write save is
+            # measured from its first write rather than its last
+            first_seen = now
+            signature = _file_signature(path)
+            written = signature[0] if signature else None
+        self.pending[path] = (first_seen, now, written)
+
+    def _flush(self):
+        """Fire callbacks for paths that have been quiet for the debounce time"""
+        now = time.monotonic()
+        for path, (first_seen, last_seen, written) in list(self.pending.items()):
+            if now - last_seen < self.debounce:
+                continue
+            del self.pending[path]
+            signature = _file_signature(path)
+            if signature == self.signatures[path]:
+                continue  # Touched or rewritten with identical metadata
+            self.signatures[path] = signature
+            self.changes += 1
+            if signature is not None and written is not None:
+                # Wall-clock delay between the first write and our first
+                # notice of it
+                seen_wall = time.time() - (now - first_seen)
+                self.detection_latencies.append(seen_wall - written / 1e9)
+            try:
+                self.callbacks[path](path)
+            except Exception as e:
+                if self.error_callback:
+                    self.error_callback(f"Error handling change to {path}: {e}")
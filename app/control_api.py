@@ -0,0 +1,486 @@
+import asyncio
+import json
+import os
+import re
+import secrets
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlsplit
+
+from .paths import manager_data_dir
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+    500: "Internal Server Error",
+}
+MAX_BODY = 64 * 1024
+LOOPBACK_HOSTS = {"127.0.0.1", "localhost", "[::1]"}
+
+
+class LogBuffer:
+    """Recent log lines with sequence numbers, shared with the API's loop.
+
+    Lines are appended from the managers' threads. Waiting clients are woken
+    with at most one call_soon_threadsafe per loop iteration, however many
+    lines arrive in between.
+    """
+
+    def __init__(self, capacity=10000):
+        self.entries = deque(maxlen=capacity)  # (seq, time, instance, line)
+        self.next_seq = 1
+        self._lock = threading.Lock()
+        self._loop = None
+        self._event = None
+        self._wakeup_pending = False
+
+    def bind(self, loop):
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def append(self, instance, line):
+        with self._lock:
+            self.entries.append((self.next_seq, time.time(), instance, line))
+            self.next_seq += 1
+            if self._loop is None or self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        try:
+            self._loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            pass  # Loop closed during shutdown
+
+    def _wake(self):
+        with self._lock:
+            self._wakeup_pending = False
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    def since(self, seq, instance=None, limit=1000):
+        """Entries with a sequence number >= seq, optionally for one instance"""
+        with self._lock:
+            entries = list(self.entries)
+        if entries and seq > entries[0][0]:
+            entries = entries[seq - entries[0][0] :]
+        if instance:
+            entries = [e for e in entries if e[2] == instance]
+        return entries[:limit]
+
+    async def wait(self, timeout):
+        """Wait until new lines arrive; False on timeout"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def tap(self, manager):
+        """Copy everything the manager logs into the buffer"""
+        original = manager.log_callback
+
+        def callback(line, name=manager.name):
+            self.append(name, line)
+            if original:
+                original(line)
+
+        manager.set_log_callback(callback)
+
+
+def _entry_dict(entry):
+    seq, timestamp, instance, line = entry
+    return {"seq": seq, "time": timestamp, "instance": instance, "line": line}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(query, key, default, cast=int):
+    try:
+        return cast(query.get(key, default))
+    except ValueError:
+        raise ApiError(400, f"{key} must be a number") from None
+
+
+def default_socket_path():
+    """Control socket in the manager data dir, or None where Unix sockets
+    aren't available to asyncio (Windows)"""
+    if not hasattr(socket, "AF_UNIX") or sys.platform.startswith("win"):
+        return None
+    return os.path.join(manager_data_dir(), "control.sock")
+
+
+def _loopback_host(host):
+    """True for a Host header naming a loopback address (with any port)"""
+    if host.startswith("["):
+        host = host[: host.find("]") + 1]
+    else:
+        host = host.rpartition(":")[0] if ":" in host else host
+    return host.lower() in LOOPBACK_HOSTS
+
+
+class ControlAPI:
+    """HTTP control API for scripting the manager.
+
+    Served from an asyncio loop in its own thread, on a Unix socket (only
+    this user can connect) or a loopback TCP port. Over TCP every request
+    must carry the per-session token from control_api.json in the manager
+    data dir (mode 0600) as "Authorization: Bearer <token>". Requests from
+    browsers are refused: any Origin header, a non-loopback Host (DNS
+    rebinding) or a body that isn't application/json. Slow manager
+    operations (start, stop, restart, region probes) run in the default
+    executor, so neither the loop nor the manager's threads block each other.
+    """
+
+    def __init__(self, pool, failover=None, socket_path=None, port=None):
+        if not socket_path and port is None:
+            raise ValueError("ControlAPI needs a socket_path or a port")
+        self.pool = pool
+        self.failover = failover
+        self.socket_path = socket_path
+        self.port = port
+        self.token = None if socket_path else secrets.token_hex(16)
+        self.info_path = os.path.join(manager_data_dir(), "control_api.json")
+        self.logs = LogBuffer()
+        self.log_callback = None
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self.routes = {
+            ("GET", "/status"): self._status,
+            ("POST", "/start"): self._start,
+            ("POST", "/stop"): self._stop,
+            ("POST", "/restart"): self._restart,
+            ("GET", "/regions"): self._get_regions,
+            ("POST", "/regions"): self._set_regions,
+            ("GET", "/jar"): self._get_jar,
+            ("POST", "/jar"): self._set_jar,
+            ("GET", "/logs"): self._get_logs,
+            ("POST", "/command"): self._command,
+        }
+
+    @classmethod
+    def from_config(cls, pool, config, failover=None, socket_path=None, port=None):
+        """Create from arguments or the "control_api" section of config.json.
+        {"enabled": true} alone serves on the default socket (or a random
+        loopback port where there are no Unix sockets)."""
+        section = config.get("control_api") or {}
+        socket_path = socket_path or section.get("socket")
+        port = port or section.get("port")
+        if not socket_path and not port:
+            if not section.get("enabled"):
+                return None
+            socket_path = default_socket_path()
+            port = None if socket_path else 0
+        return cls(pool, failover, socket_path=socket_path, port=port)
+
+    def _log(self, message):
+        if self.log_callback:
+            self.log_callback(f"[api] {message}")
+
+    @property
+    def address(self):
+        if self.socket_path:
+            return self.socket_path
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        """Start serving; raises OSError if the socket or port is unavailable"""
+        for manager in self.pool.instances.values():
+            self.logs.tap(manager)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+        if self.token:
+            self._write_info()
+        self._log(f"Control API listening on {self.address}")
+        return self
+
+    def _write_info(self):
+        """Publish the port and token; only this user may read them"""
+        info = {"pid": os.getpid(), "port": self.port, "token": self.token}
+        fd = os.open(self.info_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(info, f)
+
+    def stop(self):
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        for path in (self.socket_path, self.token and self.info_path):
+            if path:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self.logs.bind(self._loop)
+        try:
+            if self.socket_path:
+                if os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)  # Stale socket of a dead manager
+                self._server = self._loop.run_until_complete(
+                    asyncio.start_unix_server(self._handle, path=self.socket_path)
+                )
+                os.chmod(self.socket_path, 0o600)
+            else:
+                self._server = self._loop.run_until_complete(
+                    asyncio.start_server(self._handle, "127.0.0.1", self.port)
+                )
+                self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.close()
+
+    async def _handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it closes"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._send(writer, 400, {"error": "malformed request"})
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._send(writer, 400, {"error": "bad Content-Length"})
+                    break
+                if length > MAX_BODY:
+                    await self._send(writer, 413, {"error": "body too large"})
+                    break
+                body = await reader.readexactly(length) if length else b""
+                refusal = self._refuse(headers, body)
+                if refusal:
+                    await self._send(writer, *refusal)
+                    break
+
+                url = urlsplit(target)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                if method == "GET" and url.path == "/logs/stream":
+                    try:
+                        await self._stream_logs(writer, query)
+                    except ApiError as e:
+                        await self._send(writer, e.status, {"error": str(e)})
+                    break
+                status, payload = await self._dispatch(method, url.path, query, body)
+                await self._send(writer, status, payload)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _refuse(self, headers, body):
+        """(status, payload) for a request that must not be served"""
+        if "origin" in headers:
+            return 403, {"error": "cross-origin requests are not allowed"}
+        host = headers.get("host")
+        if host is not None and not _loopback_host(host):
+            return 403, {"error": "Host must be a loopback address"}
+        if self.token:
+            scheme, _, token = headers.get("authorization", "").partition(" ")
+            if scheme.lower() != "bearer" or not secrets.compare_digest(
+                token.strip(), self.token
+            ):
+                return 401, {"error": f"missing or wrong token (see {self.info_path})"}
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        if body and content_type.lower() != "application/json":
+            return 415, {"error": "request body must be application/json"}
+        return None
+
+    async def _dispatch(self, method, path, query, body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return 405, {"error": f"{method} not allowed on {path}"}
+            return 404, {"error": f"unknown endpoint {path}"}
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise ApiError(400, "request body must be a JSON object")
+            return 200, await handler(query, data)
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"invalid JSON: {e}"}
+        except ApiError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            self._log(f"Error handling {method} {path}: {e}")
+            return 500, {"error": str(e)}
+
+    async def _send(self, writer, status, payload):
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _call(self, fn, *args):
+        """Run a blocking manager call in the executor"""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def _manager(self, query, data):
+        name = data.get("instance") or query.get("instance") or "primary"
+        try:
+            return self.pool.get(name)
+        except KeyError:
+            raise ApiError(404, f"unknown instance {name!r}") from None
+
+    # Endpoints
+
+    async def _status(self, query, data):
+        status = self.pool.status()
+        status["failover"] = self.failover.status() if self.failover else None
+        return status
+
+    async def _start(self, query, data):
+        manager = self._manager(query, data)
+        name = manager.name
+        return {"instance": name, "ok": await self._call(self.pool.start, name)}
+
+    async def _stop(self, query, data):
+        manager = self._manager(query, data)
+        name = manager.name
+        return {"instance": name, "ok": await self._call(self.pool.stop, name)}
+
+    async def _restart(self, query, data):
+        manager = self._manager(query, data)
+        name = manager.name
+        return {"instance": name, "ok": await self._call(self.pool.restart, name)}
+
+    async def _get_regions(self, query, data):
+        return self._manager(query, data).get_server_regions()
+
+    async def _set_regions(self, query, data):
+        """Set {"mdds_region", "fpss_region"}, or {"fastest": true}"""
+        manager = self._manager(query, data)
+        if data.get("fastest"):
+            mdds, fpss = await self._call(manager.select_fastest_regions)
+            return {"mdds_region": mdds, "fpss_region": fpss, "ok": True}
+        mdds = data.get("mdds_region", manager.current_mdds_region)
+        fpss = data.get("fpss_region", manager.current_fpss_region)
+        if mdds not in manager.mdds_regions or fpss not in manager.fpss_regions:
+            raise ApiError(400, "unknown region")
+        ok = await self._call(manager.update_server_regions, mdds, fpss)
+        return {"mdds_region": mdds, "fpss_region": fpss, "ok": ok}
+
+    async def _get_jar(self, query, data):
+        manager = self._manager(query, data)
+        return {
+            "jar_version": manager.jar_version,
+            "jar_file": manager.jar_file,
+            "present": os.path.exists(manager.jar_file),
+            "downloading": manager.is_downloading,
+        }
+
+    async def _set_jar(self, query, data):
+        """Switch the JAR version; takes effect on the next (re)start"""
+        manager = self._manager(query, data)
+        version = data.get("version")
+        if not version or not isinstance(version, str) or not version.isalnum():
+            raise ApiError(400, "version must be a release channel like 'latest'")
+        manager.set_jar_version(version)
+        if manager.config_file:
+            manager.config["jar_version"] = version
+            await self._call(manager.save_config)
+        if data.get("download", True):
+            manager.check_jar_file()  # Starts a background download if missing
+        return await self._get_jar(query, data)
+
+    async def _command(self, query, data):
+        """Send {"command"} to the terminal's stdin and return the output that
+        followed; optional "expect" (regex), "timeout" and "settle" seconds"""
+        manager = self._manager(query, data)
+        command = data.get("command")
+        if not command or not isinstance(command, str):
+            raise ApiError(400, "command must be a non-empty string")
+        try:
+            timeout = min(float(data.get("timeout", 5.0)), 300.0)
+            settle = float(data.get("settle", 0.5))
+        except (TypeError, ValueError):
+            raise ApiError(400, "timeout and settle must be numbers") from None
+        try:
+            future = manager.send_command(
+                command, timeout, settle, data.get("expect") or None
+            )
+        except (ValueError, re.error) as e:
+            raise ApiError(400, str(e)) from None
+        result = await asyncio.wrap_future(future)
+        return {"instance": manager.name, **result.to_dict()}
+
+    async def _get_logs(self, query, data):
+        """Long-poll: lines from `since`, waiting up to `timeout` for new ones"""
+        since = _number(query, "since", 0)
+        timeout = min(_number(query, "timeout", 30, float), 300.0)
+        instance = query.get("instance")
+        deadline = time.monotonic() + timeout
+        while True:
+            entries = self.logs.since(since, instance)
+            remaining = deadline - time.monotonic()
+            if entries or remaining <= 0:
+                break
+            await self.logs.wait(remaining)
+        next_seq = entries[-1][0] + 1 if entries else max(since, self.logs.next_seq)
+        return {"next": next_seq, "lines": [_entry_dict(e) for e in entries]}
+
+    async def _stream_logs(self, writer, query):
+        """Chunked stream of JSON lines, starting at `since` (default: now)"""
+        since = _number(query, "since", self.logs.next_seq)
+        instance = query.get("instance")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        await writer.drain()
+        while True:
+            entries = self.logs.since(since, instance)
+            if entries:
+                since = entries[-1][0] + 1
+                chunk = "".join(json.dumps(_entry_dict(e)) + "\n" for e in entries)
+                data = chunk.encode()
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+            elif not await self.logs.wait(15.0):
+                # Keep-alive so idle clients notice a dead connection
+                writer.write(b"1\r\n\n\r\n")
+                await writer.drain()
@@ -0,0 +1,287 @@
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+from .resource_sampler import ResourceSampler
+from .standin_terminal import COMPLETE_MARKER, free_port, standin_command
+from .terminal_manager import DEFAULT_PORTS, TerminalManager
+
+# Metric -> (unit, higher is better, absolute change always tolerated)
+METRICS = {
+    "start_to_ready_s": ("s", False, 0.05),
+    "stop_quit_s": ("s", False, 0.05),
+    "stop_sigterm_s": ("s", False, 0.1),
+    "log_throughput_lps": ("lines/s", True, 0.0),
+    "memory_growth_mb": ("MB", False, 2.0),
+}
+SCENARIOS = ("startup", "stop", "sigterm", "throughput", "memory")
+
+
+class _Harness:
+    """A TerminalManager launching the stand-in terminal on free ports"""
+
+    def __init__(self, folder, ready_timeout, **options):
+        ports = {key: free_port() for key in DEFAULT_PORTS}
+        self.manager = manager = TerminalManager(
+            name="e2e-benchmark", config_file=None, load=False
+        )
+        manager.data_dir = folder  # Keep launch records out of the user's data
+        manager.properties_file = os.path.join(folder, "config_0.properties")
+        with open(manager.properties_file, "w") as f:
+            f.writelines(f"{key}={port}\n" for key, port in ports.items())
+        manager.launch_command = standin_command(port=ports["HTTP_PORT"], **options)
+        manager.archive_settings = {"enabled": False}
+        manager.tail_settings = {"enabled": False}
+        manager.set_log_callback(self._log)
+        self.ready_timeout = ready_timeout
+        self.recent = deque(maxlen=20)  # Shown if a run fails
+        self.first_line_at = None
+        self.completed_at = None
+        self.complete = threading.Event()
+
+    def _log(self, message):
+        self.recent.append(message)
+        if self.first_line_at is None and "Starting ThetaTerminal" in message:
+            self.first_line_at = time.monotonic()
+        if message.startswith("[") and COMPLETE_MARKER in message:
+            self.completed_at = time.monotonic()
+            self.complete.set()
+
+    def start(self):
+        """Launch and wait until ready; returns seconds to ready"""
+        started = time.monotonic()
+        if not self.manager.start_terminal("benchmark", "benchmark"):
+            raise RuntimeError(self._failure("Stand-in did not launch"))
+        deadline = started + self.ready_timeout
+        while not self.manager.ready:
+            if time.monotonic() > deadline or not self.manager.running:
+                raise RuntimeError(self._failure("Stand-in did not become ready"))
+            time.sleep(0.005)
+        return time.monotonic() - started
+
+    def stop(self):
+        started = time.monotonic()
+        self.manager.stop_terminal()
+        return time.monotonic() - started
+
+    def close(self):
+        if self.manager.running:
+            self.manager.stop_terminal()
+        # The reader removes the launch record as it finishes; let it finish
+        # before the folder is deleted
+        if self.manager.output_thread:
+            self.manager.output_thread.join(timeout=5.0)
+        self.manager.cleanup()
+
+    def _failure(self, reason):
+        return reason + "; last output:\n  " + "\n  ".join(self.recent)
+
+
+def _rss_mb():
+    gc.collect()
+    sample = ResourceSampler(os.getpid()).sample_once()
+    return sample.rss_bytes / (1024 * 1024) if sample else 0.0
+
+
+class EndToEndBenchmark:
+    """Measure the manager's lifecycle and output path against the stand-in
+    terminal. Each scenario runs `runs` times on a fresh manager and stand-in
+    process; the median of every metric is reported."""
+
+    def __init__(
+        self,
+        runs=3,
+        startup_delay=0.5,
+        lines=200000,
+        memory_rate=2000,
+        memory_duration=15.0,
+        ready_timeout=30.0,
+        log=print,
+    ):
+        self.runs = runs
+        self.startup_delay = startup_delay
+        self.lines = lines
+        self.memory_rate = memory_rate
+        self.memory_duration = memory_duration
+        self.ready_timeout = ready_timeout
+        self.log = log
+        self.samples = {}  # Metric -> values of every run
+
+    @property
+    def settings(self):
+        return {
+            "runs": self.runs,
+            "startup_delay": self.startup_delay,
+            "lines": self.lines,
+            "memory_rate": self.memory_rate,
+            "memory_duration": self.memory_duration,
+        }
+
+    def run(self, scenarios=SCENARIOS):
+        for scenario in scenarios:
+            if scenario not in SCENARIOS:
+                raise ValueError(f"Unknown scenario: {scenario}")
+            for i in range(self.runs):
+                with tempfile.TemporaryDirectory() as folder:
+                    for metric, value in getattr(self, "_run_" + scenario)(folder):
+                        self.samples.setdefault(metric, []).append(value)
+                        self.log(
+                            f"  {scenario} run {i + 1}/{self.runs}: "
+                            f"{metric} = {value:,.3f}"
+                        )
+        return self.results()
+
+    def results(self):
+        return {
+            metric: statistics.median(values) for metric, values in self.samples.items()
+        }
+
+    def _harness(self, folder, **options):
+        return _Harness(folder, self.ready_timeout, **options)
+
+    def _run_startup(self, folder):
+        harness = self._harness(folder, startup_delay=self.startup_delay)
+        try:
+            yield "start_to_ready_s", harness.start()
+        finally:
+            harness.close()
+
+    def _run_stop(self, folder):
+        harness = self._harness(folder, startup_delay=0)
+        try:
+            harness.start()
+            yield "stop_quit_s", harness.stop()
+        finally:
+            harness.close()
+
+    def _run_sigterm(self, folder):
+        """Stand-in that ignores every stdin command, so stop_terminal goes
+        through all its quit commands before SIGTERM"""
+        harness = self._harness(folder, startup_delay=0, quit_commands="")
+        try:
+            harness.start()
+            yield "stop_sigterm_s", harness.stop()
+        finally:
+            harness.close()
+
+    def _run_throughput(self, folder):
+        harness = self._harness(folder, startup_delay=0, rate=0, lines=self.lines)
+        try:
+            harness.start()
+            if not harness.complete.wait(self.ready_timeout + self.lines / 1000):
+                raise RuntimeError(harness._failure("Output did not complete"))
+            lines = harness.manager.metrics.output_lines.value
+            elapsed = harness.completed_at - harness.first_line_at
+            yield "log_throughput_lps", lines / elapsed
+        finally:
+            harness.close()
+
+    def _run_memory(self, folder):
+        """RSS growth of this process while the manager handles a steady
+        stream of output"""
+        harness = self._harness(folder, startup_delay=0, rate=self.memory_rate)
+        try:
+            harness.start()
+            time.sleep(1.0)  # Let buffers and caches reach their working size
+            before = _rss_mb()
+            time.sleep(self.memory_duration)
+            yield "memory_growth_mb", _rss_mb() - before
+        finally:
+            harness.close()
+
+
+def compare(results, baseline, tolerance):
+    """[(metric, baseline, current, status)] with status "ok", "improved",
+    "REGRESSION" or "new". A change counts once it exceeds `tolerance`
+    (relative) plus the metric's absolute allowance."""
+    rows = []
+    for metric, value in results.items():
+        _, higher_is_better, slack = METRICS[metric]
+        base = baseline.get(metric)
+        if base is None:
+            rows.append((metric, None, value, "new"))
+            continue
+        worse_by = base - value if higher_is_better else value - base
+        allowed = abs(base) * tolerance + slack
+        if worse_by > allowed:
+            status = "REGRESSION"
+        elif -worse_by > allowed:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((metric, base, value, status))
+    return rows
+
+
+def format_results(rows):
+    """Table of compare() rows"""
+    lines = [f"{'Metric':<20} {'Unit':<8} {'Baseline':>14} {'Current':>14}  Status"]
+    for metric, base, value, status in rows:
+        base_text = f"{base:,.3f}" if base is not None else "-"
+        lines.append(
+            f"{metric:<20} {METRICS[metric][0]:<8} {base_text:>14} "
+            f"{value:>14,.3f}  {status}"
+        )
+    return "\n".join(lines)
+
+
+def run_e2e_benchmark_command(args):
+    """Entry point for the `e2e-benchmark` subcommand"""
+    if getattr(sys, "frozen", False):
+        print("The end-to-end benchmark launches a Python stand-in; run from source.")
+        return 2
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    benchmark = EndToEndBenchmark(
+        runs=args.runs,
+        startup_delay=args.startup_delay,
+        lines=args.lines,
+        memory_rate=args.memory_rate,
+        memory_duration=args.memory_duration,
+        ready_timeout=args.ready_timeout,
+    )
+    try:
+        results = benchmark.run(scenarios)
+    except (RuntimeError, ValueError) as e:
+        print(f"Benchmark failed: {e}")
+        return 1
+
+    report = {
+        "settings": benchmark.settings,
+        "metrics": results,
+        "samples": benchmark.samples,
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("settings") != benchmark.settings:
+            print(
+                "Warning: baseline was recorded with different settings: "
+                f"{baseline.get('settings')}"
+            )
+        rows = compare(results, baseline.get("metrics", {}), args.tolerance)
+        print(format_results(rows))
+        report["comparison"] = [
+            {"metric": m, "baseline": b, "current": v, "status": s}
+            for m, b, v, s in rows
+        ]
+        if any(row[3] == "REGRESSION" for row in rows):
+            status = 1
+    else:
+        print(format_results([(m, None, v, "") for m, v in results.items()]))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+    return status
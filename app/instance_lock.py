@@ -0,0 +1,123 @@
+import json
+import os
+import secrets
+import socket
+import sys
+import threading
+import time
+
+from .paths import manager_data_dir
+
+
+class InstanceLock:
+    """Per-user single-instance lock with a hand-off channel.
+
+    The first manager holds an OS file lock (released by the OS even if the
+    process dies) and listens on a loopback port for commands. A second launch
+    fails to take the lock, reads the port and token from the info file, sends
+    its command and exits, before it has created any windows or terminals.
+    """
+
+    def __init__(self, data_dir=None, name="manager"):
+        data_dir = data_dir or manager_data_dir()
+        self.lock_path = os.path.join(data_dir, f"{name}.lock")
+        self.info_path = os.path.join(data_dir, f"{name}.json")
+        self.handlers = {}  # command -> fn(payload) returning a dict
+        self._file = None
+        self._server = None
+        self._token = None
+
+    def acquire(self):
+        """Take the lock without blocking; False if another manager holds it"""
+        f = open(self.lock_path, "a+")
+        try:
+            if sys.platform.startswith("win"):
+                import msvcrt
+
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def release(self):
+        if self._server:
+            self._server.close()
+            self._server = None
+        if self._file:
+            # Remove the info file while still holding the lock
+            try:
+                os.unlink(self.info_path)
+            except OSError:
+                pass
+            self._file.close()
+            self._file = None
+
+    def on_command(self, command, handler):
+        self.handlers[command] = handler
+
+    def serve(self):
+        """Listen for commands from later launches (call after acquire)"""
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self._token = secrets.token_hex(16)
+        info = {
+            "pid": os.getpid(),
+            "port": self._server.getsockname()[1],
+            "token": self._token,
+        }
+        # Only this user may read the token
+        fd = os.open(self.info_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(info, f)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        server = self._server
+        while True:
+            try:
+                client, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _handle(self, client):
+        with client:
+            client.settimeout(2.0)
+            try:
+                message = json.loads(client.makefile("rb").readline())
+                if message.get("token") != self._token:
+                    reply = {"ok": False, "error": "bad token"}
+                else:
+                    handler = self.handlers.get(message.get("command"))
+                    reply = {"ok": False, "error": "not ready"}
+                    if handler:
+                        reply = dict(handler(message), ok=True)
+                reply["pid"] = os.getpid()
+                client.sendall(json.dumps(reply).encode() + b"\n")
+            except (OSError, ValueError, AttributeError):
+                pass
+
+    def send(self, command, timeout=2.0, **payload):
+        """Send a command to the manager holding the lock; None if unreachable"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                with open(self.info_path) as f:
+                    info = json.load(f)
+                message = dict(payload, command=command, token=info["token"])
+                with socket.create_connection(
+                    ("127.0.0.1", info["port"]), timeout=timeout
+                ) as sock:
+                    sock.sendall(json.dumps(message).encode() + b"\n")
+                    return json.loads(sock.makefile("rb").readline())
+            except (OSError, ValueError, KeyError):
+                # The holder may still be starting up (no or stale info file)
+                if time.monotonic() >= deadline:
+                    return None
+                time.sleep(0.02)
@@ -0,0 +1,368 @@
+import gzip
+import json
+import os
+import re
+import time
+
+from .log_index import ERROR, detect_level
+from .paths import manager_data_dir
+
+CACHE_VERSION = 2
+
+# "2026-01-05 09:30:00", "2026-01-05T09:30:00.123", "[2026-01-05 09:30:00]"
+_TIMESTAMP_RE = re.compile(r"(\d{4}-\d{2}-\d{2})[T ](\d{2}):(\d{2}):(\d{2})")
+# Matched against the lowercased line
+_EVENT_RE = re.compile(
+    r"(?P<auth>invalid (?:credentials|login|password|username)|"
+    r"auth\w* (?:failed|failure|error)|unauthori[sz]ed|login failed|"
+    r"bad credentials)|"
+    r"(?P<disconnect>disconnect|connection (?:lost|closed|reset|refused)|"
+    r"lost connection)|"
+    r"(?P<connect>reconnected|connected to|connection established|\bconnected\b)"
+)
+
+
+def _match_event(line):
+    """Connection or authentication event in a line, or None. Substring
+    tests rule out almost every line far faster than the regex would."""
+    low = line.lower()
+    if (
+        "connect" in low
+        or "auth" in low
+        or "credential" in low
+        or "login" in low
+        or "password" in low
+        or "username" in low
+    ):
+        return _EVENT_RE.search(low)
+    return None
+
+
+def _epoch(date, hour, minute, second, _cache={}):
+    """Local epoch seconds, converting each distinct minute only once"""
+    key = (date, hour, minute)
+    base = _cache.get(key)
+    if base is None:
+        base = _cache[key] = time.mktime(
+            time.strptime(f"{date} {hour}:{minute}", "%Y-%m-%d %H:%M")
+        )
+    return base + int(second)
+
+
+def _open_log(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    return opener(path, "rt", encoding="utf-8", errors="replace")
+
+
+def analyze_file(path, window_minutes=60):
+    """Aggregate one log file, streaming it line by line.
+
+    Runs in a worker process, so the result is plain JSON-able data.
+    Connection events are counted in windows of `window_minutes`; a
+    disconnect followed by a connect gives one reconnect duration. The first
+    connect and a trailing disconnect are kept so reconnects spanning a file
+    rotation can be paired when results are merged.
+    """
+    window_seconds = window_minutes * 60
+    windows = {}  # window start (epoch) -> [errors, disconnects, auth failures]
+    reconnects = []
+    lines = errors = disconnects = auth_failures = 0
+    opened = first = last = None  # First, earliest and latest timestamps
+    first_connect = None
+    pending_disconnect = None
+    now = None
+    with _open_log(path) as f:
+        for line in f:
+            lines += 1
+            match = _TIMESTAMP_RE.search(line, 0, 40)
+            if match:
+                now = _epoch(*match.groups())
+                if first is None:
+                    opened = first = last = now
+                elif now > last:
+                    last = now
+                elif now < first:
+                    first = now
+            # Lines without a timestamp (stack traces) belong to the last one
+            level = detect_level(line)
+            event = _match_event(line)
+            if level != ERROR and event is None:
+                continue
+            counts = None
+            if now is not None:
+                start = now - now % window_seconds
+                counts = windows.get(start)
+                if counts is None:
+                    counts = windows[start] = [0, 0, 0]
+            if level == ERROR:
+                errors += 1
+                if counts:
+                    counts[0] += 1
+            if event is None:
+                continue
+            if event.lastgroup == "auth":
+                auth_failures += 1
+                if counts:
+                    counts[2] += 1
+            elif event.lastgroup == "disconnect":
+                disconnects += 1
+                if counts:
+                    counts[1] += 1
+                if pending_disconnect is None:
+                    pending_disconnect = now
+            elif now is not None:
+                if pending_disconnect is not None:
+                    reconnects.append(now - pending_disconnect)
+                    pending_disconnect = None
+                elif first_connect is None and not disconnects:
+                    first_connect = now
+    return {
+        "lines": lines,
+        "errors": errors,
+        "disconnects": disconnects,
+        "auth_failures": auth_failures,
+        "opened": opened,
+        "first": first,
+        "last": last,
+        "windows": {str(int(k)): v for k, v in windows.items()},
+        "reconnects": reconnects,
+        "first_connect": first_connect,
+        "pending_disconnect": pending_disconnect,
+    }
+
+
+def _analyze_job(job):
+    path, window_minutes = job
+    try:
+        return path, analyze_file(path, window_minutes), None
+    except (OSError, EOFError) as e:
+        return path, None, str(e)
+
+
+class AnalysisReport:
+    """Totals and per-window counts merged from every analyzed file"""
+
+    def __init__(self, window_minutes):
+        self.window_minutes = window_minutes
+        self.files = 0
+        self.parsed = 0  # Files actually read; the rest came from the cache
+        self.failed = {}  # path -> error message
+        self.lines = 0
+        self.errors = 0
+        self.disconnects = 0
+        self.auth_failures = 0
+        self.first = None
+        self.last = None
+        self.windows = {}
+        self.reconnects = []
+        self.elapsed = 0.0
+
+    def merge(self, results):
+        """Merge per-file results, in the order the files were written"""
+        results = sorted(results, key=lambda r: r["opened"] or 0)
+        pending = None
+        for result in results:
+            self.lines += result["lines"]
+            self.errors += result["errors"]
+            self.disconnects += result["disconnects"]
+            self.auth_failures += result["auth_failures"]
+            if result["first"] is not None:
+                self.first = min(self.first or result["first"], result["first"])
+                self.last = max(self.last or result["last"], result["last"])
+            for key, counts in result["windows"].items():
+                total = self.windows.setdefault(int(key), [0, 0, 0])
+                for i, count in enumerate(counts):
+                    total[i] += count
+            self.reconnects.extend(result["reconnects"])
+            if pending is not None and result["first_connect"] is not None:
+                self.reconnects.append(result["first_connect"] - pending)
+            if result["pending_disconnect"] is not None:
+                pending = result["pending_disconnect"]
+            elif result["first_connect"] is not None or result["reconnects"]:
+                pending = None
+
+    def to_dict(self):
+        return {
+            "window_minutes": self.window_minutes,
+            "files": self.files,
+            "parsed": self.parsed,
+            "failed": self.failed,
+            "lines": self.lines,
+            "errors": self.errors,
+            "disconnects": self.disconnects,
+            "auth_failures": self.auth_failures,
+            "first": self.first,
+            "last": self.last,
+            "reconnect_seconds": sorted(self.reconnects),
+            "windows": {
+                _format_time(start): {
+                    "errors": counts[0],
+                    "disconnects": counts[1],
+                    "auth_failures": counts[2],
+                }
+                for start, counts in sorted(self.windows.items())
+            },
+        }
+
+    def format(self, max_windows=48):
+        """Human-readable summary; only the busiest windows are listed"""
+        lines = [
+            f"{self.files} files ({self.parsed} parsed, "
+            f"{self.files - self.parsed - len(self.failed)} cached) "
+            f"in {self.elapsed:.2f}s, {self.lines:,} lines",
+        ]
+        if self.first is not None:
+            lines.append(
+                f"Period: {_format_time(self.first)} to {_format_time(self.last)}"
+            )
+        lines.append(
+            f"Errors: {self.errors:,}  Disconnects: {self.disconnects:,}  "
+            f"Auth failures: {self.auth_failures:,}"
+        )
+        if self.reconnects:
+            durations = sorted(self.reconnects)
+            lines.append(
+                f"Reconnects: {len(durations)}, median "
+                f"{durations[len(durations) // 2]:.0f}s, "
+                f"p95 {durations[int(len(durations) * 0.95)]:.0f}s, "
+                f"max {durations[-1]:.0f}s"
+            )
+        busy = [item for item in self.windows.items() if any(item[1])]
+        if busy:
+            busy = sorted(busy, key=lambda item: (item[1][1], item[1][0]))
+            busy = sorted(busy[-max_windows:])
+            lines.append("")
+            lines.append(
+                f"{'Window (' + str(self.window_minutes) + ' min)':<20}"
+                f"{'Errors':>8}{'Disconn.':>10}{'Auth':>6}"
+            )
+            for start, (errors, disconnects, auth) in busy:
+                lines.append(
+                    f"{_format_time(start):<20}{errors:>8}{disconnects:>10}{auth:>6}"
+                )
+        for path, error in self.failed.items():
+            lines.append(f"Could not read {path}: {error}")
+        return "\n".join(lines)
+
+
+def _format_time(ts):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
+
+
+class LogAnalyzer:
+    """Analyze every log file in a folder in parallel, with a result cache.
+
+    Files are parsed in a process pool (regex work doesn't scale across
+    threads). Each file's result is cached by size and mtime, so a re-run
+    only parses new or changed files - usually just the active one.
+    """
+
+    def __init__(self, folder, window_minutes=60, cache_path=None, workers=None):
+        self.folder = folder
+        self.window_minutes = window_minutes
+        self.cache_path = cache_path or os.path.join(
+            manager_data_dir(), "log_analysis_cache.json"
+        )
+        self.workers = workers or os.cpu_count() or 1
+
+    def log_files(self):
+        try:
+            names = os.listdir(self.folder)
+        except OSError:
+            return []
+        return sorted(
+            os.path.join(self.folder, name)
+            for name in names
+            if name.endswith((".log", ".txt", ".gz")) or ".log." in name
+        )
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cache.get("version") != CACHE_VERSION:
+            return {}
+        if cache.get("window_minutes") != self.window_minutes:
+            return {}
+        return cache.get("files", {})
+
+    def _save_cache(self, entries):
+        cache = {
+            "version": CACHE_VERSION,
+            "window_minutes": self.window_minutes,
+            "files": entries,
+        }
+        try:
+            with open(self.cache_path + ".tmp", "w") as f:
+                json.dump(cache, f)
+            os.replace(self.cache_path + ".tmp", self.cache_path)
+        except OSError:
+            pass  # The cache only saves time
+
+    def run(self, use_cache=True):
+        started = time.perf_counter()
+        report = AnalysisReport(self.window_minutes)
+        cache = self._load_cache() if use_cache else {}
+        entries = {}
+        results = []
+        todo = []
+        for path in self.log_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            report.files += 1
+            signature = [st.st_size, st.st_mtime_ns]
+            cached = cache.get(path)
+            if cached and cached["signature"] == signature:
+                entries[path] = cached
+                results.append(cached["result"])
+            else:
+                todo.append((path, signature))
+
+        signatures = dict(todo)
+        for path, result, error in self._parse(list(signatures)):
+            if result is None:
+                report.failed[path] = error
+                continue
+            report.parsed += 1
+            results.append(result)
+            entries[path] = {"signature": signatures[path], "result": result}
+
+        report.merge(results)
+        self._save_cache(entries)  # Also drops files that no longer exist
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def _parse(self, paths):
+        jobs = [(path, self.window_minutes) for path in paths]
+        workers = min(self.workers, len(jobs))
+        if workers <= 1:
+            # Starting worker processes would cost more than it saves
+            return [_analyze_job(job) for job in jobs]
+        import multiprocessing
+        import sys
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Never fork: the manager runs Tk and many threads whose locks a
+        # forked child could inherit held. forkserver forks from a clean
+        # helper process; spawn where it isn't available (Windows, frozen).
+        method = "spawn"
+        if not getattr(sys, "frozen", False):
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                method = "forkserver"
+        context = multiprocessing.get_context(method)
+
+        # Largest files first so one big file doesn't finish last on its own
+        jobs.sort(key=lambda job: _size(job[0]), reverse=True)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            return list(pool.map(_analyze_job, jobs))
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
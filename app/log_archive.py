@@ -0,0 +1,270 @@
+import gzip
+import os
+import queue
+import shutil
+import threading
+import time
+
+SEGMENT_PREFIX = "stdout-"
+_STOP = object()
+
+
+def format_timestamp(ts):
+    """Local time with milliseconds; sorts lexicographically"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) + (
+        f".{int(ts % 1 * 1000):03d}"
+    )
+
+
+def parse_timestamp(text):
+    """Parse "YYYY-mm-dd HH:MM[:SS]" (local time) into epoch seconds"""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(text, fmt))
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time {text!r}; use 'YYYY-mm-dd HH:MM[:SS]'")
+
+
+class LogArchive:
+    """Persist terminal output to rotating, compressed segment files.
+
+    write() only enqueues, so the output reader never waits on the disk. A
+    writer thread prefixes each line with its timestamp and rotates segments
+    by size and age; closed segments are gzipped by a second thread.
+    """
+
+    def __init__(
+        self,
+        directory,
+        max_segment_bytes=16 * 1024 * 1024,
+        max_segment_age=3600.0,
+        keep_days=30,
+        compress=True,
+    ):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.keep_days = keep_days
+        self.compress = compress
+        self.error_callback = None
+        self._queue = queue.SimpleQueue()
+        self._compress_queue = queue.SimpleQueue()
+        self._file = None
+        self._path = None
+        self._opened_at = 0.0
+        self._size = 0
+        self._second = None  # Cached timestamp prefix for the current second
+        self._prefix = ""
+        self._writer = None
+        self._compressor = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # Compressions an earlier run didn't finish; their .log is still there
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(".gz.tmp"):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        if self.compress:
+            # Segments left uncompressed by an earlier run
+            for path in self.segments():
+                if path.endswith(".log"):
+                    self._compress_queue.put(path)
+            self._compressor = threading.Thread(target=self._compress_loop, daemon=True)
+            self._compressor.start()
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+        return self
+
+    def write(self, line, timestamp=None):
+        """Queue a line for the archive (never blocks)"""
+        self._queue.put((timestamp or time.time(), line))
+
+    def flush(self, timeout=5.0):
+        """Wait until everything written so far is on disk"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        """Write out queued lines and finish compressing closed segments"""
+        self._queue.put(_STOP)
+        if self._writer:
+            self._writer.join(timeout=5.0)
+        self._compress_queue.put(_STOP)
+        if self._compressor and self._compressor is not threading.current_thread():
+            # Anything cut short here is redone by the next start()
+            self._compressor.join(timeout=timeout)
+
+    def _log_error(self, message):
+        if self.error_callback:
+            self.error_callback(message)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is queued and write it in one go
+            try:
+                while len(batch) < 4096:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                for item in batch:
+                    if item is _STOP:
+                        self._close_segment()
+                        return
+                    if isinstance(item, threading.Event):
+                        if self._file:
+                            self._file.flush()
+                        item.set()
+                        continue
+                    self._write_line(*item)
+                if self._file:
+                    self._file.flush()
+            except OSError as e:
+                self._log_error(f"Log archive write failed: {e}")
+                self._close_segment()
+
+    def _write_line(self, timestamp, line):
+        if self._file is None or self._should_rotate(timestamp):
+            self._rotate(timestamp)
+        second = int(timestamp)
+        if second != self._second:
+            self._second = second
+            self._prefix = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+        text = f"{self._prefix}.{int(timestamp % 1 * 1000):03d} {line}\n"
+        self._file.write(text)
+        self._size += len(text)
+
+    def _should_rotate(self, timestamp):
+        return (
+            self._size >= self.max_segment_bytes
+            or timestamp - self._opened_at >= self.max_segment_age
+        )
+
+    def _rotate(self, timestamp):
+        self._close_segment()
+        name = time.strftime("%Y%m%d-%H%M%S", time.localtime(timestamp))
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{name}.log")
+        suffix = 1
+        while os.path.exists(path) or os.path.exists(path + ".gz"):
+            path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{name}-{suffix}.log")
+            suffix += 1
+        self._file = open(path, "w", encoding="utf-8", errors="replace")
+        self._path = path
+        self._opened_at = timestamp
+        self._size = 0
+        self._expire_segments(timestamp)
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        if self.compress:
+            self._compress_queue.put(self._path)
+        self._file = None
+        self._path = None
+
+    def _expire_segments(self, now):
+        if not self.keep_days:
+            return
+        cutoff = now - self.keep_days * 86400
+        for path in self.segments():
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+    def _compress_loop(self):
+        while True:
+            path = self._compress_queue.get()
+            if path is _STOP:
+                return
+            try:
+                with open(path, "rb") as src, gzip.open(path + ".gz.tmp", "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                os.replace(path + ".gz.tmp", path + ".gz")
+                os.unlink(path)
+            except OSError as e:
+                self._log_error(f"Compressing {path} failed: {e}")
+
+    def segments(self):
+        """Segment files, oldest first"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        paths = [
+            os.path.join(self.directory, name)
+            for name in names
+            if name.startswith(SEGMENT_PREFIX) and name.endswith((".log", ".log.gz"))
+        ]
+        return sorted(paths, key=_segment_key)
+
+    def export_range(self, out_path, start=None, end=None):
+        """Stream the lines between two epoch times (inclusive) into a file.
+
+        Whole segments outside the range are skipped by their start time.
+        Returns the number of lines written.
+        """
+        if self._writer and self._writer.is_alive():
+            self.flush()
+        low = format_timestamp(start) if start is not None else ""
+        high = format_timestamp(end) if end is not None else "\uffff"
+        segments = self.segments()
+        starts = [_segment_start(path) for path in segments]
+        count = 0
+        with open(out_path, "w", encoding="utf-8") as out:
+            for i, path in enumerate(segments):
+                next_start = starts[i + 1] if i + 1 < len(starts) else None
+                if starts[i] > high[:19] or (next_start and next_start < low[:19]):
+                    continue
+                try:
+                    f = _open_segment(path)
+                except FileNotFoundError:
+                    try:
+                        f = _open_segment(path + ".gz")  # Compressed meanwhile
+                    except OSError:
+                        continue
+                try:
+                    with f:
+                        for line in f:
+                            stamp = line[:23]
+                            if stamp < low:
+                                continue
+                            if stamp > high:
+                                break
+                            out.write(line)
+                            count += 1
+                except (OSError, EOFError):
+                    continue  # Truncated segment from a crash
+        return count
+
+
+def _open_segment(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    return opener(path, "rt", encoding="utf-8", errors="replace")
+
+
+def _segment_start(path):
+    """Start time of a segment as "YYYY-mm-dd HH:MM:SS", from its file name"""
+    stamp = os.path.basename(path)[len(SEGMENT_PREFIX) :][:15]
+    return (
+        f"{stamp[0:4]}-{stamp[4:6]}-{stamp[6:8]} "
+        f"{stamp[9:11]}:{stamp[11:13]}:{stamp[13:15]}"
+    )
+
+
+def _segment_key(path):
+    # stdout-YYYYmmdd-HHMMSS[-N].log[.gz]
+    base = os.path.basename(path)[len(SEGMENT_PREFIX) :].split(".", 1)[0]
+    suffix = base[16:]
+    return (base[:15], int(suffix) if suffix else 0)
@@ -0,0 +1,84 @@
+import re
+import time
+
+# Numbers, including timestamps, durations, ports and IPs ("10:00:01.123")
+_NUMBER_RE = re.compile(r"\d+(?:[.:,/-]\d+)*")
+
+
+def line_key(line, mask_numbers=True):
+    """Text two lines must share to count as repeats of each other"""
+    return _NUMBER_RE.sub("#", line) if mask_numbers else line
+
+
+class Run:
+    """Consecutive repeats of one line. Updated in place by the collapser, so
+    a UI holding on to it can poll `count` and `last` for a live counter."""
+
+    __slots__ = ("key", "text", "count", "first", "last", "closed")
+
+    def __init__(self, key, text, now):
+        self.key = key
+        self.text = text  # The first line of the run, as shown
+        self.count = 1
+        self.first = now
+        self.last = now
+        self.closed = False
+
+    def summary(self):
+        return (
+            f"[x{self.count}, {_clock(self.first)}-{_clock(self.last)}]"
+            if self.count > 1
+            else ""
+        )
+
+
+class RepeatSummary(str):
+    """The "(previous line [xN, ...])" line logged after a run of repeats.
+
+    Every sink gets it (headless output, the control API's log buffer); a
+    view that already shows the run's live counter can skip it by type.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, run):
+        return cls(f"(previous line {run.summary()})")
+
+
+def _clock(ts):
+    return time.strftime("%H:%M:%S", time.localtime(ts))
+
+
+class LineCollapser:
+    """Collapse runs of identical or near-identical lines into one entry.
+
+    feed() returns (run, is_new): only the first line of a run should be
+    shown; later ones just bump the run's counter. With `mask_numbers`
+    lines differing only in numbers (timestamps, counters, ports) belong to
+    the same run, as in a reconnect storm.
+    """
+
+    def __init__(self, mask_numbers=True):
+        self.mask_numbers = mask_numbers
+        self.current = None
+
+    def feed(self, line, now=None):
+        now = now or time.time()
+        key = line_key(line, self.mask_numbers)
+        run = self.current
+        if run is not None and run.key == key:
+            run.count += 1
+            run.last = now
+            return run, False
+        if run is not None:
+            run.closed = True
+        self.current = Run(key, line, now)
+        return self.current, True
+
+    def close(self):
+        """End the current run; returns it"""
+        run, self.current = self.current, None
+        if run is not None:
+            run.closed = True
+        return run
@@ -0,0 +1,246 @@
+import datetime
+import gzip
+import os
+import sys
+import threading
+import time
+
+CHUNK_SIZE = 256 * 1024
+# Regular US equity session; the terminal is busiest then
+MARKET_OPEN = datetime.time(9, 30)
+MARKET_CLOSE = datetime.time(16, 0)
+
+
+def _eastern_now():
+    try:
+        from zoneinfo import ZoneInfo
+
+        return datetime.datetime.now(ZoneInfo("America/New_York"))
+    except Exception:
+        # No tz database (e.g. Windows without tzdata): assume EST
+        return datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=-5)))
+
+
+def in_market_hours(now=None):
+    """True on weekdays between the regular open and close (New York time)"""
+    now = now or _eastern_now()
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def _lower_thread_priority():
+    """Make the calling thread the lowest CPU priority (Linux: per-thread nice)"""
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+class RetentionResult:
+    __slots__ = ("deleted", "compressed", "reclaimed", "deferred", "elapsed")
+
+    def __init__(self):
+        self.deleted = 0
+        self.compressed = 0
+        self.reclaimed = 0  # Bytes freed by deletion and compression
+        self.deferred = 0  # Files left for a pass outside market hours
+        self.elapsed = 0.0
+
+    def __str__(self):
+        text = (
+            f"Log retention: reclaimed {self.reclaimed / (1024 * 1024):.1f} MB "
+            f"({self.deleted} deleted, {self.compressed} compressed) "
+            f"in {self.elapsed:.1f}s"
+        )
+        if self.deferred:
+            text += f", {self.deferred} deferred until after market hours"
+        return text
+
+
+class LogRetention:
+    """Keep the terminal's logs folder within an age and size budget.
+
+    Each pass deletes files older than `max_age_days`, gzips files older
+    than `compress_after_days` and then deletes the oldest files until the
+    folder fits in `max_total_mb`. The file being written (the newest) is
+    never touched. Passes run in a background thread at the lowest CPU
+    priority; compression is rate-limited to `io_limit_mb` per second and
+    put off while the market is open, when the terminal is busiest.
+    """
+
+    def __init__(
+        self,
+        folder,
+        max_age_days=30,
+        max_total_mb=2048,
+        compress_after_days=2,
+        interval=3600.0,
+        io_limit_mb=4.0,
+        defer_during_market_hours=True,
+        log_callback=None,
+    ):
+        self.folder = folder
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_mb * 1024 * 1024 if max_total_mb else None
+        self.compress_after_days = compress_after_days
+        self.interval = interval
+        self.io_limit = io_limit_mb * 1024 * 1024 if io_limit_mb else None
+        self.defer_during_market_hours = defer_during_market_hours
+        self.log_callback = log_callback
+        self.last_result = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, folder, config, log_callback=None):
+        """Create from the "log_retention" section of config.json, unless disabled"""
+        settings = config.get("log_retention", {})
+        if not settings.get("enabled", True):
+            return None
+        return cls(
+            folder,
+            max_age_days=settings.get("max_age_days", 30),
+            max_total_mb=settings.get("max_total_mb", 2048),
+            compress_after_days=settings.get("compress_after_days", 2),
+            interval=settings.get("interval_minutes", 60) * 60.0,
+            io_limit_mb=settings.get("io_limit_mb", 4.0),
+            defer_during_market_hours=settings.get("defer_during_market_hours", True),
+            log_callback=log_callback,
+        )
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        _lower_thread_priority()
+        # Let the manager and terminal finish starting first
+        if self._stop.wait(60.0):
+            return
+        while True:
+            try:
+                result = self.run_pass()
+                if self.log_callback and (result.reclaimed or result.deferred):
+                    self.log_callback(str(result))
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"Log retention pass failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def _files(self):
+        """(path, size, mtime) of every regular file, oldest first"""
+        files = []
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            st = entry.stat()
+                            files.append((entry.path, st.st_size, st.st_mtime))
+                    except OSError:
+                        continue
+        except OSError:
+            return []
+        files.sort(key=lambda f: f[2])
+        return files
+
+    def run_pass(self, now=None, market_open=None):
+        """Apply the policy once; returns a RetentionResult"""
+        started = time.monotonic()
+        now = now or time.time()
+        if market_open is None:
+            market_open = self.defer_during_market_hours and in_market_hours()
+        result = RetentionResult()
+        files = self._files()
+        if files:
+            files.pop()  # The active file
+
+        kept = []
+        for path, size, mtime in files:
+            if self.max_age_days and now - mtime > self.max_age_days * 86400:
+                if self._delete(path):
+                    result.deleted += 1
+                    result.reclaimed += size
+                continue
+            kept.append([path, size, mtime])
+
+        deferred = set()
+        if self.compress_after_days is not None:
+            for entry in kept:
+                path, size, mtime = entry
+                if path.endswith(".gz"):
+                    continue
+                if now - mtime <= self.compress_after_days * 86400:
+                    continue
+                if market_open:
+                    deferred.add(path)
+                    continue
+                if self._stop.is_set():
+                    break
+                compressed_size = self._compress(path, mtime)
+                if compressed_size is not None:
+                    result.compressed += 1
+                    result.reclaimed += size - compressed_size
+                    entry[0], entry[1] = path + ".gz", compressed_size
+
+        # Deleting is cheap, so the size budget is enforced even in market hours
+        if self.max_total_bytes:
+            total = sum(entry[1] for entry in kept)
+            for path, size, _ in kept:
+                if total <= self.max_total_bytes:
+                    break
+                if self._delete(path):
+                    result.deleted += 1
+                    result.reclaimed += size
+                    total -= size
+                    deferred.discard(path)
+
+        result.deferred = len(deferred)
+        result.elapsed = time.monotonic() - started
+        self.last_result = result
+        return result
+
+    def _delete(self, path):
+        try:
+            os.unlink(path)
+            return True
+        except OSError:
+            return False
+
+    def _compress(self, path, mtime):
+        """Gzip a file in place at no more than io_limit bytes per second,
+        keeping its mtime so age-based deletion still applies. Returns the
+        compressed size, or None on failure."""
+        tmp_path = path + ".gz.tmp"
+        started = time.monotonic()
+        done = 0
+        try:
+            with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    done += len(chunk)
+                    if self.io_limit:
+                        ahead = done / self.io_limit - (time.monotonic() - started)
+                        if ahead > 0 and self._stop.wait(ahead):
+                            raise InterruptedError("stopping")
+            os.utime(tmp_path, (mtime, mtime))
+            os.replace(tmp_path, path + ".gz")
+            os.unlink(path)
+            return os.path.getsize(path + ".gz")
+        except (OSError, InterruptedError) as e:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            if self.log_callback and not isinstance(e, InterruptedError):
+                self.log_callback(f"Could not compress {path}: {e}")
+            return None
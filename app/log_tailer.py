@@ -0,0 +1,201 @@
+import collections
+import os
+import re
+import threading
+import time
+
+BLOCK_SIZE = 1024 * 1024
+
+# Leading timestamp a log file adds to messages that are also printed to stdout
+_TIMESTAMP_PREFIX_RE = re.compile(
+    r"^\[?\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\]?\s*"
+)
+
+
+def message_key(line):
+    """Line without surrounding whitespace or a leading timestamp"""
+    line = line.strip()
+    return (
+        _TIMESTAMP_PREFIX_RE.sub("", line, count=1)
+        if line[:1] in "[0123456789"
+        else line
+    )
+
+
+class LogTailer:
+    """Follow the newest log file in a folder, like `tail -F`.
+
+    The tailer keeps the active file open with a byte offset into it and
+    reads whatever was appended since the last poll in large blocks; only
+    complete lines are passed on. It notices rotation (a newer file, or the
+    same name with a new inode), finishing the old file first, and
+    truncation (size below the offset). Lines are held for `delay` seconds before `callback` gets
+    them, so stdout has time to deliver the same line for de-duplication.
+    """
+
+    def __init__(self, folder, callback, poll_interval=0.25, delay=1.0):
+        self.folder = folder
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.delay = delay
+        self.error_callback = None
+        self._file = None
+        self._identity = None  # (st_dev, st_ino) of the open file
+        self._offset = 0
+        self._partial = b""
+        self._pending = collections.deque()  # (read at, line)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, from_end=True):
+        """Start following; existing content is skipped unless from_end=False"""
+        path = self._newest_file()
+        if path:
+            self._open(path, from_end)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+    def _newest_file(self):
+        newest, newest_mtime = None, -1
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not entry.name.endswith((".log", ".txt")):
+                        continue
+                    try:
+                        mtime = entry.stat().st_mtime_ns
+                    except OSError:
+                        continue  # Deleted meanwhile
+                    if mtime > newest_mtime and entry.is_file():
+                        newest, newest_mtime = entry.path, mtime
+        except OSError:
+            return None
+        return newest
+
+    def _open(self, path, from_end=False):
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return
+        self._close()
+        st = os.fstat(f.fileno())
+        self._file = f
+        self._identity = (st.st_dev, st.st_ino)
+        self._offset = st.st_size if from_end else 0
+        self._partial = b""
+
+    def _close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.poll_interval):
+                try:
+                    self.poll()
+                except Exception as e:
+                    if self.error_callback:
+                        self.error_callback(f"Log file tailing failed: {e}")
+            self._emit(flush=True)
+        finally:
+            self._close()
+
+    def poll(self):
+        """Read new lines from the active file and switch files if needed"""
+        if self._file:
+            self._read_new()
+        newest = self._newest_file()
+        if newest is not None:
+            try:
+                st = os.stat(newest)
+                identity = (st.st_dev, st.st_ino)
+            except OSError:
+                identity = None
+            if identity is not None and identity != self._identity:
+                # Rotated. The open handle follows a renamed file, so the old
+                # file was read to its end above.
+                if self._partial:
+                    self._pending.append(
+                        (time.monotonic(), self._decode(self._partial))
+                    )
+                self._open(newest)
+                self._read_new()
+        self._emit()
+
+    def _read_new(self):
+        f = self._file
+        size = os.fstat(f.fileno()).st_size
+        if size < self._offset:
+            # Truncated in place: start over from the beginning
+            self._offset = 0
+            self._partial = b""
+        if size == self._offset:
+            return
+        now = time.monotonic()
+        pending = self._pending
+        f.seek(self._offset)
+        while True:
+            block = f.read(BLOCK_SIZE)
+            if not block:
+                break
+            self._offset += len(block)
+            lines = (self._partial + block).split(b"\n")
+            self._partial = lines.pop()  # Incomplete last line, if any
+            for line in lines:
+                pending.append((now, self._decode(line)))
+
+    @staticmethod
+    def _decode(line):
+        return line.rstrip(b"\r").decode("utf-8", errors="replace")
+
+    def _emit(self, flush=False):
+        pending = self._pending
+        cutoff = time.monotonic() - self.delay
+        while pending and (flush or pending[0][0] <= cutoff):
+            self.callback(pending.popleft()[1])
+
+
+class RecentLines:
+    """Bounded multiset of recently seen message keys, for de-duplicating
+    log file lines against the same messages already read from stdout"""
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._order = collections.deque()
+        self._counts = collections.Counter()
+        self._lock = threading.Lock()
+
+    def add(self, line):
+        key = message_key(line)
+        if not key:
+            return
+        with self._lock:
+            self._order.append(key)
+            self._counts[key] += 1
+            if len(self._order) > self.capacity:
+                self._forget(self._order.popleft())
+
+    def consume(self, line):
+        """True (and forget one occurrence) if the line was seen on stdout"""
+        key = message_key(line)
+        if not key:
+            return True  # Blank lines add nothing
+        with self._lock:
+            if key in self._counts:
+                self._forget(key)
+                return True
+        return False
+
+    def _forget(self, key):
+        remaining = self._counts.get(key, 0) - 1
+        if remaining > 0:
+            self._counts[key] = remaining
+        else:
+            self._counts.pop(key, None)
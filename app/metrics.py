@@ -0,0 +1,365 @@
+import bisect
+import threading
+import time
+import weakref
+
+# Manager process start, for theta_manager_uptime_seconds
+_STARTED_AT = time.monotonic()
+
+# Stop latency buckets in seconds; stop_terminal gives up after ~10s
+STOP_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0)
+
+
+class Counter:
+    """Monotonic counter. Updates are plain attribute writes and scrapes
+    never take a lock, so each counter must have a single writer at a time:
+    one thread, or several serialized by the owner's lock (as
+    TerminalManager._handle_output_line does)."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Histogram:
+    """Cumulative histogram over fixed, preallocated buckets"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RateMeter:
+    """Events per second over a sliding window of one-second buckets"""
+
+    __slots__ = ("window", "_counts", "_seconds")
+
+    def __init__(self, window=10):
+        self.window = window
+        self._counts = [0] * window
+        self._seconds = [0] * window
+
+    def mark(self, amount=1):
+        second = int(time.monotonic())
+        slot = second % self.window
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = amount
+        else:
+            self._counts[slot] += amount
+
+    def rate(self):
+        """Average over the completed seconds of the window"""
+        now = int(time.monotonic())
+        total = sum(
+            count
+            for second, count in zip(self._seconds, self._counts)
+            if now - self.window < second < now
+        )
+        return total / (self.window - 1)
+
+
+class TerminalMetrics:
+    """Counters a TerminalManager updates on its hot paths.
+
+    State gauges (uptime, readiness, JVM CPU/RSS) are read from the manager
+    when scraped rather than tracked, so they cost nothing between scrapes.
+    """
+
+    def __init__(self, manager):
+        self._manager = weakref.ref(manager)
+        self.output_lines = Counter()
+        self.output_rate = RateMeter()
+        # One counter per restarting thread (see Counter): restart_terminal
+        # (under its lock), the pool's supervisor and the failover monitor
+        self.restarts = Counter()
+        self.supervisor_restarts = Counter()
+        self.failover_restarts = Counter()
+        self.downloads = Counter()
+        self.download_bytes = Counter()
+        self.stop_seconds = Histogram(STOP_BUCKETS)
+
+    def restart_count(self):
+        return (
+            self.restarts.value
+            + self.supervisor_restarts.value
+            + self.failover_restarts.value
+        )
+
+    def collect(self):
+        """Yield (name, type, help, labels, value) for this terminal"""
+        manager = self._manager()
+        if manager is None:
+            return
+        labels = {"instance": manager.name}
+        running = manager.running
+        uptime = (
+            time.monotonic() - manager.started_at
+            if running and manager.started_at
+            else 0.0
+        )
+        yield (
+            "theta_terminal_running",
+            "gauge",
+            "1 if the terminal process is running",
+            labels,
+            int(running),
+        )
+        yield (
+            "theta_terminal_ready",
+            "gauge",
+            "1 if the terminal's HTTP port accepts connections",
+            labels,
+            int(manager.is_ready()),
+        )
+        yield (
+            "theta_terminal_uptime_seconds",
+            "gauge",
+            "Seconds since the running terminal was launched",
+            labels,
+            uptime,
+        )
+        if manager.ready_at and manager.started_at:
+            yield (
+                "theta_terminal_time_to_ready_seconds",
+                "gauge",
+                "Launch to ready time of the last start",
+                labels,
+                manager.ready_at - manager.started_at,
+            )
+        yield (
+            "theta_terminal_launches_total",
+            "counter",
+            "Terminal process launches",
+            labels,
+            manager.launch_count,
+        )
+        for reason, counter in (
+            ("manual", self.restarts),
+            ("supervisor", self.supervisor_restarts),
+            ("failover", self.failover_restarts),
+        ):
+            yield (
+                "theta_terminal_restarts_total",
+                "counter",
+                "Restarts by reason (manual includes config changes)",
+                dict(labels, reason=reason),
+                counter.value,
+            )
+        yield (
+            "theta_terminal_output_lines_total",
+            "counter",
+            "Lines read from the terminal's output",
+            labels,
+            self.output_lines.value,
+        )
+        yield (
+            "theta_terminal_output_lines_per_second",
+            "gauge",
+            "Output lines per second over the last few seconds",
+            labels,
+            self.output_rate.rate(),
+        )
+        yield (
+            "theta_terminal_downloads_total",
+            "counter",
+            "JAR downloads completed",
+            labels,
+            self.downloads.value,
+        )
+        yield (
+            "theta_terminal_download_bytes_total",
+            "counter",
+            "Bytes of JAR downloaded",
+            labels,
+            self.download_bytes.value,
+        )
+        yield (
+            "theta_terminal_stop_seconds",
+            "histogram",
+            "Time taken by stop_terminal",
+            labels,
+            self.stop_seconds,
+        )
+
+        sampler = manager.resource_sampler
+        sample = sampler.latest() if running and sampler else None
+        if sample is not None:
+            yield (
+                "theta_terminal_jvm_cpu_percent",
+                "gauge",
+                "CPU usage of the terminal JVM",
+                labels,
+                sample.cpu_percent,
+            )
+            yield (
+                "theta_terminal_jvm_rss_bytes",
+                "gauge",
+                "Resident memory of the terminal JVM",
+                labels,
+                sample.rss_bytes,
+            )
+
+        watcher = manager.config_watcher
+        if watcher is not None:
+            stats = watcher.stats()
+            yield (
+                "theta_config_watcher_changes_total",
+                "counter",
+                "Config file changes detected",
+                labels,
+                stats["changes"],
+            )
+            yield (
+                "theta_config_watcher_cpu_seconds_total",
+                "counter",
+                "CPU time used by the config watcher thread",
+                labels,
+                stats["cpu_seconds"],
+            )
+            if stats["detection_latency_ms_last"] is not None:
+                yield (
+                    "theta_config_watcher_detection_latency_seconds",
+                    "gauge",
+                    "Delay between the last config write and its detection",
+                    labels,
+                    stats["detection_latency_ms_last"] / 1000,
+                )
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_sample(name, labels, value):
+    if labels:
+        label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+        name = f"{name}{{{label_text}}}"
+    if isinstance(value, float):
+        value = repr(value)
+    return f"{name} {value}"
+
+
+def _format_histogram(name, labels, histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.bounds + ("+Inf",), histogram.counts):
+        cumulative += count
+        lines.append(
+            _format_sample(f"{name}_bucket", dict(labels, le=str(bound)), cumulative)
+        )
+    lines.append(_format_sample(f"{name}_sum", labels, histogram.sum))
+    lines.append(_format_sample(f"{name}_count", labels, histogram.count))
+    return lines
+
+
+class MetricsRegistry:
+    """Collectors rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        # Collectors go away with their owner (e.g. a removed terminal)
+        self._collectors = weakref.WeakSet()
+
+    def register(self, collector):
+        self._collectors.add(collector)
+        return collector
+
+    def unregister(self, collector):
+        self._collectors.discard(collector)
+
+    def render(self):
+        families = {}  # name -> [header lines, sample lines], in first-seen order
+        samples = [
+            (
+                "theta_manager_uptime_seconds",
+                "gauge",
+                "Seconds since the manager started",
+                {},
+                time.monotonic() - _STARTED_AT,
+            )
+        ]
+        for collector in list(self._collectors):
+            samples.extend(collector.collect())
+
+        for name, kind, help_text, labels, value in samples:
+            family = families.get(name)
+            if family is None:
+                family = families[name] = [
+                    [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"],
+                    [],
+                ]
+            if kind == "histogram":
+                family[1].extend(_format_histogram(name, labels, value))
+            else:
+                family[1].append(_format_sample(name, labels, value))
+
+        lines = []
+        for headers, sample_lines in families.values():
+            lines.extend(headers)
+            lines.extend(sample_lines)
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry; every TerminalManager registers its TerminalMetrics here
+registry = MetricsRegistry()
+
+
+def _handler_class():
+    # http.server is imported only when the exporter starts: terminal_manager
+    # imports this module before the GUI's first paint
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = self.server.registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+class MetricsServer:
+    """Serve /metrics for Prometheus on a local port"""
+
+    def __init__(self, port, host="127.0.0.1", metrics_registry=None):
+        from http.server import ThreadingHTTPServer
+
+        self.server = ThreadingHTTPServer((host, port), _handler_class())
+        self.server.daemon_threads = True
+        self.server.registry = metrics_registry or registry
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
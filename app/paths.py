@@ -0,0 +1,8 @@
+import os
+
+
+def manager_data_dir():
+    """Per-user directory for the manager's own state (locks, pidfiles)"""
+    path = os.path.join(os.path.expanduser("~"), "ThetaData", "TerminalManager")
+    os.makedirs(path, exist_ok=True)
+    return path
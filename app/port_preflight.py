@@ -0,0 +1,148 @@
+import errno
+import os
+import socket
+import sys
+
+
+class PortConflict:
+    __slots__ = ("key", "port", "holder")
+
+    def __init__(self, key, port, holder=None):
+        self.key = key  # e.g. "HTTP_PORT"
+        self.port = port
+        self.holder = holder  # Description of the owning process, if known
+
+    def __str__(self):
+        owner = f" by {self.holder}" if self.holder else ""
+        return f"Port {self.port} ({self.key}) is already in use{owner}"
+
+
+def _bind_fails(family, port):
+    try:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+    except OSError:
+        return False  # e.g. IPv6 disabled
+    try:
+        if not sys.platform.startswith("win"):
+            # Like Java's ServerSocket: TIME_WAIT leftovers don't count as in use
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if family == socket.AF_INET6:
+            sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+        sock.bind(("", port))
+        return False
+    except OSError as e:
+        return e.errno in (errno.EADDRINUSE, getattr(errno, "WSAEADDRINUSE", -1))
+    finally:
+        sock.close()
+
+
+def _port_in_use(port):
+    """True if a listener already owns the port. The JVM binds every interface,
+    usually as a dual-stack IPv6 socket, so both wildcards are tried."""
+    if _bind_fails(socket.AF_INET, port):
+        return True
+    return socket.has_ipv6 and _bind_fails(socket.AF_INET6, port)
+
+
+def _listening_inodes(ports):
+    """{socket inode: port} for the given ports in LISTEN state (Linux)"""
+    inodes = {}
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    port = int(fields[1].rsplit(":", 1)[1], 16)
+                    if fields[3] == "0A" and port in ports:  # 0A: TCP_LISTEN
+                        inodes[fields[9]] = port
+        except (OSError, StopIteration, IndexError, ValueError):
+            continue
+    return inodes
+
+
+def _describe_process(pid):
+    """Process name and PID; the JAR name for JVMs. Never the full command
+    line, which for a terminal includes credentials."""
+    try:
+        with open(f"/proc/{pid}/comm") as f:
+            name = f.read().strip()
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            args = f.read().split(b"\0")
+    except OSError:
+        return f"PID {pid}"
+    jars = [
+        os.path.basename(a.decode(errors="replace"))
+        for a in args
+        if a.endswith(b".jar")
+    ]
+    if jars:
+        name = f"{name} {jars[0]}"
+    return f"{name} (PID {pid})"
+
+
+def _find_holders_proc(ports):
+    """{port: description} by matching socket inodes to /proc/<pid>/fd links"""
+    inodes = _listening_inodes(set(ports))
+    holders = {}
+    if not inodes:
+        return holders
+    targets = {f"socket:[{inode}]": port for inode, port in inodes.items()}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        fd_dir = f"/proc/{entry}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue  # Exited, or another user's process
+        for fd in fds:
+            try:
+                port = targets.get(os.readlink(f"{fd_dir}/{fd}"))
+            except OSError:
+                continue
+            if port is not None and port not in holders:
+                holders[port] = _describe_process(entry)
+        if len(holders) == len(set(inodes.values())):
+            break
+    return holders
+
+
+def _find_holders_psutil(ports):
+    try:
+        import psutil
+    except ImportError:
+        return {}
+    holders = {}
+    try:
+        for conn in psutil.net_connections(kind="tcp"):
+            if conn.status == psutil.CONN_LISTEN and conn.laddr.port in ports:
+                if conn.pid:
+                    try:
+                        name = psutil.Process(conn.pid).name()
+                    except psutil.Error:
+                        name = "process"
+                    holders[conn.laddr.port] = f"{name} (PID {conn.pid})"
+    except (psutil.Error, OSError):
+        pass
+    return holders
+
+
+def find_port_holders(ports):
+    """Describe the processes listening on `ports`, where the OS allows it"""
+    if os.path.isdir("/proc/net"):
+        return _find_holders_proc(ports)
+    return _find_holders_psutil(ports)
+
+
+def check_ports(ports):
+    """Return a PortConflict for every port in {key: port} that is taken.
+
+    Bind tests take microseconds per port; owners are only looked up (in one
+    pass over /proc for all busy ports) when there is a conflict.
+    """
+    busy = {key: port for key, port in ports.items() if _port_in_use(port)}
+    if not busy:
+        return []
+    holders = find_port_holders(set(busy.values()))
+    return [PortConflict(key, port, holders.get(port)) for key, port in busy.items()]
@@ -0,0 +1,258 @@
+import os
+import shutil
+import tempfile
+import threading
+
+# Java reads .properties files as ISO-8859-1; reading and writing with the same
+# encoding round-trips unchanged lines byte for byte.
+ENCODING = "latin-1"
+
+_UNESCAPES = {"t": "\t", "n": "\n", "r": "\r", "f": "\f"}
+
+_cache = {}  # path -> (mtime_ns, size, PropertiesDocument)
+_cache_lock = threading.Lock()
+
+
+class _Entry:
+    __slots__ = ("key", "value", "raw")
+
+    def __init__(self, key, value, raw):
+        self.key = key
+        self.value = value
+        self.raw = raw  # Original physical lines, or None once modified
+
+
+class PropertiesDocument:
+    """Ordered properties with the comments and blank lines around them"""
+
+    def __init__(self, newline="\n"):
+        self.newline = newline
+        self._items = []  # _Entry objects and raw comment/blank line strings
+        self._index = {}  # key -> _Entry (last definition wins, as in Java)
+
+    @classmethod
+    def parse(cls, text):
+        doc = cls("\r\n" if "\r\n" in text else "\n")
+        lines = text.splitlines(keepends=True)
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            stripped = line.lstrip(" \t\f")
+            if not stripped.strip() or stripped[0] in "#!":
+                doc._items.append(line)
+                i += 1
+                continue
+
+            # Collect continuation lines (odd number of trailing backslashes)
+            raw = [line]
+            logical = stripped.rstrip("\r\n")
+            while _continues(logical) and i + 1 < len(lines):
+                i += 1
+                raw.append(lines[i])
+                logical = logical[:-1] + lines[i].lstrip(" \t\f").rstrip("\r\n")
+            if _continues(logical):
+                logical = logical[:-1]
+            i += 1
+
+            key, value = _split_logical_line(logical)
+            entry = _Entry(key, value, raw)
+            doc._items.append(entry)
+            doc._index[key] = entry
+        return doc
+
+    def get(self, key, default=None):
+        entry = self._index.get(key)
+        return entry.value if entry else default
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __getitem__(self, key):
+        return self._index[key].value
+
+    def keys(self):
+        return list(self._index)
+
+    def items(self):
+        return [(key, entry.value) for key, entry in self._index.items()]
+
+    def set(self, key, value):
+        """Set a value in place, or append it if the key is new"""
+        entry = self._index.get(key)
+        if entry is not None:
+            if entry.value != value:
+                entry.value = value
+                entry.raw = None
+            return
+        entry = _Entry(key, value, None)
+        if self._items and not self._ends_with_newline():
+            self._items.append(self.newline)
+        self._items.append(entry)
+        self._index[key] = entry
+
+    def remove(self, key):
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._items = [
+                item
+                for item in self._items
+                if not (isinstance(item, _Entry) and item.key == key)
+            ]
+
+    def copy(self):
+        return PropertiesDocument.parse(self.to_text())
+
+    def to_text(self):
+        parts = []
+        for item in self._items:
+            if isinstance(item, str):
+                parts.append(item)
+            elif item.raw is not None:
+                parts.extend(item.raw)
+            else:
+                parts.append(
+                    f"{_escape(item.key, True)}={_escape(item.value, False)}"
+                    f"{self.newline}"
+                )
+        return "".join(parts)
+
+    def _ends_with_newline(self):
+        last = self._items[-1]
+        if isinstance(last, _Entry):
+            return last.raw is None or last.raw[-1].endswith("\n")
+        return last.endswith("\n")
+
+
+def _continues(line):
+    trailing = len(line) - len(line.rstrip("\\"))
+    return trailing % 2 == 1
+
+
+def _split_logical_line(line):
+    """Split a logical line into (key, value) following java.util.Properties"""
+    i = 0
+    length = len(line)
+    while i < length:
+        c = line[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c in "=: \t\f":
+            break
+        i += 1
+    key = line[:i]
+    # Skip whitespace, at most one separator, then whitespace again
+    while i < length and line[i] in " \t\f":
+        i += 1
+    if i < length and line[i] in "=:":
+        i += 1
+    while i < length and line[i] in " \t\f":
+        i += 1
+    return _unescape(key), _unescape(line[i:])
+
+
+def _unescape(text):
+    if "\\" not in text:
+        return text
+    out = []
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c != "\\" or i + 1 >= len(text):
+            out.append(c)
+            i += 1
+            continue
+        nxt = text[i + 1]
+        if nxt == "u" and i + 6 <= len(text):
+            try:
+                out.append(chr(int(text[i + 2 : i + 6], 16)))
+                i += 6
+                continue
+            except ValueError:
+                pass
+        out.append(_UNESCAPES.get(nxt, nxt))
+        i += 2
+    return "".join(out)
+
+
+def _escape(text, is_key):
+    out = []
+    for index, c in enumerate(text):
+        if c == "\\":
+            out.append("\\\\")
+        elif c == "\t":
+            out.append("\\t")
+        elif c == "\n":
+            out.append("\\n")
+        elif c == "\r":
+            out.append("\\r")
+        elif c == "\f":
+            out.append("\\f")
+        elif c == " " and (is_key or index == 0):
+            out.append("\\ ")
+        elif c in "=:#!" and (is_key or index == 0):
+            out.append("\\" + c)
+        elif ord(c) > 0xFF:
+            out.append(f"\\u{ord(c):04x}")
+        else:
+            out.append(c)
+    return "".join(out)
+
+
+def read_properties(path):
+    """Parse a properties file, reusing the cached result if it is unchanged.
+
+    The returned document is shared with the cache; use `copy()` before
+    modifying it, or use `update_properties`.
+    """
+    st = os.stat(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+    with open(path, "r", encoding=ENCODING, newline="") as f:
+        doc = PropertiesDocument.parse(f.read())
+    with _cache_lock:
+        _cache[path] = (st.st_mtime_ns, st.st_size, doc)
+    return doc
+
+
+def write_properties(path, doc):
+    """Atomically replace the file at `path` with the document's contents"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding=ENCODING, newline="") as f:
+            f.write(doc.to_text())
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    st = os.stat(path)
+    with _cache_lock:
+        _cache[path] = (st.st_mtime_ns, st.st_size, doc)
+
+
+def update_properties(path, updates):
+    """Set several keys at once with a single atomic write.
+
+    Returns the new document. Keys mapped to None are removed.
+    """
+    doc = read_properties(path).copy()
+    for key, value in updates.items():
+        if value is None:
+            doc.remove(key)
+        else:
+            doc.set(key, value)
+    write_properties(path, doc)
+    return doc
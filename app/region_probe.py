@@ -0,0 +1,183 @@
+import math
+import socket
+import statistics
+import threading
+import time
+from collections import deque
+
+# Host lists used when config_0.properties does not define a region yet
+DEFAULT_REGION_HOSTS = {
+    "MDDS_NJ_HOSTS": "nj-a.thetadata.us:12000,nj-b.thetadata.us:12000",
+    "FPSS_NJ_HOSTS": "nj-a.thetadata.us:20000,nj-a.thetadata.us:20001,"
+    "nj-b.thetadata.us:20000,nj-b.thetadata.us:20001",
+}
+
+NON_PRODUCTION_MARKERS = ("STAGE", "DEV")
+
+
+def parse_host_list(value):
+    """Parse "host:port,host:port" into [(host, port), ...]"""
+    hosts = []
+    for item in value.split(","):
+        host, sep, port = item.strip().rpartition(":")
+        if sep and host and port.isdigit():
+            hosts.append((host, int(port)))
+    return hosts
+
+
+def is_production_region(region):
+    return not any(marker in region for marker in NON_PRODUCTION_MARKERS)
+
+
+class RollingStats:
+    """Latency statistics over the most recent probe results"""
+
+    def __init__(self, window=20):
+        self.samples = deque(maxlen=window)  # seconds, or None for failure
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def _ok(self):
+        return [s for s in self.samples if s is not None]
+
+    @property
+    def count(self):
+        return len(self.samples)
+
+    @property
+    def loss(self):
+        """Fraction of failed probes in the window"""
+        if not self.samples:
+            return 0.0
+        return 1.0 - len(self._ok()) / len(self.samples)
+
+    @property
+    def median(self):
+        ok = self._ok()
+        return statistics.median(ok) if ok else math.inf
+
+    @property
+    def minimum(self):
+        ok = self._ok()
+        return min(ok) if ok else math.inf
+
+    @property
+    def jitter(self):
+        ok = self._ok()
+        return statistics.pstdev(ok) if len(ok) > 1 else 0.0
+
+    def to_dict(self):
+        return {
+            "median_ms": _ms(self.median),
+            "min_ms": _ms(self.minimum),
+            "jitter_ms": _ms(self.jitter),
+            "loss": self.loss,
+            "samples": self.count,
+        }
+
+
+def _ms(seconds):
+    return None if math.isinf(seconds) else seconds * 1000
+
+
+class HostStats:
+    def __init__(self, host, port, window):
+        self.host = host
+        self.port = port
+        self.address = None  # Resolved sockaddr, cached after the first probe
+        self.connect = RollingStats(window)  # DNS resolution + TCP handshake
+        self.rtt = RollingStats(window)  # TCP handshake only
+
+
+class RegionProbe:
+    """Measure TCP connect and round-trip latency to each region's hosts"""
+
+    def __init__(self, region_hosts, timeout=1.5, window=20, max_workers=16):
+        # region_hosts: {region: [(host, port), ...]}
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.regions = {
+            region: [HostStats(host, port, window) for host, port in hosts]
+            for region, hosts in region_hosts.items()
+        }
+
+    def _probe_host(self, stats):
+        """Probe a single host once and record the result"""
+        started = time.perf_counter()
+        try:
+            if stats.address is None:
+                info = socket.getaddrinfo(
+                    stats.host, stats.port, type=socket.SOCK_STREAM
+                )[0]
+                family, address = info[0], info[4]
+            else:
+                family, address = stats.address
+            resolved = time.perf_counter()
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(address)
+            finished = time.perf_counter()
+        except OSError:
+            with self.lock:
+                stats.connect.add(None)
+                stats.rtt.add(None)
+            return
+        with self.lock:
+            stats.address = (family, address)
+            stats.connect.add(finished - started)
+            stats.rtt.add(finished - resolved)
+
+    def probe(self, rounds=3, interval=0.1):
+        """Probe every host concurrently, `rounds` times"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        hosts = [h for region_hosts in self.regions.values() for h in region_hosts]
+        if not hosts:
+            return self.results()
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(hosts))
+        ) as executor:
+            for i in range(rounds):
+                list(executor.map(self._probe_host, hosts))
+                if i < rounds - 1:
+                    time.sleep(interval)
+        return self.results()
+
+    def region_latency(self, region):
+        """Median RTT of the region's best host, in seconds (inf if unreachable)"""
+        with self.lock:
+            hosts = self.regions.get(region, [])
+            return min((h.rtt.median for h in hosts), default=math.inf)
+
+    def results(self):
+        """Per-region summary: best median RTT plus per-host statistics"""
+        summary = {}
+        for region, hosts in self.regions.items():
+            with self.lock:
+                host_results = [
+                    {
+                        "host": f"{h.host}:{h.port}",
+                        "rtt": h.rtt.to_dict(),
+                        "connect": h.connect.to_dict(),
+                    }
+                    for h in hosts
+                ]
+            summary[region] = {
+                "latency_ms": _ms(self.region_latency(region)),
+                "hosts": host_results,
+            }
+        return summary
+
+    def fastest(self, candidates, production_only=True):
+        """Return the reachable candidate region with the lowest latency"""
+        best = None
+        best_latency = math.inf
+        for region in candidates:
+            if production_only and not is_production_region(region):
+                continue
+            latency = self.region_latency(region)
+            if latency < best_latency:
+                best, best_latency = region, latency
+        return best
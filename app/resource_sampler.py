@@ -0,0 +1,124 @@
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+
+class ResourceSample:
+    __slots__ = ("timestamp", "cpu_percent", "rss_bytes")
+
+    def __init__(self, timestamp, cpu_percent, rss_bytes):
+        self.timestamp = timestamp  # time.monotonic() of the sample
+        self.cpu_percent = cpu_percent
+        self.rss_bytes = rss_bytes
+
+
+class ResourceSampler:
+    """Periodically sample CPU and RSS of a process (the terminal JVM)"""
+
+    def __init__(self, pid, interval=1.0, max_samples=3600):
+        self.pid = pid
+        self.interval = interval
+        self.samples = deque(maxlen=max_samples)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._last_cpu_seconds = None
+        self._last_timestamp = None
+        self._psutil_process = None
+
+    def start(self):
+        """Start sampling in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1.0)
+
+    def is_running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def latest(self):
+        """Return the most recent sample or None"""
+        try:
+            return self.samples[-1]
+        except IndexError:
+            return None
+
+    def samples_between(self, start, end):
+        """Return the samples taken between two monotonic timestamps"""
+        return [s for s in list(self.samples) if start <= s.timestamp <= end]
+
+    def sample_once(self):
+        """Take a single sample; returns None if the process is gone"""
+        reading = self._read_process()
+        if reading is None:
+            return None
+        cpu_seconds, rss_bytes = reading
+        now = time.monotonic()
+
+        cpu_percent = 0.0
+        if self._last_cpu_seconds is not None and now > self._last_timestamp:
+            cpu_percent = (
+                (cpu_seconds - self._last_cpu_seconds)
+                / (now - self._last_timestamp)
+                * 100.0
+            )
+        self._last_cpu_seconds = cpu_seconds
+        self._last_timestamp = now
+
+        sample = ResourceSample(now, cpu_percent, rss_bytes)
+        self.samples.append(sample)
+        return sample
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if self.sample_once() is None:
+                break
+            self._stop_event.wait(self.interval)
+
+    def _read_process(self):
+        """Return (cpu_seconds, rss_bytes) for the process.
+
+        /proc on Linux; psutil (a dependency, but optional when running from
+        source) elsewhere. Without psutil there are no samples off Linux.
+        """
+        if sys.platform.startswith("linux"):
+            return self._read_proc()
+        return self._read_psutil()
+
+    def _read_proc(self):
+        try:
+            with open(f"/proc/{self.pid}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            return None
+        # The command name may contain spaces, so split after the closing paren
+        fields = stat[stat.rfind(b")") + 2 :].split()
+        # proc(5) field N (1-based) is now at index N - 3
+        utime = int(fields[11])
+        stime = int(fields[12])
+        rss_pages = int(fields[21])
+        return (utime + stime) / self._clock_ticks, rss_pages * self._page_size
+
+    def _read_psutil(self):
+        try:
+            import psutil
+        except ImportError:
+            return None
+        try:
+            if self._psutil_process is None:
+                self._psutil_process = psutil.Process(self.pid)
+            times = self._psutil_process.cpu_times()
+            rss = self._psutil_process.memory_info().rss
+            return times.user + times.system, rss
+        except psutil.Error:
+            return None
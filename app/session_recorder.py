@@ -0,0 +1,145 @@
+import os
+import struct
+import threading
+import time
+
+# File layout: MAGIC, start time (little-endian double, epoch seconds), then
+# one record per line: varint microseconds since the previous line, varint
+# byte length, UTF-8 text.
+MAGIC = b"TTREC\x01"
+SUFFIX = ".ttrec"
+
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class SessionRecorder:
+    """Record terminal output lines with their timing.
+
+    record() is called from the output reader thread; it encodes the line
+    and appends it to a buffered file, a few microseconds per line.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lines = 0
+        self._file = None
+        self._last = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "wb", buffering=256 * 1024)
+        self._file.write(MAGIC + struct.pack("<d", time.time()))
+        self._last = time.monotonic()
+        return self
+
+    def record(self, line):
+        now = time.monotonic()
+        data = line.encode("utf-8", errors="replace")
+        with self._lock:
+            if self._file is None:
+                return
+            delta = int((now - self._last) * 1_000_000)
+            self._last = now
+            self._file.write(_varint(delta) + _varint(len(data)) + data)
+            self.lines += 1
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+def read_recording(path, chunk_size=1024 * 1024):
+    """Yield (seconds since recording started, line) for every record.
+
+    The file is streamed in chunks, so recordings of any size replay in
+    constant memory. A recording cut short by a crash ends at its last
+    complete record.
+    """
+    with open(path, "rb") as f:
+        header = f.read(len(MAGIC) + 8)
+        if not header.startswith(MAGIC) or len(header) < len(MAGIC) + 8:
+            raise ValueError(f"{path} is not a session recording")
+        data = b""
+        pos = 0
+        offset_us = 0
+        while True:
+            try:
+                delta, start = _read_varint(data, pos)
+                length, start = _read_varint(data, start)
+                if start + length > len(data):
+                    raise IndexError
+            except IndexError:
+                more = f.read(chunk_size)
+                if not more:
+                    return
+                data = data[pos:] + more
+                pos = 0
+                continue
+            offset_us += delta
+            yield offset_us / 1_000_000, data[start : start + length].decode(
+                "utf-8", errors="replace"
+            )
+            pos = start + length
+
+
+def recording_start_time(path):
+    """Wall-clock time (epoch seconds) the recording started"""
+    with open(path, "rb") as f:
+        header = f.read(len(MAGIC) + 8)
+    if not header.startswith(MAGIC) or len(header) < len(MAGIC) + 8:
+        raise ValueError(f"{path} is not a session recording")
+    return struct.unpack_from("<d", header, len(MAGIC))[0]
+
+
+def replay(path, sink, speed=1.0, stop_event=None):
+    """Feed a recording's lines to sink(line) with the recorded timing.
+
+    speed: 1.0 is real time, N is N times faster, None is as fast as
+    possible. Returns (lines, elapsed seconds).
+    """
+    started = time.monotonic()
+    lines = 0
+    for offset, line in read_recording(path):
+        if stop_event is not None and stop_event.is_set():
+            break
+        if speed:
+            wait = started + offset / speed - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        sink(line)
+        lines += 1
+    return lines, time.monotonic() - started
+
+
+def prune_recordings(folder, keep):
+    """Delete all but the newest `keep` recordings in a folder"""
+    try:
+        names = sorted(n for n in os.listdir(folder) if n.endswith(SUFFIX))
+    except OSError:
+        return
+    for name in names[: max(0, len(names) - keep)]:
+        try:
+            os.unlink(os.path.join(folder, name))
+        except OSError:
+            pass
@@ -0,0 +1,315 @@
+import socket
+import threading
+import time
+from collections import deque
+
+
+class PortForwarder:
+    """Forward a stable local port to whichever terminal is active"""
+
+    def __init__(self, listen_port, target_port, host="127.0.0.1"):
+        self.host = host
+        self.listen_port = listen_port
+        self.target_port = target_port  # Switched on failover
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        self._server = socket.create_server((self.host, self.listen_port))
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server:
+            self._server.close()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._connect, args=(client,), daemon=True).start()
+
+    def _connect(self, client):
+        try:
+            upstream = socket.create_connection((self.host, self.target_port), 5.0)
+        except OSError:
+            client.close()
+            return
+        upstream.settimeout(None)
+        for source, dest in ((client, upstream), (upstream, client)):
+            threading.Thread(
+                target=self._pipe, args=(source, dest), daemon=True
+            ).start()
+
+    @staticmethod
+    def _pipe(source, dest):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                dest.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (source, dest):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sock.close()
+
+
+class FailoverManager:
+    """Keep a pre-launched standby terminal and promote it when the active fails.
+
+    Both terminals are TerminalPool instances with their own config index and
+    ports. The active one is health-checked (process alive and HTTP port
+    accepting connections); after `failure_threshold` failed checks the standby
+    is promoted and a new standby is rebuilt in the background. With a
+    `public_port`, clients connect through a forwarder that follows the active
+    terminal, so failover is transparent to them.
+
+    Once attached, the pool routes start/stop/restart of either instance to
+    the pair (start_service, stop_service), so a user stopping "primary"
+    after a failover stops whichever terminal is serving.
+    """
+
+    def __init__(
+        self,
+        pool,
+        active_name,
+        standby_name,
+        public_port=None,
+        check_interval=1.0,
+        failure_threshold=2,
+        serve_timeout=60.0,
+        log_callback=None,
+    ):
+        self.pool = pool
+        self.active = pool.get(active_name)
+        self.standby = pool.get(standby_name)
+        # Roles the pair starts in; restored whenever the service stops
+        self.primary = self.active
+        self.secondary = self.standby
+        self.check_interval = check_interval
+        self.failure_threshold = failure_threshold
+        # Seconds a promoted or restarted terminal gets to accept connections
+        self.serve_timeout = serve_timeout
+        self.log_callback = log_callback
+        self.failover_times = deque(maxlen=50)  # seconds, detection to serving
+        self.failovers = 0
+        self.forwarder = None
+        if public_port:
+            self.forwarder = PortForwarder(public_port, self.active.http_port)
+        self._failures = 0
+        self._next_standby_launch = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Held while the standby is launched or rebuilt, so the monitor and a
+        # rebuild never launch the same manager twice
+        self._standby_lock = threading.Lock()
+
+        # Failover replaces the pool's blind restarts for these two instances
+        pool.auto_restart[active_name] = False
+        pool.auto_restart[standby_name] = False
+        pool.failover = self
+
+    @classmethod
+    def from_config(cls, pool, config, log_callback=None):
+        """Create from the "standby" section of config.json, if enabled"""
+        standby = config.get("standby")
+        if not standby or not standby.get("enabled", True):
+            return None
+        spec = dict(standby, name="standby", auto_restart=False)
+        spec.setdefault("config_index", 9)
+        pool.add_from_spec(spec, config)
+        return cls(
+            pool,
+            "primary",
+            "standby",
+            public_port=standby.get("public_port"),
+            check_interval=standby.get("check_interval", 1.0),
+            failure_threshold=standby.get("failure_threshold", 2),
+            serve_timeout=standby.get("serve_timeout", 60.0),
+            log_callback=log_callback,
+        )
+
+    def _log(self, message):
+        if self.log_callback:
+            self.log_callback(f"[failover] {message}")
+
+    def start(self):
+        """Start the forwarder and the health monitor"""
+        if self.forwarder:
+            self.forwarder.start()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._monitor, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.forwarder:
+            self.forwarder.stop()
+
+    def manages(self, name):
+        return name in (self.primary.name, self.secondary.name)
+
+    def _reset_roles(self):
+        self.active, self.standby = self.primary, self.secondary
+        if self.forwarder:
+            self.forwarder.target_port = self.active.http_port
+
+    def start_service(self):
+        """Start the active terminal; the monitor then warms a standby"""
+        with self._lock:
+            if self.active.running:
+                return True
+            self._reset_roles()
+            active = self.active
+            if active.running:
+                return True
+            return active.start_terminal(active.username, active.password)
+
+    def stop_service(self):
+        """Stop both terminals, whichever one is serving, and restore the
+        original roles so the next start launches the primary"""
+        with self._lock, self._standby_lock:
+            ok = True
+            for manager in (self.active, self.standby):
+                if manager.running:
+                    ok = manager.stop_terminal() and ok
+            self._failures = 0
+            self._reset_roles()
+            return ok
+
+    def restart_service(self):
+        self.stop_service()
+        return self.start_service()
+
+    def _healthy(self, manager):
+        if not manager.running or manager.has_crashed():
+            return False
+        if not manager.ready:
+            # Still starting up; only the process liveness counts for now
+            return True
+        return manager.check_port(timeout=self.check_interval)
+
+    def _monitor(self):
+        while not self._stop_event.wait(self.check_interval):
+            # Keep a standby warming whenever the active one is serving
+            self._launch_standby()
+
+            if not self.active.expected_running:
+                self._failures = 0
+                # The active terminal was stopped on purpose; so is the standby
+                # (unless stop_service or a rebuild is already handling it)
+                if self.standby.running and self._standby_lock.acquire(False):
+                    try:
+                        self._log("Active terminal stopped; stopping standby.")
+                        self.standby.stop_terminal()
+                    finally:
+                        self._standby_lock.release()
+                continue
+            if self._healthy(self.active):
+                self._failures = 0
+                continue
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._failures = 0
+                self.failover()
+
+    def _launch_standby(self):
+        """Launch the standby unless another thread is already at it"""
+        if not self._standby_lock.acquire(blocking=False):
+            return
+        try:
+            if (
+                self.active.expected_running
+                and not self.standby.running
+                and time.monotonic() >= self._next_standby_launch
+            ):
+                self._start_standby()
+        finally:
+            self._standby_lock.release()
+
+    def _start_standby(self):
+        # Don't relaunch a standby that keeps failing more than twice a minute
+        self._next_standby_launch = time.monotonic() + 30.0
+        standby = self.standby
+        self._log(f"Launching standby terminal '{standby.name}'...")
+        standby.start_terminal(standby.username, standby.password)
+
+    def failover(self):
+        """Promote the standby (or cold-restart if it isn't ready)"""
+        with self._lock:
+            detected = time.monotonic()
+            failed = self.active
+            if self.standby.is_ready():
+                promoted = self.standby
+                self._log(f"'{failed.name}' failed health check; promoting standby.")
+            else:
+                promoted = failed
+                self._log(
+                    f"'{failed.name}' failed health check and no standby is ready; "
+                    "restarting it."
+                )
+
+            if promoted is not failed:
+                self.active, self.standby = promoted, failed
+                if self.forwarder:
+                    self.forwarder.target_port = promoted.http_port
+                # Tear the failed terminal down and rebuild it as the new standby
+                threading.Thread(target=self._rebuild_standby, daemon=True).start()
+            else:
+                failed.metrics.failover_restarts.inc()
+                failed.stop_terminal()
+                failed.start_terminal(failed.username, failed.password)
+
+        # Wait without the lock, so stop_service (the user's Stop) is never
+        # held up by a terminal that doesn't come up
+        deadline = detected + self.serve_timeout
+        while not promoted.check_port(timeout=1.0):
+            if not promoted.running or self._stop_event.is_set():
+                self._log("Promoted terminal exited before serving.")
+                return False
+            if not promoted.expected_running or promoted is not self.active:
+                return False  # Stopped or replaced in the meantime
+            if time.monotonic() >= deadline:
+                self._log(
+                    f"'{promoted.name}' did not accept connections within "
+                    f"{self.serve_timeout:.0f}s; failover failed."
+                )
+                return False
+            time.sleep(0.05)
+        elapsed = time.monotonic() - detected
+        self.failover_times.append(elapsed)
+        self.failovers += 1
+        self._log(
+            f"'{promoted.name}' serving on port {promoted.http_port}; "
+            f"failover took {elapsed * 1000:.0f} ms."
+        )
+        return True
+
+    def _rebuild_standby(self):
+        with self._standby_lock:
+            failed = self.standby
+            if failed.running or failed.process is not None:
+                failed.stop_terminal()
+            if self.active.expected_running and not failed.running:
+                self._start_standby()
+
+    def status(self):
+        times = list(self.failover_times)
+        return {
+            "active": self.active.name,
+            "standby": self.standby.name,
+            "standby_ready": self.standby.is_ready(),
+            "failovers": self.failovers,
+            "last_failover_ms": times[-1] * 1000 if times else None,
+            "mean_failover_ms": sum(times) / len(times) * 1000 if times else None,
+            "public_port": self.forwarder.listen_port if self.forwarder else None,
+        }
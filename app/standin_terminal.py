@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Stand-in for ThetaTerminal.jar: mimics the terminal's process lifecycle so
+TerminalManager can be exercised without an account, the JAR or a network.
+
+Takes the same positional arguments the manager passes to the JAR
+(username, password and optionally a config_N.properties file), prints
+terminal-like log lines, serves HTTP on the configured port once "logged
+in", and shuts down on a quit command or SIGTERM. Only the standard library
+is used, so it runs as a plain script:
+
+    python app/standin_terminal.py --startup-delay 2 --rate 50 user pass
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_HTTP_PORT = 25510
+COMPLETE_MARKER = "Output complete"
+
+# Steady-state output, weighted like a busy terminal
+_MESSAGES = [
+    ("INFO", "Request /v2/hist/stock/quote served in {n} ms", 70),
+    ("INFO", "FPSS: received {n} trades", 20),
+    ("WARN", "MDDS response took {n} ms", 5),
+    ("INFO", "Heartbeat {n} acknowledged", 5),
+]
+
+
+def _timestamp():
+    now = time.time()
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)) + (
+        f".{int(now % 1 * 1000):03d}"
+    )
+
+
+def _line(level, message):
+    return f"[{_timestamp()}] {level}: {message}"
+
+
+def _read_http_port(path):
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                if sep and key.strip() == "HTTP_PORT" and value.strip().isdigit():
+                    return int(value.strip())
+    except OSError:
+        pass
+    return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = json.dumps(
+            {"header": {"format": None, "error_type": "null"}, "response": ["OK"]}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInTerminal:
+    def __init__(self, args):
+        self.args = args
+        self.quit_commands = {
+            c.strip().lower() for c in args.quit_commands.split(",") if c.strip()
+        }
+        self.shutdown = threading.Event()
+        self.server = None
+        self._out_lock = threading.Lock()
+
+    def emit(self, lines):
+        with self._out_lock:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+    def run(self):
+        args = self.args
+        self.emit(
+            [
+                _line("INFO", "Starting ThetaTerminal (stand-in)"),
+                _line("INFO", f"Logging in as {args.username}"),
+            ]
+        )
+        if args.ignore_sigterm:
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        else:
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.shutdown.set())
+        threading.Thread(target=self._read_commands, daemon=True).start()
+
+        if self.shutdown.wait(args.startup_delay):
+            return self._stop()
+        try:
+            self.server = ThreadingHTTPServer(("127.0.0.1", args.port), _Handler)
+        except OSError as e:
+            self.emit(
+                [_line("ERROR", f"Unable to bind HTTP port {args.port}: {e.strerror}")]
+            )
+            return 1
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.emit(
+            [
+                _line("INFO", "CONNECTED: [nj-a.thetadata.us:12000] MDDS"),
+                _line("INFO", "CONNECTED: [nj-a.thetadata.us:20000] FPSS"),
+                _line("INFO", f"HTTP server started on port {args.port}"),
+            ]
+        )
+        if args.crash_after is not None:
+            threading.Thread(target=self._crash, daemon=True).start()
+        threading.Thread(target=self._produce, daemon=True).start()
+        self.shutdown.wait()
+        return self._stop()
+
+    def _stop(self):
+        self.emit([_line("INFO", "Shutting down...")])
+        time.sleep(self.args.shutdown_delay)
+        if self.server:
+            self.server.server_close()
+        self.emit([_line("INFO", "Terminal stopped")])
+        return 0
+
+    def _read_commands(self):
+        for line in sys.stdin:
+            command = line.strip()
+            if not command:
+                continue
+            if command.lower() in self.quit_commands:
+                self.shutdown.set()
+                return
+            self.emit([_line("WARN", f"Unknown command: {command}")])
+
+    def _crash(self):
+        time.sleep(self.args.crash_after)
+        self.emit(
+            [
+                _line("ERROR", "Uncaught exception in main loop"),
+                "java.lang.OutOfMemoryError: Java heap space",
+                "\tat net.thetadata.terminal.Main.run(Main.java:118)",
+            ]
+        )
+        os._exit(1)
+
+    def _produce(self):
+        """Write `rate` lines a second (0: as fast as possible), stopping
+        after `lines` lines if given"""
+        args = self.args
+        rng = random.Random(args.seed)
+        levels = [level for level, _, _ in _MESSAGES]
+        templates = [template for _, template, _ in _MESSAGES]
+        weights = [weight for _, _, weight in _MESSAGES]
+        indexes = range(len(_MESSAGES))
+        remaining = args.lines or float("inf")
+        started = time.monotonic()
+        written = 0
+        while remaining > 0 and not self.shutdown.is_set():
+            if args.rate:
+                due = int((time.monotonic() - started) * args.rate) - written
+                if due <= 0:
+                    time.sleep(min(0.05, 1.0 / args.rate))
+                    continue
+            else:
+                due = 1000
+            count = int(min(due, remaining, 10000))
+            stamp = _timestamp()
+            batch = []
+            for i in rng.choices(indexes, weights, k=count):
+                message = templates[i].format(n=rng.randint(1, 5000))
+                batch.append(f"[{stamp}] {levels[i]}: {message}")
+            self.emit(batch)
+            written += count
+            remaining -= count
+        if args.lines and not self.shutdown.is_set():
+            self.emit([_line("INFO", f"{COMPLETE_MARKER}: {written} lines")])
+
+
+def standin_command(**options):
+    """Launch command for TerminalManager.launch_command; options are the
+    flags below as keywords, e.g. standin_command(startup_delay=0.5)"""
+    cmd = [sys.executable, os.path.abspath(__file__)]
+    for key, value in options.items():
+        flag = "--" + key.replace("_", "-")
+        if value is True:
+            cmd.append(flag)
+        elif value is not None and value is not False:
+            cmd += [flag, str(value)]
+    return cmd
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("username", nargs="?", default="")
+    parser.add_argument("password", nargs="?", default="")
+    parser.add_argument("properties", nargs="?", help="config_N.properties")
+    parser.add_argument(
+        "--port", type=int, help="HTTP port (default: HTTP_PORT from properties)"
+    )
+    parser.add_argument(
+        "--startup-delay",
+        type=float,
+        default=1.0,
+        help="Seconds between launch and binding the HTTP port",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=10.0, help="Lines per second (0: unthrottled)"
+    )
+    parser.add_argument(
+        "--lines", type=int, default=0, help="Stop output after this many (0: never)"
+    )
+    parser.add_argument(
+        "--quit-commands",
+        default="quit",
+        help="Comma-separated stdin commands that stop it ('' ignores stdin)",
+    )
+    parser.add_argument(
+        "--shutdown-delay",
+        type=float,
+        default=0.2,
+        help="Seconds from a quit command or SIGTERM to exiting",
+    )
+    parser.add_argument("--ignore-sigterm", action="store_true")
+    parser.add_argument(
+        "--crash-after",
+        type=float,
+        help="Exit with status 1 this many seconds after becoming ready",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.port is None:
+        args.port = (
+            args.properties and _read_http_port(args.properties)
+        ) or DEFAULT_HTTP_PORT
+    return StandInTerminal(args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+# Taken as early as possible: main.py imports this module before anything else
+_PROCESS_T0 = time.perf_counter()
+
+
+class StartupProfiler:
+    """Phase-by-phase wall-clock timing of application startup"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.t0 = _PROCESS_T0
+        self.phases = []  # (name, seconds since the previous mark)
+        self._last = self.t0
+
+    def mark(self, phase):
+        """Record the time spent since the previous mark under `phase`"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def total(self):
+        return self._last - self.t0
+
+    def report(self, out=None):
+        """Print the timing breakdown if profiling is enabled"""
+        if not self.enabled:
+            return
+        out = out or (lambda line: print(line, file=sys.stderr))
+        width = max((len(name) for name, _ in self.phases), default=10)
+        out("Startup profile:")
+        for name, seconds in self.phases:
+            out(f"  {name:<{width}}  {seconds * 1000:8.1f} ms")
+        out(f"  {'total':<{width}}  {self.total() * 1000:8.1f} ms")
+
+
+# Shared instance; enabled by --profile-startup or THETA_PROFILE_STARTUP=1
+profiler = StartupProfiler(enabled=os.environ.get("THETA_PROFILE_STARTUP") == "1")
@@ -1,12 +1,52 @@
 import os
 import json
 import subprocess
-import urllib.request
 import threading
 import sys
 import atexit
+import socket
 import time
 
+from .command_channel import CommandChannel, CommandResult
+from .config_watcher import ConfigWatcher
+from .log_archive import LogArchive
+from .log_dedup import LineCollapser, RepeatSummary
+from .log_tailer import LogTailer, RecentLines
+from .metrics import TerminalMetrics, registry
+from .paths import manager_data_dir
+from .port_preflight import check_ports
+from .properties_file import read_properties, update_properties
+from .region_probe import (
+    DEFAULT_REGION_HOSTS,
+    RegionProbe,
+    is_production_region,
+    parse_host_list,
+)
+from .resource_sampler import ResourceSampler
+from .session_recorder import SUFFIX, SessionRecorder, prune_recordings, replay
+from .terminal_state import (
+    AdoptedProcess,
+    can_recover,
+    is_same_process,
+    process_cwd,
+    process_start_time,
+    read_record,
+    reap,
+    remove_record,
+    scan_terminals,
+    write_record,
+)
+from .tracing import traced, tracer
+
+# Port settings in config_N.properties and ThetaTerminal's defaults for them
+DEFAULT_PORTS = {
+    "HTTP_PORT": 25510,
+    "WS_PORT": 25520,
+    "CLIENT_PORT": 11000,
+    "STREAM_PORT": 10000,
+}
+STABLE_JAR_VERSION = "stable"
+
 
 class DownloadProgressTracker:
     def __init__(self, callback=None):
@@ -25,14 +65,51 @@ class DownloadProgressTracker:
 
 
 class TerminalManager:
-    def __init__(self):
-        self.config_file = "config.json"
+    def __init__(self, config_index=0, name=None, config_file="config.json", load=True):
+        # Several managers (a TerminalPool) can share one host; each uses its
+        # own config_<index>.properties. Pool instances pass config_file=None
+        # so they never overwrite the primary's saved credentials.
+        self.config_index = config_index
+        self.name = name or (
+            "primary" if config_index == 0 else f"terminal-{config_index}"
+        )
+        self.config_file = config_file
         self.jar_file = "ThetaTerminal.jar"
+        self.jar_version = STABLE_JAR_VERSION
+        # Command run instead of "java -jar <jar>" (e.g. a stand-in terminal);
+        # the credentials and properties file are appended as usual
+        self.launch_command = None
+        # Manager state (launch records, output archive, recordings); None
+        # uses manager_data_dir()
+        self.data_dir = None
+        self.default_ports = dict(DEFAULT_PORTS)  # Used for keys not in properties
         self.download_url = "https://download-stable.thetadata.us/ThetaTerminal.jar"
         self.username = ""
         self.password = ""
+        self.config = {}  # Full contents of config.json, preserved on save
         self.process = None
+        self.command_channel = None  # Queued commands to the process's stdin
+        self.output_thread = None  # Reads the process's stdout
         self.running = False
+        self.expected_running = False  # Started by us and not asked to stop
+        self.started_at = None  # time.monotonic() of the last launch
+        self.launch_count = 0
+        self.ready = False  # HTTP port is accepting connections
+        self.ready_at = None  # time.monotonic() when the terminal became ready
+        self.resource_sampler = None  # Samples CPU/RSS of the running JVM
+        self.log_archive = None  # On-disk copy of the terminal's output
+        self.archive_settings = {}  # "log_archive" section of config.json
+        self.recorder = None  # Timed recording of the output, when enabled
+        self.recording_settings = {}  # "session_recording" section of config.json
+        self.log_tailer = None  # Follows the terminal's own log file
+        self.tail_settings = {}  # "log_tail" section of config.json
+        self._stdout_lines = RecentLines()  # To drop log file lines seen on stdout
+        self.line_collapser = LineCollapser()  # None shows every repeated line
+        self._collapse_lock = threading.Lock()
+        # Stdout reader, log tailer and replay all feed _handle_output_line
+        self._output_lock = threading.Lock()
+        self.repeat_callback = None
+        self.metrics = registry.register(TerminalMetrics(self))
         self.log_callback = None
         self.download_progress_callback = None
         self.download_thread = None
@@ -55,21 +132,54 @@ class TerminalManager:
                 "config_0.properties",
             )
         )
+        self.properties_file = os.path.join(
+            self.config_folder, f"config_{config_index}.properties"
+        )
 
-        # Server region options
+        # Server region options; replaced by the *_HOSTS keys of the
+        # properties file once it exists
         self.mdds_regions = ["MDDS_NJ_HOSTS", "MDDS_STAGE_HOSTS", "MDDS_DEV_HOSTS"]
         self.fpss_regions = ["FPSS_NJ_HOSTS", "FPSS_STAGE_HOSTS", "FPSS_DEV_HOSTS"]
         self.current_mdds_region = "MDDS_NJ_HOSTS"
         self.current_fpss_region = "FPSS_NJ_HOSTS"
+        self.region_probe = None  # Keeps rolling latency stats between probes
+        self._probe_running = False
+        self._probe_lock = threading.Lock()
+        self.auto_select_region = False  # Pick fastest region before launch
+        self.port_preflight = True  # Refuse to launch if our ports are taken
+
+        # Hot reload of config.json / config_0.properties
+        self.config_watcher = None
+        self.restart_on_config_change = False
+        self.restart_delay = 2.0  # Seconds to wait for further edits
+        self._restart_timer = None
+        self._restart_lock = threading.Lock()
+
+        # The GUI passes load=False and calls load_settings() after first paint
+        if load:
+            self.load_settings()
+
+        # Register cleanup function to ensure processes are terminated on exit
+        atexit.register(self.cleanup)
 
+    def load_settings(self):
+        """Read config_N.properties and config.json"""
         # Read current settings from properties file if it exists
         self._read_properties_file()
 
         # Load configuration if it exists
         self.load_config()
 
-        # Register cleanup function to ensure processes are terminated on exit
-        atexit.register(self.cleanup)
+        # Have probe results ready by the time the terminal is started
+        if self.auto_select_region:
+            if self.has_region_choice():
+                self.refresh_region_probe()
+            elif self.log_callback:
+                self.log_callback(
+                    "auto_select_region is on, but the properties file lists a "
+                    "single production region per service; keeping the "
+                    "configured regions."
+                )
 
     def cleanup(self):
         """Clean up resources when the application exits"""
@@ -79,6 +189,7 @@ class TerminalManager:
             self.log_callback = None
 
             if self.running:
+                pid = self.process.pid if self.process else None
                 # Perform immediate cleanup to avoid hanging
                 if self.process:
                     try:
@@ -102,19 +213,30 @@ class TerminalManager:
 
                 self.running = False
 
-            # Aggressive cleanup on Windows
-            if sys.platform.startswith("win"):
-                try:
-                    jar_name = os.path.basename(self.jar_file)
-                    subprocess.run(
-                        f'taskkill /F /IM java.exe /FI "COMMANDLINE eq *{jar_name}*"',
-                        shell=True,
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                        timeout=0.5,
-                    )
-                except Exception:
-                    pass
+                # Kill the rest of our terminal's process tree on Windows; other
+                # java.exe processes running the same JAR are left alone
+                if pid and sys.platform.startswith("win"):
+                    try:
+                        subprocess.run(
+                            f"taskkill /F /T /PID {pid}",
+                            shell=True,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL,
+                            timeout=0.5,
+                        )
+                    except Exception:
+                        pass
+                if pid:
+                    remove_record(self.name, pid, self.data_dir)
+
+            self._stop_log_tailer()
+            self.stop_recording()
+            self._close_command_channel()
+
+            # Get the archived output onto disk
+            if self.log_archive:
+                self.log_archive.close()
+                self.log_archive = None
 
             # Restore the callback
             self.log_callback = temp_callback
@@ -125,20 +247,41 @@ class TerminalManager:
 
     def load_config(self):
         """Load username and password from config file if it exists"""
-        if os.path.exists(self.config_file):
+        if self.config_file and os.path.exists(self.config_file):
             try:
                 with open(self.config_file, "r") as f:
                     config = json.load(f)
+                    self.config = config
                     self.username = config.get("username", "")
                     self.password = config.get("password", "")
+                    self.auto_select_region = config.get("auto_select_region", False)
+                    self.restart_on_config_change = config.get(
+                        "restart_on_config_change", False
+                    )
+                    self.port_preflight = config.get("port_preflight", True)
+                    self.launch_command = config.get("launch_command") or None
+                    self.archive_settings = config.get("log_archive", {})
+                    self.tail_settings = config.get("log_tail", {})
+                    self.recording_settings = config.get("session_recording", {})
+                    dedup = config.get("log_dedup", {})
+                    self.line_collapser = (
+                        LineCollapser(dedup.get("mask_numbers", True))
+                        if dedup.get("enabled", True)
+                        else None
+                    )
+                    if config.get("jar_version"):
+                        self.set_jar_version(config["jar_version"])
             except Exception as e:
                 print(f"Error loading config: {e}")
 
     def save_config(self):
         """Save username and password to config file"""
+        if not self.config_file:
+            return
         try:
+            self.config.update({"username": self.username, "password": self.password})
             with open(self.config_file, "w") as f:
-                json.dump({"username": self.username, "password": self.password}, f)
+                json.dump(self.config, f)
         except Exception as e:
             print(f"Error saving config: {e}")
 
@@ -208,15 +351,26 @@ class TerminalManager:
             start_thread = threading.Thread(target=delayed_start, daemon=True)
             start_thread.start()
 
+    @traced("terminal.download")
     def download_jar_file(self):
         """Download the JAR file from the URL with progress"""
         try:
+            import urllib.request  # Deferred: only needed for downloads
+
             if self.log_callback:
                 self.log_callback("Downloading ThetaTerminal.jar...")
 
             progress_tracker = DownloadProgressTracker(self._download_progress)
-            urllib.request.urlretrieve(
-                self.download_url, self.jar_file, reporthook=progress_tracker
+            with tracer.span("download.transfer", url=self.download_url) as span:
+                urllib.request.urlretrieve(
+                    self.download_url, self.jar_file, reporthook=progress_tracker
+                )
+                span.set(bytes=progress_tracker.downloaded)
+            self.metrics.downloads.inc()
+            self.metrics.download_bytes.inc(
+                min(progress_tracker.downloaded, progress_tracker.total_size)
+                if progress_tracker.total_size > 0
+                else progress_tracker.downloaded
             )
 
             # Ensure we send a final 100% progress update to hide the progress bar
@@ -244,6 +398,7 @@ class TerminalManager:
 
             return False
 
+    @traced("terminal.start")
     def start_terminal(self, username, password):
         """Start the terminal process with the given credentials"""
         if self.running:
@@ -255,7 +410,7 @@ class TerminalManager:
         self.save_config()
 
         # Check if JAR file exists, download if not
-        if not os.path.exists(self.jar_file):
+        if not self.launch_command and not os.path.exists(self.jar_file):
             if self.log_callback:
                 self.log_callback("ThetaTerminal.jar not found. Starting download...")
             self.start_after_download = True  # Set flag to auto-start after download
@@ -270,10 +425,21 @@ class TerminalManager:
                 )
             return False
 
+        if self.auto_select_region and self.has_region_choice():
+            self._select_probed_regions()
+
+        # Fail fast instead of letting a JVM log in and then fail to bind
+        if self.port_preflight and not self._ports_available():
+            return False
+
         # Start the process
         try:
             # Create the command - use minimal flags to allow proper signal handling
-            cmd = ["java", "-jar", self.jar_file, username, password]
+            cmd = list(self.launch_command or ["java", "-jar", self.jar_file])
+            cmd += [username, password]
+            if self.config_index:
+                # Non-default instances point the terminal at their own config
+                cmd.append(self.properties_file)
 
             # Configure startup info - allow console for proper signal handling
             startup_info = None
@@ -287,27 +453,53 @@ class TerminalManager:
                 creation_flags = 0
 
             # Start process with stdin, stdout and stderr pipes for communication
-            self.process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,  # Enable stdin for sending quit commands
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                startupinfo=startup_info,
-                # Use proper creation flags for signal handling
-                creationflags=creation_flags,
-                # On Unix, start new process group
-                preexec_fn=os.setsid if not sys.platform.startswith("win") else None,
-            )
+            with tracer.span("start.popen") as span:
+                self.process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,  # Enable stdin for sending quit commands
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    bufsize=1,
+                    universal_newlines=True,
+                    startupinfo=startup_info,
+                    # Use proper creation flags for signal handling
+                    creationflags=creation_flags,
+                    # On Unix, start new process group
+                    preexec_fn=(
+                        os.setsid if not sys.platform.startswith("win") else None
+                    ),
+                )
+                span.set(pid=self.process.pid)
+            self._write_state_record()
+            self.command_channel = CommandChannel(self.process.stdin)
 
             self.running = True
+            self.expected_running = True
+            self.started_at = time.monotonic()
+            self.launch_count += 1
+
+            # Sample JVM resource usage while it runs
+            self.resource_sampler = ResourceSampler(self.process.pid)
+            self.resource_sampler.start()
+
+            # Track when the terminal starts serving requests
+            self.ready = False
+            self.ready_at = None
+            threading.Thread(
+                target=self._watch_readiness, args=(self.process,), daemon=True
+            ).start()
 
             # Start thread to read output
-            self.output_thread = threading.Thread(target=self._read_output)
+            self._ensure_log_archive()
+            if self.recording_settings.get("enabled"):
+                self.start_recording()
+            self.output_thread = threading.Thread(
+                target=self._read_output, args=(self.process,)
+            )
             self.output_thread.daemon = True
             self.output_thread.start()
+            self._start_log_tailer()
 
             if self.log_callback:
                 self.log_callback("Terminal started with graceful shutdown support.")
@@ -318,6 +510,7 @@ class TerminalManager:
                 self.log_callback(f"Error starting terminal: {e}")
             return False
 
+    @traced("terminal.stop")
     def stop_terminal(self):
         """Stop the terminal process if it's running"""
         if not self.running:
@@ -325,6 +518,10 @@ class TerminalManager:
                 self.log_callback("Stop called but terminal not running.")
             return False
 
+        self.expected_running = False
+        # The quit commands below write to stdin directly
+        channel = self._close_command_channel()
+
         if self.log_callback:
             self.log_callback("Beginning graceful terminal shutdown...")
 
@@ -341,14 +538,22 @@ class TerminalManager:
                 if self.log_callback:
                     self.log_callback(f"Attempting graceful shutdown of PID: {pid}")
 
-                # Step 1: Try sending quit commands via stdin (most graceful)
-                if hasattr(self.process, "stdin") and self.process.stdin:
+                # Step 1: Try sending quit commands via stdin (most graceful).
+                # Not while a command write is blocked: the bytes could interleave
+                if channel and channel.write_pending():
+                    if self.log_callback:
+                        self.log_callback(
+                            "A command is still being written to stdin; "
+                            "skipping quit commands."
+                        )
+                elif hasattr(self.process, "stdin") and self.process.stdin:
                     try:
                         quit_commands = ["quit\n", "exit\n", "stop\n", "q\n"]
                         for cmd in quit_commands:
                             if time.time() - start_time > timeout_seconds:
                                 break
                             try:
+                                tracer.event("stop.quit_command", command=cmd.strip())
                                 if self.log_callback:
                                     self.log_callback(
                                         f"Sending '{cmd.strip()}' command..."
@@ -364,6 +569,7 @@ class TerminalManager:
                                             "Application responded to quit command."
                                         )
                                     self.running = False
+                                    self._record_stop_time(start_time)
                                     return True
                                 except subprocess.TimeoutExpired:
                                     continue  # Try next command
@@ -381,6 +587,7 @@ class TerminalManager:
                 # Step 2: Try SIGTERM (graceful shutdown signal)
                 if time.time() - start_time <= timeout_seconds:
                     try:
+                        tracer.event("stop.sigterm")
                         if self.log_callback:
                             self.log_callback(
                                 "Sending SIGTERM signal for graceful shutdown..."
@@ -394,6 +601,7 @@ class TerminalManager:
                                 "Process terminated gracefully via SIGTERM."
                             )
                         self.running = False
+                        self._record_stop_time(start_time)
                         return True
 
                     except subprocess.TimeoutExpired:
@@ -406,6 +614,7 @@ class TerminalManager:
                 # Step 3: Force kill only as last resort
                 if time.time() - start_time <= timeout_seconds:
                     try:
+                        tracer.event("stop.force_kill")
                         if self.log_callback:
                             self.log_callback(
                                 "Graceful shutdown failed, force killing..."
@@ -490,6 +699,7 @@ class TerminalManager:
 
             # Mark as not running
             self.running = False
+            self._record_stop_time(start_time)
 
             if self.log_callback:
                 elapsed = time.time() - start_time
@@ -504,10 +714,135 @@ class TerminalManager:
             self.running = False
             return False
 
+    def _record_stop_time(self, start_time):
+        self.metrics.stop_seconds.observe(time.time() - start_time)
+
+    @traced("terminal.restart")
+    def restart_terminal(self):
+        """Stop the terminal if it is running and start it again"""
+        with self._restart_lock:
+            self.metrics.restarts.inc()
+            if self.running:
+                self.stop_terminal()
+            return self.start_terminal(self.username, self.password)
+
+    def _ports_available(self):
+        """Check that nothing else listens on this instance's ports"""
+        with tracer.span("start.preflight"):
+            conflicts = check_ports(self.get_ports())
+        if conflicts and self.log_callback:
+            for conflict in conflicts:
+                self.log_callback(f"{conflict}.")
+            self.log_callback(
+                "Not starting the terminal: stop the other process or change "
+                f"the ports in {self.properties_file}."
+            )
+        return not conflicts
+
     def is_running(self):
         """Check if the terminal is currently running"""
         return self.running
 
+    def _watch_readiness(self, process, poll_interval=0.25):
+        """Mark the terminal ready once its HTTP port accepts connections"""
+        while process is self.process and process.poll() is None:
+            if self.check_port():
+                self.ready = True
+                self.ready_at = time.monotonic()
+                tracer.record(
+                    "terminal.startup",
+                    self.started_at,
+                    self.ready_at,
+                    instance=self.name,
+                    pid=process.pid,
+                )
+                if self.log_callback:
+                    self.log_callback(
+                        f"Terminal ready on port {self.http_port} after "
+                        f"{self.ready_at - self.started_at:.1f}s."
+                    )
+                return
+            time.sleep(poll_interval)
+
+    def check_port(self, timeout=0.5):
+        """True if the terminal's HTTP port accepts a TCP connection"""
+        try:
+            with socket.create_connection(
+                ("127.0.0.1", self.http_port), timeout=timeout
+            ):
+                return True
+        except OSError:
+            return False
+
+    def is_ready(self):
+        """True if the terminal is running and has become ready"""
+        return self.running and self.ready
+
+    def has_crashed(self):
+        """True if the terminal exited without being asked to stop"""
+        return (
+            self.expected_running
+            and self.process is not None
+            and self.process.poll() is not None
+        )
+
+    def get_ports(self):
+        """Ports configured in this instance's properties file"""
+        ports = dict(self.default_ports)
+        if os.path.exists(self.properties_file):
+            try:
+                properties = read_properties(self.properties_file)
+                for key in ports:
+                    value = properties.get(key, "")
+                    if value.strip().isdigit():
+                        ports[key] = int(value)
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"Error reading ports: {e}")
+        return ports
+
+    @property
+    def http_port(self):
+        return self.get_ports()["HTTP_PORT"]
+
+    def set_jar_version(self, version):
+        """Switch the JAR to a release channel (stable, or e.g. "latest")"""
+        version = version or STABLE_JAR_VERSION
+        self.jar_version = version
+        self.download_url = f"https://download-{version}.thetadata.us/ThetaTerminal.jar"
+        if version == STABLE_JAR_VERSION:
+            self.jar_file = "ThetaTerminal.jar"
+        else:
+            self.jar_file = f"ThetaTerminal-{version}.jar"
+
+    def get_status(self):
+        """Snapshot of this instance's state"""
+        running = self.running
+        return {
+            "name": self.name,
+            "config_index": self.config_index,
+            "running": running,
+            "pid": self.process.pid if running and self.process else None,
+            "uptime": (
+                time.monotonic() - self.started_at
+                if running and self.started_at
+                else 0.0
+            ),
+            "ready": self.is_ready(),
+            "time_to_ready": (
+                self.ready_at - self.started_at
+                if self.ready_at and self.started_at
+                else None
+            ),
+            "launches": self.launch_count,
+            "jar_file": self.jar_file,
+            "jar_version": self.jar_version,
+            "ports": self.get_ports(),
+            "mdds_region": self.current_mdds_region,
+            "fpss_region": self.current_fpss_region,
+            "downloading": self.is_downloading,
+        }
+
     def get_downloading_status(self):
         """Check if a download is in progress"""
         return self.is_downloading
@@ -516,6 +851,12 @@ class TerminalManager:
         """Set callback function to receive log output"""
         self.log_callback = callback
 
+    def set_repeat_callback(self, callback):
+        """Set callback function to receive a Run when a line starts repeating,
+        for a live counter. log_callback still gets a RepeatSummary line after
+        each run of repeats either way."""
+        self.repeat_callback = callback
+
     def set_download_progress_callback(self, callback):
         """Set callback function to receive download progress updates"""
         self.download_progress_callback = callback
@@ -528,18 +869,316 @@ class TerminalManager:
         """Set callback function to be called when auto-start completes"""
         self.auto_start_complete_callback = callback
 
-    def _read_output(self):
+    def _read_output(self, process):
         """Read output from the process and send to callback"""
         try:
-            for line in self.process.stdout:
-                if self.log_callback:
-                    self.log_callback(line.strip())
+            for line in process.stdout:
+                line = line.rstrip("\r\n")
+                recorder = self.recorder
+                if recorder:
+                    recorder.record(line)
+                if self.log_tailer:
+                    self._stdout_lines.add(line)
+                self._handle_output_line(line)
         except Exception as e:
             if self.log_callback:
                 self.log_callback(f"Error reading output: {e}")
         finally:
-            if self.process.poll() is not None:
-                self.running = False
+            self._process_exited(process)
+
+    def _handle_output_line(self, line):
+        """Route one line of terminal output to metrics, archive and UI.
+
+        Called from the stdout reader, the log tailer and replay; the lock
+        keeps them a single writer for the counters (see metrics.Counter),
+        the archive, the collapser and the command channel."""
+        with self._output_lock:
+            self.metrics.output_lines.inc()
+            self.metrics.output_rate.mark()
+            channel = self.command_channel
+            if channel:
+                channel.feed(line)
+            if self.log_archive:
+                self.log_archive.write(line)  # Unstripped: the archive is lossless
+            if self.log_callback:
+                self._show_line(line.strip())
+
+    def _show_line(self, text):
+        """Pass a line to log_callback, collapsing runs of repeats"""
+        collapser = self.line_collapser
+        if collapser is None:
+            self.log_callback(text)
+            return
+        with self._collapse_lock:
+            previous = collapser.current
+            run, is_new = collapser.feed(text)
+        if not is_new:
+            # The UI keeps a live counter from here on
+            if run.count == 2 and self.repeat_callback:
+                self.repeat_callback(run)
+            return
+        if previous and previous.count > 1:
+            self.log_callback(RepeatSummary.of(previous))
+        self.log_callback(text)
+
+    def _end_repeats(self):
+        """Close the current run of repeats, e.g. once the output has ended"""
+        if self.line_collapser is None:
+            return
+        with self._collapse_lock:
+            run = self.line_collapser.close()
+        if run and run.count > 1 and self.log_callback:
+            self.log_callback(RepeatSummary.of(run))
+
+    def _handle_log_file_line(self, line):
+        """Merge a line from the terminal's log file into the output stream,
+        unless stdout already delivered it"""
+        if not self._stdout_lines.consume(line):
+            self._handle_output_line(line)
+
+    @property
+    def recordings_folder(self):
+        return os.path.join(
+            self.data_dir or manager_data_dir(), "recordings", self.name
+        )
+
+    def start_recording(self, path=None):
+        """Record every stdout line with its timing until the terminal exits"""
+        self.stop_recording()
+        if path is None:
+            path = os.path.join(
+                self.recordings_folder, time.strftime("%Y%m%d-%H%M%S") + SUFFIX
+            )
+            prune_recordings(
+                self.recordings_folder, self.recording_settings.get("keep", 20) - 1
+            )
+        try:
+            self.recorder = SessionRecorder(path).start()
+        except OSError as e:
+            if self.log_callback:
+                self.log_callback(f"Could not record session: {e}")
+            return None
+        return path
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder:
+            recorder.close()
+
+    def replay_recording(self, path, speed=1.0, stop_event=None):
+        """Feed a recording through the output pipeline as if the terminal
+        printed it; speed None replays as fast as possible"""
+        result = replay(path, self._handle_output_line, speed, stop_event)
+        self._end_repeats()
+        return result
+
+    def send_command(self, command, timeout=5.0, settle=0.5, expect=None):
+        """Queue a command for the terminal's stdin without waiting for it.
+
+        Returns a Future of a CommandResult holding the output lines that
+        followed the command: up to the first line matching the `expect`
+        regex, or until the output was quiet for `settle` seconds.
+        """
+        channel = self.command_channel
+        if channel is None:
+            error = (
+                "terminal was adopted; its stdin is not connected"
+                if self.running
+                else "terminal not running"
+            )
+            from concurrent.futures import Future
+
+            future = Future()
+            future.set_result(CommandResult(command, "closed", error=error))
+            return future
+        if self.log_callback:
+            self.log_callback(f"Sending command '{command}'...")
+        return channel.submit(command, timeout, settle, expect)
+
+    def _close_command_channel(self):
+        """Close the command channel; returns it (or None)"""
+        channel, self.command_channel = self.command_channel, None
+        if channel:
+            channel.close()
+        return channel
+
+    def _start_log_tailer(self):
+        """Follow the terminal's log file. Only the primary does this by
+        default: every instance on a host shares one logs folder."""
+        enabled = self.tail_settings.get("enabled", self.config_index == 0)
+        if self.log_tailer or not enabled:
+            return
+        self.log_tailer = LogTailer(
+            self.logs_folder,
+            self._handle_log_file_line,
+            poll_interval=self.tail_settings.get("poll_interval", 0.25),
+        )
+        self.log_tailer.error_callback = self.log_callback
+        self.log_tailer.start()
+
+    def _stop_log_tailer(self):
+        tailer, self.log_tailer = self.log_tailer, None
+        if tailer:
+            tailer.stop()
+
+    def _ensure_log_archive(self):
+        """Start archiving output on the first launch, unless disabled"""
+        settings = self.archive_settings
+        if self.log_archive or not settings.get("enabled", True):
+            return
+        self.log_archive = LogArchive(
+            self.archive_folder,
+            max_segment_bytes=int(settings.get("max_segment_mb", 16) * 1024 * 1024),
+            max_segment_age=settings.get("max_segment_minutes", 60) * 60.0,
+            keep_days=settings.get("keep_days", 30),
+        )
+        self.log_archive.error_callback = self.log_callback
+        try:
+            self.log_archive.start()
+        except OSError as e:
+            self.log_archive = None
+            if self.log_callback:
+                self.log_callback(f"Output archive disabled: {e}")
+
+    @property
+    def archive_folder(self):
+        return os.path.join(self.data_dir or manager_data_dir(), "logs", self.name)
+
+    def export_logs(self, out_path, start=None, end=None):
+        """Write archived output between two epoch times to a file"""
+        archive = self.log_archive or LogArchive(self.archive_folder)
+        return archive.export_range(out_path, start, end)
+
+    def _process_exited(self, process):
+        """Bookkeeping once the terminal's output or process has ended"""
+        self._end_repeats()
+        try:
+            # Output can end a moment before the exit status is collectable
+            process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            pass
+        if process.poll() is not None:
+            remove_record(self.name, process.pid, self.data_dir)
+        if process is not self.process:
+            return  # A newer launch owns the manager's state now
+        if process.poll() is not None:
+            self.running = False
+            self._stop_log_tailer()
+            self.stop_recording()
+            self._close_command_channel()
+        if self.resource_sampler:
+            self.resource_sampler.stop()
+
+    def _write_state_record(self):
+        """Record the launch so a manager restarted after a crash can find it"""
+        if not can_recover():
+            return
+        try:
+            write_record(
+                self.name,
+                self.process.pid,
+                jar_file=os.path.abspath(self.jar_file),
+                data_dir=self.data_dir,
+                config_index=self.config_index,
+            )
+        except OSError as e:
+            if self.log_callback:
+                self.log_callback(f"Could not write terminal state record: {e}")
+
+    def _find_previous_terminals(self):
+        """(pid, start time) of terminals for this instance that outlived their
+        manager: the recorded one, plus any untracked ones found in /proc"""
+        found = {}
+        record = read_record(self.name, self.data_dir)
+        if record and is_same_process(record["pid"], record.get("start_time")):
+            found[record["pid"]] = record
+        for pid, cmdline in scan_terminals(self.jar_file):
+            if pid in found or pid == getattr(self.process, "pid", None):
+                continue
+            if self._launched_by_us(pid, cmdline):
+                found[pid] = {"pid": pid, "start_time": process_start_time(pid)}
+        return found
+
+    def _launched_by_us(self, pid, cmdline):
+        """True if `cmdline` is the one start_terminal builds for this
+        instance: java -jar <our JAR> <username> <password> [properties]"""
+        if len(cmdline) < 3 or cmdline[1] != "-jar":
+            return False
+        # The JAR is passed as given, so resolve it against the JVM's cwd
+        cwd = process_cwd(pid)
+        jar = os.path.join(cwd, cmdline[2]) if cwd else cmdline[2]
+        if os.path.abspath(jar) != os.path.abspath(self.jar_file):
+            return False
+        # Instance N passes its own properties file; the primary passes none
+        if self.config_index:
+            return len(cmdline) == 6 and cmdline[5] == self.properties_file
+        return len(cmdline) == 5
+
+    def recover_previous_terminal(self, policy="adopt"):
+        """Adopt or reap a terminal left running by a crashed manager.
+
+        policy: "adopt" re-attaches monitoring to it, "reap" stops it, and
+        "ignore" leaves it alone. Returns the adopted PID, if any.
+        """
+        if policy == "ignore" or self.running or not can_recover():
+            return None
+        adopted = None
+        for pid, record in self._find_previous_terminals().items():
+            start_time = record.get("start_time")
+            if policy == "adopt" and adopted is None:
+                self._adopt(pid, start_time, record.get("launched_at"))
+                adopted = pid
+                continue
+            if self.log_callback:
+                self.log_callback(
+                    f"Stopping terminal PID {pid} left running by a previous session..."
+                )
+            stopped = reap(pid, start_time)
+            if self.log_callback:
+                self.log_callback(
+                    f"Terminal PID {pid} stopped."
+                    if stopped
+                    else f"Could not stop terminal PID {pid}."
+                )
+        if adopted is None:
+            remove_record(self.name, data_dir=self.data_dir)
+        return adopted
+
+    def _adopt(self, pid, start_time, launched_at=None):
+        """Take over monitoring of a running terminal we did not launch"""
+        self.process = AdoptedProcess(pid, start_time)
+        self.running = True
+        self.expected_running = True
+        now = time.monotonic()
+        self.started_at = now - (time.time() - launched_at) if launched_at else now
+        self.resource_sampler = ResourceSampler(pid)
+        self.resource_sampler.start()
+        self.ready = False
+        self.ready_at = None
+        threading.Thread(
+            target=self._watch_readiness, args=(self.process,), daemon=True
+        ).start()
+        threading.Thread(
+            target=self._watch_adopted, args=(self.process,), daemon=True
+        ).start()
+        self._ensure_log_archive()
+        self._start_log_tailer()
+        if not launched_at:
+            self._write_state_record()
+        if self.log_callback:
+            self.log_callback(
+                f"Adopted terminal PID {pid} left running by a previous session. "
+                "Its console output is not available, only its log file; "
+                "stopping it works as usual."
+            )
+
+    def _watch_adopted(self, process):
+        """Stand-in for _read_output: wait for an adopted terminal to exit"""
+        process.wait()
+        if process is self.process:
+            self._process_exited(process)
+            if self.expected_running and self.log_callback:
+                self.log_callback(f"Adopted terminal PID {process.pid} exited.")
 
     def open_logs_folder(self):
         """Open the logs folder in file explorer"""
@@ -553,6 +1192,12 @@ class TerminalManager:
                 self.log_callback(f"Logs folder not found: {self.logs_folder}")
             return False
 
+    def analyze_logs(self, window_minutes=60, use_cache=True):
+        """Summarize errors, disconnects and auth failures in logs_folder"""
+        from .log_analyzer import LogAnalyzer
+
+        return LogAnalyzer(self.logs_folder, window_minutes).run(use_cache)
+
     def open_config_folder(self):
         """Open the config folder in file explorer"""
         if os.path.exists(self.config_folder):
@@ -582,17 +1227,23 @@ class TerminalManager:
 
     def _read_properties_file(self):
         """Read the server region settings from config_0.properties file"""
-        if os.path.exists(os.path.join(self.config_folder, "config_0.properties")):
-            properties_path = os.path.join(self.config_folder, "config_0.properties")
+        if os.path.exists(self.properties_file):
             try:
-                with open(properties_path, "r") as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        line = line.strip()
-                        if line.startswith("MDDS_REGION="):
-                            self.current_mdds_region = line.split("=")[1]
-                        elif line.startswith("FPSS_REGION="):
-                            self.current_fpss_region = line.split("=")[1]
+                properties = read_properties(self.properties_file)
+                for service in ("MDDS", "FPSS"):
+                    regions = [
+                        key
+                        for key in properties.keys()
+                        if key.startswith(service + "_") and key.endswith("_HOSTS")
+                    ]
+                    if regions:
+                        setattr(self, service.lower() + "_regions", regions)
+                self.current_mdds_region = properties.get(
+                    "MDDS_REGION", self.current_mdds_region
+                )
+                self.current_fpss_region = properties.get(
+                    "FPSS_REGION", self.current_fpss_region
+                )
                 if self.log_callback:
                     self.log_callback(
                         f"Current server settings loaded: MDDS={self.current_mdds_region}, FPSS={self.current_fpss_region}"
@@ -601,12 +1252,11 @@ class TerminalManager:
                 if self.log_callback:
                     self.log_callback(f"Error reading properties file: {e}")
 
+    @traced("terminal.update_regions")
     def update_server_regions(self, mdds_region, fpss_region):
         """Update the server region settings in config_0.properties file"""
-        properties_path = os.path.join(self.config_folder, "config_0.properties")
-
         # Check if properties file exists
-        if not os.path.exists(properties_path):
+        if not os.path.exists(self.properties_file):
             if self.log_callback:
                 self.log_callback(
                     "Properties file not found. It will be created when ThetaTerminal runs for the first time."
@@ -617,23 +1267,11 @@ class TerminalManager:
             return False
 
         try:
-            # Read existing properties file
-            with open(properties_path, "r") as f:
-                lines = f.readlines()
-
-            # Update region settings
-            updated_lines = []
-            for line in lines:
-                if line.strip().startswith("MDDS_REGION="):
-                    updated_lines.append(f"MDDS_REGION={mdds_region}\n")
-                elif line.strip().startswith("FPSS_REGION="):
-                    updated_lines.append(f"FPSS_REGION={fpss_region}\n")
-                else:
-                    updated_lines.append(line)
-
-            # Write updated content back to file
-            with open(properties_path, "w") as f:
-                f.writelines(updated_lines)
+            # Rewrite the file atomically, keeping comments and ordering
+            update_properties(
+                self.properties_file,
+                {"MDDS_REGION": mdds_region, "FPSS_REGION": fpss_region},
+            )
 
             # Update current values
             self.current_mdds_region = mdds_region
@@ -657,3 +1295,181 @@ class TerminalManager:
             "mdds_options": self.mdds_regions,
             "fpss_options": self.fpss_regions,
         }
+
+    def _read_region_hosts(self):
+        """Get the host list of every known region from config_0.properties"""
+        hosts = {
+            region: parse_host_list(value)
+            for region, value in DEFAULT_REGION_HOSTS.items()
+        }
+        if os.path.exists(self.properties_file):
+            try:
+                for key, value in read_properties(self.properties_file).items():
+                    if key.endswith("_HOSTS"):
+                        hosts[key] = parse_host_list(value)
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"Error reading region hosts: {e}")
+        regions = self.mdds_regions + self.fpss_regions
+        return {region: hosts.get(region, []) for region in regions}
+
+    def probe_regions(self, rounds=3):
+        """Measure latency to every region's hosts; returns per-region results"""
+        region_hosts = self._read_region_hosts()
+        current = (
+            {
+                region: [(h.host, h.port) for h in stats]
+                for region, stats in self.region_probe.regions.items()
+            }
+            if self.region_probe
+            else None
+        )
+        # Keep rolling statistics unless the host lists changed
+        if current != region_hosts:
+            self.region_probe = RegionProbe(region_hosts)
+        return self.region_probe.probe(rounds=rounds)
+
+    @traced("terminal.select_regions")
+    def select_fastest_regions(self):
+        """Probe regions and switch to the fastest production MDDS/FPSS regions"""
+        self.probe_regions()
+        mdds, fpss = self.fastest_regions()
+        mdds = mdds or self.current_mdds_region
+        fpss = fpss or self.current_fpss_region
+        if self.log_callback:
+            self.log_callback(
+                f"Fastest regions: MDDS={mdds} "
+                f"({self._format_latency(mdds)}), FPSS={fpss} "
+                f"({self._format_latency(fpss)})"
+            )
+        if (mdds, fpss) != (self.current_mdds_region, self.current_fpss_region):
+            self.update_server_regions(mdds, fpss)
+        return mdds, fpss
+
+    def has_region_choice(self):
+        """True if MDDS or FPSS has more than one production region to pick
+        from; with the stock properties file (NJ only) there is none"""
+        return any(
+            len([r for r in regions if is_production_region(r)]) > 1
+            for regions in (self.mdds_regions, self.fpss_regions)
+        )
+
+    def fastest_regions(self):
+        """(mdds, fpss) from the last probe: the fastest reachable production
+        region of each service, the current region where there is no other
+        production region to choose, and None where none was reachable"""
+        chosen = []
+        for regions, current in (
+            (self.mdds_regions, self.current_mdds_region),
+            (self.fpss_regions, self.current_fpss_region),
+        ):
+            candidates = [r for r in regions if is_production_region(r)]
+            if len(candidates) < 2:
+                chosen.append(current)
+            elif self.region_probe:
+                chosen.append(self.region_probe.fastest(candidates))
+            else:
+                chosen.append(None)
+        return tuple(chosen)
+
+    def refresh_region_probe(self):
+        """Probe regions on a background thread (one probe at a time)"""
+        with self._probe_lock:
+            if self._probe_running:
+                return
+            self._probe_running = True
+
+        def run():
+            try:
+                self.probe_regions()
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"Region probe failed: {e}")
+            finally:
+                self._probe_running = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _select_probed_regions(self):
+        """Switch to the fastest regions of the last probe without waiting on
+        the network, and refresh the probe in the background for next time"""
+        probe = self.region_probe
+        mdds, fpss = self.fastest_regions()
+        if mdds and fpss:
+            if (mdds, fpss) != (self.current_mdds_region, self.current_fpss_region):
+                if self.log_callback:
+                    self.log_callback(
+                        f"Fastest regions: MDDS={mdds} "
+                        f"({self._format_latency(mdds)}), FPSS={fpss} "
+                        f"({self._format_latency(fpss)})"
+                    )
+                self.update_server_regions(mdds, fpss)
+        elif self.log_callback:
+            self.log_callback(
+                (
+                    "No region was reachable in the last probe"
+                    if probe
+                    else "No region latency results yet"
+                )
+                + "; starting with the configured regions."
+            )
+        self.refresh_region_probe()
+
+    def _format_latency(self, region):
+        latency = (
+            self.region_probe.region_latency(region) if self.region_probe else None
+        )
+        if latency is None or latency == float("inf"):
+            return "unreachable"
+        return f"{latency * 1000:.1f} ms"
+
+    def start_config_watcher(self):
+        """Watch config.json and config_0.properties for external changes"""
+        if self.config_watcher:
+            return
+        self.config_watcher = ConfigWatcher()
+        self.config_watcher.error_callback = self.log_callback
+        self.config_watcher.watch(self.config_file, self._on_config_json_changed)
+        self.config_watcher.watch(self.properties_file, self._on_properties_changed)
+        self.config_watcher.start()
+
+    def stop_config_watcher(self):
+        if self.config_watcher:
+            self.config_watcher.stop()
+            self.config_watcher = None
+
+    def _on_config_json_changed(self, path):
+        """Reload config.json; restart only if the credentials changed"""
+        old_credentials = (self.username, self.password)
+        self.load_config()
+        if self.log_callback:
+            self.log_callback("config.json changed on disk, reloaded.")
+        if (self.username, self.password) != old_credentials:
+            self._schedule_config_restart("credentials changed")
+
+    def _on_properties_changed(self, path):
+        """Reload config_0.properties; restart only if the regions changed"""
+        old_regions = (self.current_mdds_region, self.current_fpss_region)
+        self._read_properties_file()
+        if (self.current_mdds_region, self.current_fpss_region) != old_regions:
+            self._schedule_config_restart("server regions changed")
+
+    def _schedule_config_restart(self, reason):
+        """Restart the running terminal after a config change, if enabled"""
+        if not self.running:
+            return
+        if not self.restart_on_config_change:
+            if self.log_callback:
+                self.log_callback(
+                    f"Config change ({reason}) takes effect on the next start."
+                )
+            return
+        if self._restart_timer:
+            self._restart_timer.cancel()
+        if self.log_callback:
+            self.log_callback(
+                f"Config change ({reason}): restarting terminal in {self.restart_delay:.0f}s..."
+            )
+        self._restart_timer = threading.Timer(self.restart_delay, self.restart_terminal)
+        self._restart_timer.daemon = True
+        self._restart_timer.start()
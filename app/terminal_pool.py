@@ -0,0 +1,215 @@
+import os
+import shutil
+import threading
+import time
+
+from .properties_file import update_properties
+from .terminal_manager import DEFAULT_PORTS, TerminalManager
+
+# Ports of instance N are the defaults shifted by N * PORT_STRIDE
+PORT_STRIDE = 100
+
+
+class TerminalPool:
+    """Launch and supervise several isolated terminals on one host.
+
+    Each instance is a TerminalManager with its own config_<index>.properties,
+    ports, JAR version, credentials and log stream. Instances that exit without
+    being asked to stop are restarted with exponential backoff.
+    """
+
+    def __init__(self, log_callback=None, check_interval=2.0):
+        self.instances = {}  # name -> TerminalManager, in insertion order
+        self.auto_restart = {}  # name -> bool
+        self.restarts = {}  # name -> number of supervisor restarts
+        self._backoff = {}  # name -> (next attempt time, current delay)
+        self.log_callback = log_callback
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._supervisor = None
+        self.failover = None  # FailoverManager owning two of the instances
+
+    @classmethod
+    def from_config(cls, config, primary=None, log_callback=None):
+        """Build a pool from the "instances" list in config.json.
+
+        `primary` is the manager for config index 0 (the one the main window
+        drives); it is included so status covers every terminal on the host.
+        """
+        pool = cls(log_callback=log_callback)
+        if primary is not None:
+            pool.add(primary, auto_restart=config.get("auto_restart", False))
+        for number, spec in enumerate(config.get("instances", []), 1):
+            try:
+                pool.add_from_spec(spec, config)
+            except (KeyError, TypeError, ValueError) as e:
+                # One bad entry must not cost the user every other terminal
+                if log_callback:
+                    log_callback(
+                        f"Skipping instance {number} in config.json: "
+                        f"{type(e).__name__}: {e}"
+                    )
+        return pool
+
+    def _log(self, name, message):
+        if self.log_callback:
+            self.log_callback(f"[{name}] {message}")
+
+    def add(self, manager, auto_restart=False):
+        with self._lock:
+            if manager.name in self.instances:
+                raise ValueError(f"Duplicate terminal instance name: {manager.name}")
+            self.instances[manager.name] = manager
+            self.auto_restart[manager.name] = auto_restart
+            self.restarts[manager.name] = 0
+        if manager.log_callback is None:
+            manager.set_log_callback(lambda line, n=manager.name: self._log(n, line))
+        return manager
+
+    def add_from_spec(self, spec, defaults=None):
+        """Create an instance from a config.json "instances" entry"""
+        defaults = defaults or {}
+        index = int(spec["config_index"])
+        if index == 0:
+            raise ValueError("config_index 0 is reserved for the primary terminal")
+        manager = TerminalManager(
+            config_index=index,
+            name=spec.get("name") or f"terminal-{index}",
+            config_file=None,
+        )
+        manager.username = spec.get("username", defaults.get("username", ""))
+        manager.password = spec.get("password", defaults.get("password", ""))
+        if spec.get("jar_version"):
+            manager.set_jar_version(spec["jar_version"])
+        if spec.get("jar_file"):
+            manager.jar_file = spec["jar_file"]
+        if spec.get("launch_command"):
+            manager.launch_command = spec["launch_command"]
+        self.add(manager, auto_restart=spec.get("auto_restart", True))
+
+        ports = {
+            key: value + index * PORT_STRIDE for key, value in DEFAULT_PORTS.items()
+        }
+        ports.update(spec.get("ports", {}))
+        manager.default_ports = ports
+        self._prepare_properties(manager, ports, spec)
+        return manager
+
+    def _prepare_properties(self, manager, ports, spec):
+        """Create/update config_<index>.properties with the instance's settings"""
+        base = os.path.join(manager.config_folder, "config_0.properties")
+        if not os.path.exists(manager.properties_file):
+            if not os.path.exists(base):
+                self._log(
+                    manager.name,
+                    "config_0.properties not found; run the primary terminal once "
+                    "so instance settings can be derived from it.",
+                )
+                return
+            shutil.copyfile(base, manager.properties_file)
+
+        updates = {key: str(port) for key, port in ports.items()}
+        if spec.get("mdds_region"):
+            updates["MDDS_REGION"] = spec["mdds_region"]
+        if spec.get("fpss_region"):
+            updates["FPSS_REGION"] = spec["fpss_region"]
+        update_properties(manager.properties_file, updates)
+        manager._read_properties_file()
+
+    def recover_orphans(self, policy="adopt"):
+        """Adopt or reap terminals left running by a crashed manager"""
+        return {
+            name: manager.recover_previous_terminal(policy)
+            for name, manager in list(self.instances.items())
+        }
+
+    def get(self, name):
+        return self.instances[name]
+
+    def start(self, name):
+        manager = self.instances[name]
+        self._backoff.pop(name, None)
+        if self.failover and self.failover.manages(name):
+            return self.failover.start_service()
+        return manager.start_terminal(manager.username, manager.password)
+
+    def stop(self, name):
+        if self.failover and self.failover.manages(name):
+            return self.failover.stop_service()
+        return self.instances[name].stop_terminal()
+
+    def restart(self, name):
+        if self.failover and self.failover.manages(name):
+            return self.failover.restart_service()
+        return self.instances[name].restart_terminal()
+
+    def start_all(self):
+        """Start every instance that is not already running"""
+        results = {}
+        for name, manager in list(self.instances.items()):
+            if not manager.is_running():
+                results[name] = self.start(name)
+        self.start_supervisor()
+        return results
+
+    def stop_all(self):
+        """Stop all instances in parallel"""
+        threads = [
+            threading.Thread(target=manager.stop_terminal, daemon=True)
+            for manager in self.instances.values()
+            if manager.is_running()
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=15.0)
+
+    def any_running(self):
+        return any(m.is_running() for m in self.instances.values())
+
+    def start_supervisor(self):
+        if self._supervisor and self._supervisor.is_alive():
+            return
+        self._stop_event.clear()
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+
+    def stop_supervisor(self):
+        self._stop_event.set()
+
+    def _supervise(self):
+        while not self._stop_event.wait(self.check_interval):
+            now = time.monotonic()
+            for name, manager in list(self.instances.items()):
+                if not (self.auto_restart.get(name) and manager.has_crashed()):
+                    continue
+                next_attempt, delay = self._backoff.get(name, (0.0, 1.0))
+                if now < next_attempt:
+                    continue
+                # An instance that stayed up for a minute starts over quickly
+                if manager.started_at and now - manager.started_at > 60.0:
+                    delay = 1.0
+                self._log(name, "Terminal exited unexpectedly, restarting...")
+                self.restarts[name] += 1
+                manager.metrics.supervisor_restarts.inc()
+                manager.running = False
+                manager.start_terminal(manager.username, manager.password)
+                self._backoff[name] = (now + delay, min(delay * 2, 60.0))
+
+    def status(self):
+        """Per-instance status plus aggregate counts"""
+        instances = []
+        for name, manager in list(self.instances.items()):
+            status = manager.get_status()
+            status["restarts"] = self.restarts.get(name, 0)
+            status["auto_restart"] = self.auto_restart.get(name, False)
+            status["crashed"] = manager.has_crashed()
+            instances.append(status)
+        return {
+            "total": len(instances),
+            "running": sum(1 for s in instances if s["running"]),
+            "crashed": sum(1 for s in instances if s["crashed"]),
+            "restarts": sum(s["restarts"] for s in instances),
+            "instances": instances,
+        }
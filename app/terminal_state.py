@@ -0,0 +1,206 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from .paths import manager_data_dir
+
+
+def _records_dir(data_dir=None):
+    return os.path.join(data_dir or manager_data_dir(), "terminals")
+
+
+def record_path(name, data_dir=None):
+    return os.path.join(_records_dir(data_dir), f"{name}.json")
+
+
+def write_record(name, pid, data_dir=None, **extra):
+    """Remember a launched terminal so a later manager can find it.
+
+    The command line is not stored: it contains the credentials. Records
+    live under `data_dir` (default: manager_data_dir()).
+    """
+    record = dict(
+        extra,
+        pid=pid,
+        start_time=process_start_time(pid),
+        manager_pid=os.getpid(),
+        launched_at=time.time(),
+    )
+    os.makedirs(_records_dir(data_dir), exist_ok=True)
+    path = record_path(name, data_dir)
+    with open(path + ".tmp", "w") as f:
+        json.dump(record, f)
+    os.replace(path + ".tmp", path)
+
+
+def read_record(name, data_dir=None):
+    try:
+        with open(record_path(name, data_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def remove_record(name, pid=None, data_dir=None):
+    """Delete the record (only if it still describes `pid`, when given)"""
+    if pid is not None:
+        record = read_record(name, data_dir)
+        if record and record.get("pid") != pid:
+            return
+    try:
+        os.unlink(record_path(name, data_dir))
+    except OSError:
+        pass
+
+
+def _proc_stat(pid):
+    """Fields of /proc/<pid>/stat after the command name, or None"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # proc(5) field N (1-based) is at index N - 3
+    return stat[stat.rfind(b")") + 2 :].split()
+
+
+def process_start_time(pid):
+    """Start time of a process in clock ticks since boot (Linux), or None.
+
+    Together with the PID this identifies a process even after PID reuse.
+    """
+    fields = _proc_stat(pid)
+    if fields is None or fields[0] == b"Z":
+        return None
+    return int(fields[19])
+
+
+def process_cmdline(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return [
+                arg.decode(errors="replace") for arg in f.read().split(b"\0") if arg
+            ]
+    except OSError:
+        return []
+
+
+def process_cwd(pid):
+    try:
+        return os.readlink(f"/proc/{pid}/cwd")
+    except OSError:
+        return None
+
+
+def is_same_process(pid, start_time):
+    """True if `pid` is alive and is still the process that was recorded"""
+    current = process_start_time(pid)
+    return current is not None and current == start_time
+
+
+def scan_terminals(jar_name):
+    """PIDs of session-leader JVMs running `jar_name`, i.e. ones a manager
+    launched with setsid, found by a single pass over /proc. Only our own
+    user's processes are returned: another user's terminal is never ours to
+    adopt or stop."""
+    found = []
+    jar_name = os.path.basename(jar_name)
+    uid = os.getuid()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            if os.stat(f"/proc/{entry}").st_uid != uid:
+                continue
+        except OSError:
+            continue  # Exited
+        fields = _proc_stat(entry)
+        if fields is None or fields[0] == b"Z" or int(fields[3]) != int(entry):
+            continue
+        cmdline = process_cmdline(entry)
+        if (
+            cmdline
+            and "java" in os.path.basename(cmdline[0])
+            and any(os.path.basename(arg) == jar_name for arg in cmdline)
+        ):
+            found.append((int(entry), cmdline))
+    return found
+
+
+def can_recover():
+    """Orphan recovery needs /proc to verify process identities"""
+    return sys.platform.startswith("linux") and os.path.isdir("/proc")
+
+
+class AdoptedProcess:
+    """Popen-like handle for a terminal launched by an earlier manager.
+
+    It is not our child, so there are no pipes, and the exit status can't be
+    collected; an exited process reports returncode 0.
+    """
+
+    stdin = None
+    stdout = None
+    stderr = None
+
+    def __init__(self, pid, start_time):
+        self.pid = pid
+        self.start_time = start_time
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None and not is_same_process(self.pid, self.start_time):
+            self.returncode = 0
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(str(self.pid), timeout)
+            time.sleep(0.05)
+        return self.returncode
+
+    def send_signal(self, sig):
+        """Signal the process; False if we may not (another user's process)"""
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+            except PermissionError:
+                return False
+        return True
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+def reap(pid, start_time, timeout=5.0):
+    """Stop an orphaned terminal's process group: SIGTERM, then SIGKILL.
+
+    Returns False if it is still running, including when we are not allowed
+    to signal it."""
+    process = AdoptedProcess(pid, start_time)
+    for sig, wait in ((signal.SIGTERM, timeout), (signal.SIGKILL, 2.0)):
+        if process.poll() is not None:
+            return True
+        try:
+            os.killpg(pid, sig)  # Launched with setsid: pgid == pid
+        except ProcessLookupError:
+            return True
+        except OSError:
+            if not process.send_signal(sig):
+                return False
+        try:
+            process.wait(wait)
+            return True
+        except subprocess.TimeoutExpired:
+            continue
+    return False
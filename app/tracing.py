@@ -0,0 +1,185 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from itertools import count
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "thread_id",
+        "attrs",
+        "_tracer",
+    )
+
+    def __init__(self, tracer, name, attrs, parent_id, start_ns=None):
+        self._tracer = tracer
+        self.name = name
+        self.span_id = next(tracer._ids)
+        self.parent_id = parent_id
+        self.start_ns = start_ns if start_ns is not None else time.monotonic_ns()
+        self.end_ns = None
+        self.thread_id = threading.get_native_id()
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Add attributes to the span"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._tracer._stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.monotonic_ns()
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        stack = self._tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        self._tracer._records.append(self)
+        return False
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (
+                (self.end_ns - self.start_ns) / 1e6 if self.end_ns is not None else 0.0
+            ),
+            "thread_id": self.thread_id,
+            "attrs": self.attrs,
+        }
+
+
+class _NoopSpan:
+    """Shared stand-in returned while tracing is disabled"""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Nested spans with monotonic timestamps in a bounded in-memory buffer"""
+
+    def __init__(self, capacity=20000, enabled=False):
+        self.enabled = enabled
+        self._records = deque(maxlen=capacity)  # Finished spans and events
+        self._local = threading.local()
+        self._ids = count(1)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _parent_id(self):
+        stack = self._stack()
+        return stack[-1].span_id if stack else None
+
+    def span(self, name, **attrs):
+        """Context manager timing a block; nests under the current span"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs, self._parent_id())
+
+    def event(self, name, **attrs):
+        """Record an instant event (a zero-length span)"""
+        if not self.enabled:
+            return
+        span = Span(self, name, attrs, self._parent_id())
+        span.end_ns = span.start_ns
+        self._records.append(span)
+
+    def record(self, name, start_monotonic, end_monotonic=None, **attrs):
+        """Record a span measured elsewhere, from time.monotonic() values"""
+        if not self.enabled:
+            return
+        span = Span(self, name, attrs, None, start_ns=int(start_monotonic * 1e9))
+        end = end_monotonic if end_monotonic is not None else time.monotonic()
+        span.end_ns = int(end * 1e9)
+        self._records.append(span)
+
+    def records(self):
+        return sorted(list(self._records), key=lambda s: s.start_ns)
+
+    def clear(self):
+        self._records.clear()
+
+    def export_jsonl(self, path):
+        """Write one JSON object per span"""
+        with open(path, "w") as f:
+            for span in self.records():
+                f.write(json.dumps(span.to_dict()) + "\n")
+
+    def export_chrome(self, path):
+        """Write the Chrome trace-event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for span in self.records():
+            event = {
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "pid": pid,
+                "tid": span.thread_id,
+                "ts": span.start_ns / 1000,
+                "args": dict(span.attrs, span_id=span.span_id),
+            }
+            if span.end_ns == span.start_ns:
+                event.update(ph="i", s="t")
+            else:
+                event.update(ph="X", dur=(span.end_ns - span.start_ns) / 1000)
+            events.append(event)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export(self, path):
+        """Export by extension: .jsonl for JSON lines, anything else Chrome"""
+        if path.endswith(".jsonl"):
+            self.export_jsonl(path)
+        else:
+            self.export_chrome(path)
+
+
+# Shared tracer; enabled by --trace FILE or THETA_TRACE=FILE
+tracer = Tracer()
+
+
+def traced(name):
+    """Decorator wrapping a function call in a span (free when disabled)"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            instance = getattr(args[0], "name", None) if args else None
+            attrs = {"instance": instance} if isinstance(instance, str) else {}
+            with tracer.span(name, **attrs):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,91 @@
+import collections
+import time
+import traceback
+
+
+class UIDispatcher:
+    """Single path from worker threads to the Tk thread.
+
+    Worker threads never touch widgets: they queue log messages and calls,
+    or mark the view state dirty. A timer on the Tk thread drains the queue
+    at most `max_fps` times a second, writing consecutive log messages in
+    one batch, and calls `render` once per frame if the state changed, no
+    matter how many updates arrived in between. Every method except
+    start() may be called from any thread.
+    """
+
+    def __init__(self, root, write_log, render, max_fps=30, idle_interval=0.1):
+        self.root = root
+        self.write_log = write_log  # fn(list of messages), on the Tk thread
+        self.render = render  # fn(), on the Tk thread
+        self.frame_ms = max(1, int(1000 / max_fps))
+        self.idle_ms = max(self.frame_ms, int(idle_interval * 1000))
+        self._queue = collections.deque()  # str (log message) or (fn, args)
+        self._dirty = True
+        self._last_activity = 0.0
+        self.frames = 0  # Frames that rendered or wrote something
+
+    def start(self):
+        self.root.after(0, self._tick)
+        return self
+
+    def log(self, message):
+        self._queue.append(message)
+
+    def post(self, fn, *args):
+        """Run fn(*args) on the Tk thread, in order with queued log messages"""
+        self._queue.append((fn, args))
+
+    def invalidate(self):
+        """Re-render the view state at the next frame"""
+        self._dirty = True
+
+    def flush(self):
+        """Drain the queue and render now (Tk thread only)"""
+        queue = self._queue
+        batch = []
+        worked = False
+        # Only what was queued before this frame; later items wait for the next
+        for _ in range(len(queue)):
+            item = queue.popleft()
+            if isinstance(item, str):
+                batch.append(item)
+                continue
+            if batch:
+                self._write(batch)
+                batch = []
+            fn, args = item
+            try:
+                fn(*args)
+            except Exception:
+                traceback.print_exc()
+            worked = True
+        if batch:
+            self._write(batch)
+            worked = True
+        if self._dirty:
+            self._dirty = False
+            try:
+                self.render()
+            except Exception:
+                traceback.print_exc()
+            worked = True
+        return worked
+
+    def _write(self, batch):
+        try:
+            self.write_log(batch)
+        except Exception:
+            traceback.print_exc()
+
+    def _tick(self):
+        now = time.monotonic()
+        if self.flush():
+            self.frames += 1
+            self._last_activity = now
+        # Poll at the frame rate while busy, more slowly once idle
+        busy = now - self._last_activity < 1.0
+        try:
+            self.root.after(self.frame_ms if busy else self.idle_ms, self._tick)
+        except Exception:
+            pass  # Root destroyed
@@ -1,15 +1,59 @@
 import tkinter as tk
 from tkinter import ttk
-import pyperclip
 import os
 import threading
 import time
 from tkinter import messagebox
 from . import set_window_icon
+from .dispatcher import UIDispatcher
+from .status_panel import StatusPanel, format_duration
+from ..log_dedup import RepeatSummary
+from ..log_index import DEBUG, ERROR, INFO, LEVEL_NAMES, NONE, WARN, LogIndex
+
+# Levels shown for each choice of the log view's level filter
+LEVEL_FILTERS = {
+    "All levels": None,
+    "Hide debug": {NONE, INFO, WARN, ERROR},
+    "Warnings and errors": {WARN, ERROR},
+    "Errors only": {ERROR},
+}
+LEVEL_TAGS = {level: f"level_{name}" for level, name in LEVEL_NAMES.items()}
+LEVEL_TAG_SET = set(LEVEL_TAGS.values())
+LEVEL_COLORS = {ERROR: "#c00000", WARN: "#b36b00", DEBUG: "#808080"}
+
+
+def configure_level_tags(text):
+    """Create the per-level tags; lines are colored as they are inserted"""
+    for level, tag in LEVEL_TAGS.items():
+        if level in LEVEL_COLORS:
+            text.tag_configure(tag, foreground=LEVEL_COLORS[level])
+        else:
+            text.tag_configure(tag)
+
+
+def insert_log_lines(text, log_index, message):
+    """Index a message and append it to a Text widget in one insert call.
+
+    Each line is tagged with its level when inserted, consecutive lines of
+    the same level sharing one tag range, so highlighting never rescans the
+    widget.
+    """
+    args = []
+    run_level = None
+    run_lines = []
+    for line in message.split("\n"):
+        level = log_index.add(line)
+        if level != run_level and run_lines:
+            args += ("\n".join(run_lines) + "\n", LEVEL_TAGS[run_level])
+            run_lines = []
+        run_level = level
+        run_lines.append(line)
+    args += ("\n".join(run_lines) + "\n", LEVEL_TAGS[run_level])
+    text.insert(tk.END, *args)
 
 
 class ServerSettingsDialog:
-    def __init__(self, parent, terminal_manager):
+    def __init__(self, parent, terminal_manager, dispatcher):
         # Create a new top-level window
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Server Settings")
@@ -20,15 +64,15 @@ class ServerSettingsDialog:
         set_window_icon(self.dialog)
 
         # Make dialog appear in center of parent
-        self.dialog.geometry("400x250")  # Increased height to accommodate buttons
+        self.dialog.geometry("460x300")  # Room for buttons and latency labels
         self.dialog.resizable(False, False)
 
         self.terminal_manager = terminal_manager
+        self.dispatcher = dispatcher  # Carries worker results to the Tk thread
+        self.probe_results = {}  # Latest region latency measurements
 
         # Check if config file exists
-        self.config_exists = os.path.exists(
-            os.path.join(self.terminal_manager.config_folder, "config_0.properties")
-        )
+        self.config_exists = os.path.exists(self.terminal_manager.properties_file)
 
         self.create_widgets()
 
@@ -58,6 +102,9 @@ class ServerSettingsDialog:
 
         ttk.Label(mdds_frame, text="MDDS Region:").pack(side=tk.LEFT)
 
+        self.mdds_latency_label = ttk.Label(mdds_frame, text="", width=12)
+        self.mdds_latency_label.pack(side=tk.RIGHT, padx=(5, 0))
+
         self.mdds_var = tk.StringVar(value=settings["mdds_region"])
         mdds_combo = ttk.Combobox(
             mdds_frame,
@@ -67,6 +114,7 @@ class ServerSettingsDialog:
             width=20,
         )
         mdds_combo.pack(side=tk.RIGHT)
+        mdds_combo.bind("<<ComboboxSelected>>", lambda e: self._show_latencies())
 
         # FPSS Region selection
         fpss_frame = ttk.Frame(main_frame)
@@ -74,6 +122,9 @@ class ServerSettingsDialog:
 
         ttk.Label(fpss_frame, text="FPSS Region:").pack(side=tk.LEFT)
 
+        self.fpss_latency_label = ttk.Label(fpss_frame, text="", width=12)
+        self.fpss_latency_label.pack(side=tk.RIGHT, padx=(5, 0))
+
         self.fpss_var = tk.StringVar(value=settings["fpss_region"])
         fpss_combo = ttk.Combobox(
             fpss_frame,
@@ -83,6 +134,27 @@ class ServerSettingsDialog:
             width=20,
         )
         fpss_combo.pack(side=tk.RIGHT)
+        fpss_combo.bind("<<ComboboxSelected>>", lambda e: self._show_latencies())
+
+        # Latency probing
+        probe_frame = ttk.Frame(main_frame)
+        probe_frame.pack(fill=tk.X, pady=(0, 5))
+
+        self.probe_btn = ttk.Button(
+            probe_frame, text="Measure Latency", command=self.measure_latency
+        )
+        self.probe_btn.pack(side=tk.LEFT)
+
+        self.fastest_btn = ttk.Button(
+            probe_frame,
+            text="Use Fastest",
+            command=self.use_fastest,
+            state=tk.DISABLED,
+        )
+        self.fastest_btn.pack(side=tk.LEFT, padx=(5, 0))
+
+        self.probe_status = ttk.Label(probe_frame, text="")
+        self.probe_status.pack(side=tk.LEFT, padx=(10, 0))
 
         # Warning about non-production servers
         ttk.Label(
@@ -120,6 +192,66 @@ class ServerSettingsDialog:
         )
         apply_btn.pack(side=tk.RIGHT)
 
+    def measure_latency(self):
+        """Probe all regions in the background and show the results"""
+        self.probe_btn.config(state=tk.DISABLED)
+        self.probe_status.config(text="Measuring...")
+
+        def probe_in_background():
+            try:
+                results = self.terminal_manager.probe_regions()
+            except Exception as e:
+                results = None
+                error = str(e)
+            else:
+                error = None
+            self.dispatcher.post(self._probe_complete, results, error)
+
+        threading.Thread(target=probe_in_background, daemon=True).start()
+
+    def _probe_complete(self, results, error):
+        """Handle probe completion on the main UI thread"""
+        if not self.dialog.winfo_exists():
+            return
+        self.probe_btn.config(state=tk.NORMAL)
+        if error:
+            self.probe_status.config(text=f"Probe failed: {error}")
+            return
+        self.probe_results = results
+        self.probe_status.config(text="Latency = median TCP round trip")
+        # Only production regions are candidates; with NJ alone there is
+        # nothing to choose
+        if self.config_exists and self.terminal_manager.has_region_choice():
+            self.fastest_btn.config(state=tk.NORMAL)
+        self._show_latencies()
+
+    def _show_latencies(self):
+        """Show the measured latency of the selected regions"""
+        if not self.probe_results:
+            return
+        for var, label in (
+            (self.mdds_var, self.mdds_latency_label),
+            (self.fpss_var, self.fpss_latency_label),
+        ):
+            result = self.probe_results.get(var.get())
+            if not result or not result["hosts"]:
+                label.config(text="no hosts", foreground="gray")
+            elif result["latency_ms"] is None:
+                label.config(text="unreachable", foreground="red")
+            else:
+                label.config(text=f"{result['latency_ms']:.1f} ms", foreground="")
+
+    def use_fastest(self):
+        """Select the fastest measured production regions"""
+        if not self.terminal_manager.region_probe:
+            return
+        mdds, fpss = self.terminal_manager.fastest_regions()
+        if mdds:
+            self.mdds_var.set(mdds)
+        if fpss:
+            self.fpss_var.set(fpss)
+        self._show_latencies()
+
     def reset_to_production(self):
         """Reset server regions to production defaults"""
         # Set to production server values
@@ -158,10 +290,229 @@ class ServerSettingsDialog:
             )
 
 
+class InstancesDialog:
+    """Status and control of every terminal instance in the pool"""
+
+    COLUMNS = (
+        ("name", "Instance", 110),
+        ("state", "State", 80),
+        ("pid", "PID", 60),
+        ("port", "HTTP Port", 70),
+        ("jar", "JAR", 90),
+        ("regions", "Regions", 150),
+        ("restarts", "Restarts", 60),
+        ("uptime", "Uptime", 70),
+    )
+
+    def __init__(self, parent, pool):
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Terminal Instances")
+        self.dialog.transient(parent)
+        set_window_icon(self.dialog)
+        self.dialog.geometry("720x300")
+
+        self.pool = pool
+        self.create_widgets()
+        self.refresh()
+
+    def create_widgets(self):
+        main_frame = ttk.Frame(self.dialog, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.summary_label = ttk.Label(main_frame, text="")
+        self.summary_label.pack(anchor=tk.W, pady=(0, 5))
+
+        self.tree = ttk.Treeview(
+            main_frame,
+            columns=[c[0] for c in self.COLUMNS],
+            show="headings",
+            height=8,
+            selectmode="browse",
+        )
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=tk.W)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Button(button_frame, text="Start", command=self._start_selected).pack(
+            side=tk.LEFT, padx=(0, 5)
+        )
+        ttk.Button(button_frame, text="Stop", command=self._stop_selected).pack(
+            side=tk.LEFT, padx=(0, 5)
+        )
+        ttk.Button(button_frame, text="Restart", command=self._restart_selected).pack(
+            side=tk.LEFT
+        )
+
+        ttk.Button(button_frame, text="Close", command=self.dialog.destroy).pack(
+            side=tk.RIGHT
+        )
+        ttk.Button(
+            button_frame,
+            text="Stop All",
+            command=lambda: self._run(self.pool.stop_all),
+        ).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Button(
+            button_frame,
+            text="Start All",
+            command=lambda: self._run(self.pool.start_all),
+        ).pack(side=tk.RIGHT, padx=(0, 5))
+
+    def refresh(self):
+        """Update the table once a second while the dialog is open"""
+        if not self.dialog.winfo_exists():
+            return
+        status = self.pool.status()
+        self.summary_label.config(
+            text=f"{status['running']} of {status['total']} running, "
+            f"{status['crashed']} crashed, {status['restarts']} restarts"
+        )
+        for instance in status["instances"]:
+            if instance["crashed"]:
+                state = "crashed"
+            elif instance["downloading"]:
+                state = "downloading"
+            else:
+                state = "running" if instance["running"] else "stopped"
+            values = (
+                instance["name"],
+                state,
+                instance["pid"] or "",
+                instance["ports"]["HTTP_PORT"],
+                instance["jar_version"],
+                f"{instance['mdds_region']}/{instance['fpss_region']}",
+                instance["restarts"],
+                format_duration(instance["uptime"]) if instance["running"] else "",
+            )
+            if self.tree.exists(instance["name"]):
+                self.tree.item(instance["name"], values=values)
+            else:
+                self.tree.insert("", tk.END, iid=instance["name"], values=values)
+        self.dialog.after(1000, self.refresh)
+
+    def _selected(self):
+        selection = self.tree.selection()
+        return selection[0] if selection else None
+
+    def _run(self, action, *args):
+        """Run a pool action without blocking the UI"""
+        threading.Thread(target=action, args=args, daemon=True).start()
+
+    def _start_selected(self):
+        name = self._selected()
+        if name:
+            self._run(self.pool.start, name)
+
+    def _stop_selected(self):
+        name = self._selected()
+        if name:
+            self._run(self.pool.stop, name)
+
+    def _restart_selected(self):
+        name = self._selected()
+        if name:
+            self._run(self.pool.restart, name)
+
+
+class LogAnalysisDialog:
+    """Summary of the terminal's log files, computed in the background"""
+
+    WINDOWS = {"15 minutes": 15, "1 hour": 60, "1 day": 1440}
+
+    def __init__(self, parent, terminal_manager, dispatcher):
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Log Analysis")
+        self.dialog.transient(parent)
+        set_window_icon(self.dialog)
+        self.dialog.geometry("560x420")
+
+        self.terminal_manager = terminal_manager
+        self.dispatcher = dispatcher  # Carries the report to the Tk thread
+        self.create_widgets()
+        self.analyze()
+
+    def create_widgets(self):
+        main_frame = ttk.Frame(self.dialog, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.report_text = tk.Text(
+            main_frame, wrap=tk.NONE, font=("Courier", 9), state=tk.DISABLED
+        )
+        self.report_text.pack(fill=tk.BOTH, expand=True)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(button_frame, text="Window:").pack(side=tk.LEFT, padx=(0, 5))
+        self.window_var = tk.StringVar(value="1 hour")
+        window_box = ttk.Combobox(
+            button_frame,
+            textvariable=self.window_var,
+            values=list(self.WINDOWS),
+            state="readonly",
+            width=10,
+        )
+        window_box.pack(side=tk.LEFT, padx=(0, 5))
+        window_box.bind("<<ComboboxSelected>>", lambda e: self.analyze())
+        self.analyze_btn = ttk.Button(
+            button_frame, text="Refresh", command=self.analyze
+        )
+        self.analyze_btn.pack(side=tk.LEFT)
+
+        ttk.Button(button_frame, text="Close", command=self.dialog.destroy).pack(
+            side=tk.RIGHT
+        )
+
+    def analyze(self):
+        """Analyze in a background thread; only changed files are re-read"""
+        self.analyze_btn.config(state=tk.DISABLED)
+        self._show(f"Analyzing {self.terminal_manager.logs_folder}...")
+        window_minutes = self.WINDOWS[self.window_var.get()]
+
+        def run():
+            try:
+                text = self.terminal_manager.analyze_logs(window_minutes).format()
+            except Exception as e:
+                text = f"Error analyzing logs: {e}"
+            self.dispatcher.post(self._finish, text)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _finish(self, text):
+        if self.dialog.winfo_exists():
+            self._show(text)
+            self.analyze_btn.config(state=tk.NORMAL)
+
+    def _show(self, text):
+        self.report_text.config(state=tk.NORMAL)
+        self.report_text.delete(1.0, tk.END)
+        self.report_text.insert(tk.END, text)
+        self.report_text.config(state=tk.DISABLED)
+
+
 class MainWindow:
-    def __init__(self, root, terminal_manager):
+    def __init__(self, root, terminal_manager=None, pool=None):
+        # Without a terminal_manager the window paints with its controls
+        # disabled until attach_manager(); see run_gui
         self.root = root
-        self.terminal_manager = terminal_manager
+        self.terminal_manager = None
+        self.pool = pool  # TerminalPool with every instance, including ours
+        self.session_started = time.time()  # Start of the range "Export" writes
+        self.log_index = LogIndex()  # Line N of log_index is text line N + 1
+        self.search_hits = []
+        self.search_position = -1
+        self._last_query = None  # Enter on an unchanged query steps to the next hit
+        self._log_generation = 0  # Bumped by "Clear" to retire repeat counters
+
+        # View state; workers change it and the dispatcher renders it
+        self.stopping = False
+        self.download_progress = None  # (percentage, downloaded, total_size)
+        self._progress_shown = False
+        self._rendered = {}  # Widget options applied by the last render
+        self.dispatcher = UIDispatcher(root, self._write_log, self._render)
 
         # Set a minimum size for the window
         self.root.minsize(600, 400)
@@ -176,26 +527,61 @@ class MainWindow:
         # Create the control frame with start/stop buttons
         self._create_control_frame()
 
+        # Live status of every instance, refreshed once a second
+        self.status_panel = StatusPanel(
+            self.main_frame, [], log_callback=self._append_log
+        )
+        self.status_panel.pack(fill=tk.X, pady=(0, 10))
+
         # Create the log area
         self._create_log_area()
 
         # Create download progress bar (hidden by default)
         self._create_progress_bar()
 
-        # Set the callbacks
-        self.terminal_manager.set_log_callback(self._append_log)
-        self.terminal_manager.set_download_progress_callback(self._update_progress)
-        self.terminal_manager.set_download_complete_callback(self._download_complete)
-        self.terminal_manager.set_auto_start_complete_callback(
-            self._auto_start_complete
-        )
+        # Render the initial state and start draining worker events
+        self.dispatcher.start()
+        if terminal_manager is not None:
+            self.attach_manager(terminal_manager)
 
-        # Initialize UI state
+    def attach_manager(self, terminal_manager):
+        """Drive `terminal_manager` from this window"""
+        self.terminal_manager = terminal_manager
+        terminal_manager.set_log_callback(self._append_log)
+        terminal_manager.set_repeat_callback(self._track_repeats)
+        terminal_manager.set_download_progress_callback(self._update_progress)
+        terminal_manager.set_download_complete_callback(self._download_complete)
+        terminal_manager.set_auto_start_complete_callback(self._auto_start_complete)
+        self.status_panel.set_managers([terminal_manager])
+        self.dispatcher.invalidate()
+
+    def bring_to_front(self):
+        """Restore and raise the window (when the app is launched again)"""
+        self.root.deiconify()
+        self.root.lift()
+        self.root.attributes("-topmost", True)
+        self.root.after(200, lambda: self.root.attributes("-topmost", False))
+        self.root.focus_force()
+
+    def finish_startup(self):
+        """Work deferred until after the first paint"""
+        # Credentials are only known once the manager has read config.json
+        self.username_var.set(self.terminal_manager.username)
+        self.password_var.set(self.terminal_manager.password)
+
+        # A terminal adopted from a previous session is already running
         self._update_ui_state()
 
         # Check if JAR file exists on startup
         self._check_jar_file()
 
+    def attach_pool(self, pool):
+        """Attach the instance pool once it has been created"""
+        self.pool = pool
+        self.pool.log_callback = self._append_log
+        self.instances_btn.config(state=tk.NORMAL)
+        self.status_panel.set_managers(pool.instances.values())
+
     def _create_credential_frame(self):
         """Create the frame for username and password inputs"""
         cred_frame = ttk.Frame(self.main_frame)
@@ -205,7 +591,7 @@ class MainWindow:
         ttk.Label(cred_frame, text="Username:").grid(
             row=0, column=0, sticky=tk.W, padx=(0, 5)
         )
-        self.username_var = tk.StringVar(value=self.terminal_manager.username)
+        self.username_var = tk.StringVar()  # Set by finish_startup
         self.username_entry = ttk.Entry(
             cred_frame, textvariable=self.username_var, width=20
         )
@@ -215,7 +601,7 @@ class MainWindow:
         ttk.Label(cred_frame, text="Password:").grid(
             row=0, column=2, sticky=tk.W, padx=(10, 5)
         )
-        self.password_var = tk.StringVar(value=self.terminal_manager.password)
+        self.password_var = tk.StringVar()
         self.password_entry = ttk.Entry(
             cred_frame, textvariable=self.password_var, show="*", width=20
         )
@@ -273,6 +659,12 @@ class MainWindow:
             command=self._open_logs_folder,
         ).pack(side=tk.LEFT, padx=(0, 5))
 
+        ttk.Button(
+            self.control_frame,
+            text="📊 Analyze",
+            command=self._open_log_analysis,
+        ).pack(side=tk.LEFT, padx=(0, 5))
+
         ttk.Button(
             self.control_frame,
             text="📁 Config",
@@ -284,7 +676,16 @@ class MainWindow:
             self.control_frame,
             text="🌐 Servers",
             command=self._open_server_settings,
-        ).pack(side=tk.LEFT)
+        ).pack(side=tk.LEFT, padx=(0, 5))
+
+        # Instance pool button (enabled once the pool is attached)
+        self.instances_btn = ttk.Button(
+            self.control_frame,
+            text="🗂 Instances",
+            command=self._open_instances,
+            state=tk.NORMAL if self.pool else tk.DISABLED,
+        )
+        self.instances_btn.pack(side=tk.LEFT)
 
         # Define styles for colored buttons
         self.root.tk_setPalette(background="#f0f0f0")
@@ -319,6 +720,38 @@ class MainWindow:
         # Log area label
         ttk.Label(log_frame, text="Log Output:").pack(anchor=tk.W)
 
+        # Search box and level filter, backed by the incremental log index
+        search_frame = ttk.Frame(log_frame)
+        search_frame.pack(fill=tk.X, pady=(2, 4))
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
+        search_entry.pack(side=tk.LEFT, padx=(0, 5))
+        search_entry.bind("<Return>", lambda e: self._search_log())
+        search_entry.bind("<Shift-Return>", lambda e: self._next_hit(-1))
+        ttk.Button(search_frame, text="Find", command=self._search_log).pack(
+            side=tk.LEFT
+        )
+        ttk.Button(
+            search_frame, text="◀", width=3, command=lambda: self._next_hit(-1)
+        ).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(
+            search_frame, text="▶", width=3, command=lambda: self._next_hit(1)
+        ).pack(side=tk.LEFT)
+        self.search_label = ttk.Label(search_frame, text="")
+        self.search_label.pack(side=tk.LEFT, padx=(5, 0))
+
+        self.level_filter_var = tk.StringVar(value="All levels")
+        level_filter = ttk.Combobox(
+            search_frame,
+            textvariable=self.level_filter_var,
+            values=list(LEVEL_FILTERS),
+            state="readonly",
+            width=18,
+        )
+        level_filter.pack(side=tk.RIGHT)
+        level_filter.bind("<<ComboboxSelected>>", lambda e: self._apply_level_filter())
+        ttk.Label(search_frame, text="Show:").pack(side=tk.RIGHT, padx=(0, 5))
+
         # Create a frame for the text widget and scrollbar
         text_frame = ttk.Frame(log_frame)
         text_frame.pack(fill=tk.BOTH, expand=True)
@@ -332,6 +765,11 @@ class MainWindow:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.log_text.config(yscrollcommand=scrollbar.set)
 
+        # Every line carries its level's tag; filtering only elides tags
+        configure_level_tags(self.log_text)
+        self.log_text.tag_configure("search_hit", background="#fff2a8")
+        self.log_text.tag_configure("repeat_count", foreground="#808080")
+
         # Create log control buttons
         log_controls = ttk.Frame(log_frame)
         log_controls.pack(fill=tk.X, pady=(5, 0))
@@ -340,6 +778,9 @@ class MainWindow:
             side=tk.LEFT, padx=(0, 5)
         )
         ttk.Button(log_controls, text="Copy to Clipboard", command=self._copy_log).pack(
+            side=tk.LEFT, padx=(0, 5)
+        )
+        ttk.Button(log_controls, text="Export...", command=self._export_log).pack(
             side=tk.LEFT
         )
 
@@ -354,87 +795,25 @@ class MainWindow:
             )
             if reply:
                 self._append_log("Starting download...")
-                self._update_ui_state_for_download(True)
                 self.terminal_manager._download_jar_file_async()
-                self.progress_frame.pack(
-                    fill=tk.X, pady=(0, 10), after=self.control_frame
-                )
+                self._update_progress(0, 0, 0)
             else:
                 self._append_log(
                     "Download cancelled. You'll need the JAR file to start the terminal."
                 )
 
     def _download_complete(self):
-        """Handle the download completion"""
-
-        # Use a separate thread to update UI state to avoid threading issues
-        def enable_ui():
-            time.sleep(0.5)  # Small delay to ensure all UI updates are processed
-            self._update_ui_state_for_download(False)
-            self._append_log("ThetaTerminal.jar is now ready to use.")
-
-            # Explicitly enable all input fields
-            self.root.after(100, self._force_enable_inputs)
-
-        threading.Thread(target=enable_ui, daemon=True).start()
-
-    def _force_enable_inputs(self):
-        """Force enable all input fields"""
-        self.username_entry.config(state=tk.NORMAL)
-        self.password_entry.config(state=tk.NORMAL)
-        self.show_password_btn.config(state=tk.NORMAL)
-        if not self.terminal_manager.is_running():
-            self.start_btn.config(state=tk.NORMAL)
-        self.root.update_idletasks()
-
-    def _update_ui_state_for_download(self, is_downloading):
-        """Update UI elements based on download state"""
-        state = tk.DISABLED if is_downloading else tk.NORMAL
-
-        # Update the input fields and buttons
-        self.username_entry.config(state=state)
-        self.password_entry.config(state=state)
-        self.show_password_btn.config(state=state)
-
-        # Only enable start button if not downloading and not running
-        if not is_downloading and not self.terminal_manager.is_running():
-            self.start_btn.config(state=tk.NORMAL)
-        else:
-            self.start_btn.config(state=tk.DISABLED)
-
-        # Force update
-        self.root.update_idletasks()
+        """Handle the download completion (called from the download thread)"""
+        self._append_log("ThetaTerminal.jar is now ready to use.")
+        self._update_ui_state()
 
     def _update_progress(self, percentage, downloaded, total_size):
-        """Update the progress bar and label"""
-        # Handle download completion
-        if percentage >= 100:
-            if self.progress_frame.winfo_ismapped():
-                self.progress_frame.pack_forget()
-                self._append_log("Download complete.")
-            return
-
-        # Show progress frame if not visible
-        if not self.progress_frame.winfo_ismapped():
-            self.progress_frame.pack(fill=tk.X, pady=(0, 10), after=self.control_frame)
-
-        # Format the label with progress information
-        if total_size > 0:
-            downloaded_mb = downloaded / (1024 * 1024)
-            total_mb = total_size / (1024 * 1024)
-            self.progress_label.config(
-                text=f"Downloading ThetaTerminal.jar: {percentage}% ({downloaded_mb:.1f} MB / {total_mb:.1f} MB)"
-            )
-        else:
-            self.progress_label.config(
-                text=f"Downloading ThetaTerminal.jar: {percentage}%"
-            )
-
-        # Update the progress bar
-        self.progress_bar["value"] = percentage
-
-        # Ensure the update is displayed immediately
-        self.root.update_idletasks()
+        """Record download progress (any thread); drawn at the next frame"""
+        previous = self.download_progress
+        self.download_progress = (percentage, downloaded, total_size)
+        if percentage >= 100 and previous and previous[0] < 100:
+            self._append_log("Download complete.")
+        self.dispatcher.invalidate()
 
     def _start_terminal(self):
         """Start the terminal with the given credentials"""
@@ -445,25 +824,40 @@ class MainWindow:
             self._append_log("Error: Username and password are required")
             return
 
-        success = self.terminal_manager.start_terminal(username, password)
-        if success:
-            self._update_ui_state()
-        elif self.terminal_manager.get_downloading_status():
-            self._update_ui_state_for_download(True)
+        failover = self.pool.failover if self.pool else None
+        if failover:
+            # Starts the primary/standby pair; may wait for a failover in progress
+            self.terminal_manager.username = username
+            self.terminal_manager.password = password
+            self.terminal_manager.save_config()
+
+            def start_pair():
+                failover.start_service()
+                self._update_ui_state()
+
+            threading.Thread(target=start_pair, daemon=True).start()
+        else:
+            self.terminal_manager.start_terminal(username, password)
+        self._update_ui_state()
+
+    def _is_running(self):
+        """True if the terminal this window controls is serving; with a
+        standby that is whichever instance is currently active"""
+        failover = self.pool.failover if self.pool else None
+        if failover:
+            return failover.active.is_running()
+        return self.terminal_manager.is_running()
 
     def _stop_terminal(self):
         """Stop the terminal if it's running"""
-        if not self.terminal_manager.is_running():
+        if not self._is_running():
             return
 
-        # Immediately update UI to show stopping state
-        self.stop_btn.config(state=tk.DISABLED, text="■ Stopping...")
-        self.start_btn.config(state=tk.DISABLED)
+        # Show the stopping state at the next frame
+        self.stopping = True
+        self._update_ui_state()
         self._append_log("Stopping terminal...")
 
-        # Force UI update
-        self.root.update_idletasks()
-
         # Set up a timeout to force UI update even if stop operation hangs
         timeout_timer = threading.Timer(5.0, self._force_stop_complete)
         timeout_timer.daemon = True
@@ -472,16 +866,16 @@ class MainWindow:
         # Run stop operation in background thread to avoid blocking UI
         def stop_in_background():
             try:
-                success = self.terminal_manager.stop_terminal()
-                # Cancel the timeout timer since we completed normally
+                if self.pool:
+                    # Stops whichever terminal is serving after a failover
+                    success = self.pool.stop(self.terminal_manager.name)
+                else:
+                    success = self.terminal_manager.stop_terminal()
                 timeout_timer.cancel()
-                # Schedule UI update on main thread
-                self.root.after(0, lambda: self._on_stop_complete(success))
+                self.dispatcher.post(self._on_stop_complete, success)
             except Exception as e:
-                # Cancel the timeout timer
                 timeout_timer.cancel()
-                # Schedule error handling on main thread
-                self.root.after(0, lambda: self._on_stop_error(str(e)))
+                self.dispatcher.post(self._on_stop_error, str(e))
 
         stop_thread = threading.Thread(target=stop_in_background, daemon=True)
         stop_thread.start()
@@ -489,64 +883,102 @@ class MainWindow:
     def _force_stop_complete(self):
         """Force complete the stop operation if it takes too long"""
         self._append_log("Stop operation timed out - forcing completion...")
-        self.root.after(0, lambda: self._on_stop_complete(False))
+        self.dispatcher.post(self._on_stop_complete, False)
 
     def _on_stop_complete(self, success):
         """Handle stop operation completion on main UI thread"""
+        if not self.stopping:
+            return  # Already completed by the timeout
         if success:
             self._append_log("Terminal stopped successfully.")
         else:
             self._append_log(
                 "Warning: Terminal stop operation may not have completed successfully."
             )
-
-        # Reset button states
-        self.stop_btn.config(text="■ Stop")
+        self.stopping = False
         self._update_ui_state()
 
     def _on_stop_error(self, error_msg):
         """Handle stop operation error on main UI thread"""
         self._append_log(f"Error stopping terminal: {error_msg}")
-
-        # Reset button states
-        self.stop_btn.config(text="■ Stop")
+        self.stopping = False
         self._update_ui_state()
 
     def _update_ui_state(self):
-        """Update UI elements based on the terminal state"""
-        running = self.terminal_manager.is_running()
-        downloading = self.terminal_manager.get_downloading_status()
-
-        # If downloading, use download-specific UI state
-        if downloading:
-            self._update_ui_state_for_download(True)
+        """Re-render the controls from the terminal state at the next frame.
+
+        Safe to call from any thread and as often as needed.
+        """
+        self.dispatcher.invalidate()
+
+    def _set(self, widget, **options):
+        """Configure only the options that differ from the last render"""
+        rendered = self._rendered.setdefault(str(widget), {})
+        changed = {k: v for k, v in options.items() if rendered.get(k) != v}
+        if changed:
+            widget.config(**changed)
+            rendered.update(changed)
+
+    def _render(self):
+        """Bring the controls in line with the view state (Tk thread)"""
+        if self.terminal_manager is None:
+            # First paint, before the manager exists
+            self._set(self.start_btn, state=tk.DISABLED)
+            self._set(self.stop_btn, state=tk.DISABLED)
             return
-
-        # Update button states
-        if running:
-            self.start_btn.config(state=tk.DISABLED)
-            self.stop_btn.config(state=tk.NORMAL)
-
-            # Disable input fields while running
-            self.username_entry.config(state=tk.DISABLED)
-            self.password_entry.config(state=tk.DISABLED)
-            self.show_password_btn.config(state=tk.DISABLED)
-        else:
-            self.start_btn.config(state=tk.NORMAL)
-            self.stop_btn.config(state=tk.DISABLED)
-
-            # Enable input fields when not running
-            self.username_entry.config(state=tk.NORMAL)
-            self.password_entry.config(state=tk.NORMAL)
-            self.show_password_btn.config(state=tk.NORMAL)
-
-        # Force update
-        self.root.update_idletasks()
+        running = self._is_running()
+        downloading = self.terminal_manager.get_downloading_status()
+        stopping = self.stopping
+
+        idle = not running and not downloading and not stopping
+        self._set(self.start_btn, state=tk.NORMAL if idle else tk.DISABLED)
+        self._set(
+            self.stop_btn,
+            state=tk.NORMAL if running and not stopping else tk.DISABLED,
+            text="■ Stopping..." if stopping else "■ Stop",
+        )
+        # Credentials can only be edited while the terminal is down
+        inputs = tk.NORMAL if not running and not downloading else tk.DISABLED
+        for widget in (
+            self.username_entry,
+            self.password_entry,
+            self.show_password_btn,
+        ):
+            self._set(widget, state=inputs)
+
+        progress = self.download_progress
+        show_progress = bool(progress) and downloading and progress[0] < 100
+        if show_progress != self._progress_shown:
+            self._progress_shown = show_progress
+            if show_progress:
+                self.progress_frame.pack(
+                    fill=tk.X, pady=(0, 10), after=self.control_frame
+                )
+            else:
+                self.progress_frame.pack_forget()
+        if show_progress:
+            percentage, downloaded, total_size = progress
+            if total_size > 0:
+                text = (
+                    f"Downloading ThetaTerminal.jar: {percentage}% "
+                    f"({downloaded / (1024 * 1024):.1f} MB / "
+                    f"{total_size / (1024 * 1024):.1f} MB)"
+                )
+            else:
+                text = f"Downloading ThetaTerminal.jar: {percentage}%"
+            self._set(self.progress_label, text=text)
+            self._set(self.progress_bar, value=percentage)
 
     def _append_log(self, message):
-        """Append a message to the log text area"""
+        """Append a message to the log text area (any thread)"""
+        if isinstance(message, RepeatSummary):
+            return  # The line's live repeat counter already shows it
+        self.dispatcher.log(message)
+
+    def _write_log(self, messages):
+        """Insert every message queued since the last frame at once"""
         self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, message + "\n")
+        insert_log_lines(self.log_text, self.log_index, "\n".join(messages))
         self.log_text.see(tk.END)  # Scroll to the end
         self.log_text.config(state=tk.DISABLED)
 
@@ -555,13 +987,127 @@ class MainWindow:
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
         self.log_text.config(state=tk.DISABLED)
+        self.log_index.clear()
+        self._log_generation += 1
+        self.search_hits = []
+        self.search_position = -1
+        self.search_label.config(text="")
+
+    def _track_repeats(self, run):
+        """Show a live repeat counter on a line that started repeating"""
+        self.dispatcher.post(self._start_repeat_counter, run)
+
+    def _start_repeat_counter(self, run):
+        # The run's first line is among the last few appended
+        lines = self.log_index.lines
+        for n in range(len(lines) - 1, max(len(lines) - 500, 0) - 1, -1):
+            if lines[n] == run.text:
+                self._refresh_repeat_counter(run, n, self._log_generation, "")
+                return
+
+    def _refresh_repeat_counter(self, run, n, generation, shown):
+        """Redraw the counter after line n while the run goes on (4 Hz)"""
+        if generation != self._log_generation:
+            return  # Log was cleared
+        closed = run.closed  # Read first: the summary after it is final
+        summary = run.summary()
+        if summary != shown:
+            start = f"{n + 1}.{len(run.text)}"
+            tags = [
+                t for t in self.log_text.tag_names(f"{n + 1}.0") if t in LEVEL_TAG_SET
+            ]
+            self.log_text.config(state=tk.NORMAL)
+            self.log_text.delete(start, f"{n + 1}.end")
+            self.log_text.insert(start, "  " + summary, tuple(tags) + ("repeat_count",))
+            self.log_text.config(state=tk.DISABLED)
+        if not closed:
+            self.root.after(
+                250, lambda: self._refresh_repeat_counter(run, n, generation, summary)
+            )
+
+    def _visible_levels(self):
+        return LEVEL_FILTERS[self.level_filter_var.get()]
+
+    def _apply_level_filter(self):
+        """Hide lines of filtered-out levels (no text is re-inserted)"""
+        visible = self._visible_levels()
+        for level, tag in LEVEL_TAGS.items():
+            hidden = visible is not None and level not in visible
+            self.log_text.tag_configure(tag, elide=hidden)
+        if self.search_var.get():
+            self._search_log()
+
+    def _search_log(self):
+        """Find lines matching the search box using the log index"""
+        query = self.search_var.get().strip()
+        if not query:
+            self.search_hits = []
+            self.log_text.tag_remove("search_hit", "1.0", tk.END)
+            self.search_label.config(text="")
+            return
+        if self.search_hits and query == self._last_query:
+            self._next_hit(1)  # Enter again moves to the next hit
+            return
+        self._last_query = query
+        started = time.perf_counter()
+        self.search_hits = self.log_index.search(query, self._visible_levels())
+        elapsed = (time.perf_counter() - started) * 1000
+        # Start from the most recent match
+        self.search_position = len(self.search_hits)
+        if self.search_hits:
+            self._next_hit(-1)
+        else:
+            self.log_text.tag_remove("search_hit", "1.0", tk.END)
+            self.search_label.config(text=f"No matches ({elapsed:.0f} ms)")
+
+    def _next_hit(self, step):
+        """Move to the next (step=1) or previous (step=-1) search hit"""
+        if not self.search_hits:
+            return
+        self.search_position = (self.search_position + step) % len(self.search_hits)
+        line = self.search_hits[self.search_position] + 1
+        self.log_text.tag_remove("search_hit", "1.0", tk.END)
+        self.log_text.tag_add("search_hit", f"{line}.0", f"{line}.end")
+        self.log_text.see(f"{line}.0")
+        self.search_label.config(
+            text=f"{self.search_position + 1} of {len(self.search_hits)}"
+        )
 
     def _copy_log(self):
         """Copy log contents to clipboard"""
+        import pyperclip  # Loaded on first use to keep startup fast
+
         log_content = self.log_text.get(1.0, tk.END)
         pyperclip.copy(log_content)
         self._append_log("Log copied to clipboard")
 
+    def _export_log(self):
+        """Export this session's archived output straight to a file"""
+        from tkinter import filedialog
+
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="Export Terminal Output",
+            defaultextension=".log",
+            initialfile=time.strftime("theta-terminal-%Y%m%d-%H%M%S.log"),
+            filetypes=[("Log files", "*.log"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+
+        def export():
+            try:
+                count = self.terminal_manager.export_logs(
+                    path, start=self.session_started
+                )
+                message = f"Exported {count} lines to {path}"
+            except Exception as e:
+                message = f"Error exporting log: {e}"
+            self._append_log(message)
+
+        # Large exports stream from disk without blocking the UI
+        threading.Thread(target=export, daemon=True).start()
+
     def _open_logs_folder(self):
         """Open the logs folder in file explorer"""
         success = self.terminal_manager.open_logs_folder()
@@ -584,17 +1130,21 @@ class MainWindow:
 
     def _open_server_settings(self):
         """Open the server settings dialog"""
-        ServerSettingsDialog(self.root, self.terminal_manager)
+        ServerSettingsDialog(self.root, self.terminal_manager, self.dispatcher)
 
-    def _auto_start_complete(self, success):
-        """Handle the auto-start completion"""
+    def _open_log_analysis(self):
+        """Open the log analysis dialog"""
+        LogAnalysisDialog(self.root, self.terminal_manager, self.dispatcher)
 
-        # Schedule UI update on the main thread
-        def update_ui():
-            if success:
-                self._append_log("Auto-start completed successfully.")
-            else:
-                self._append_log("Auto-start failed.")
-            self._update_ui_state()
+    def _open_instances(self):
+        """Open the terminal instances dialog"""
+        if self.pool:
+            InstancesDialog(self.root, self.pool)
 
-        self.root.after(0, update_ui)
+    def _auto_start_complete(self, success):
+        """Handle the auto-start completion (called from a worker thread)"""
+        if success:
+            self._append_log("Auto-start completed successfully.")
+        else:
+            self._append_log("Auto-start failed.")
+        self._update_ui_state()
@@ -0,0 +1,221 @@
+import time
+import tkinter as tk
+from array import array
+from tkinter import ttk
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class RingBuffer:
+    """Fixed-size series of floats, allocated once"""
+
+    __slots__ = ("values", "size", "head", "count")
+
+    def __init__(self, size):
+        self.values = array("d", [0.0]) * size
+        self.size = size
+        self.head = 0  # Next slot to write
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def ordered(self):
+        """Values oldest first"""
+        start = (self.head - self.count) % self.size
+        if start + self.count <= self.size:
+            return self.values[start : start + self.count]
+        return self.values[start:] + self.values[: self.head]
+
+
+class Sparkline:
+    """Canvas line redrawn in place: one coords() call per refresh"""
+
+    def __init__(self, parent, width=90, height=18, color="#1f77b4"):
+        self.width = width
+        self.height = height
+        self.canvas = tk.Canvas(
+            parent, width=width, height=height, highlightthickness=0, bg="#ffffff"
+        )
+        self.line = self.canvas.create_line(0, height, 0, height, fill=color)
+
+    def draw(self, ring, ceiling=None):
+        values = ring.ordered()
+        if len(values) < 2:
+            return
+        top = ceiling or max(values) or 1.0
+        step = (self.width - 1) / (ring.size - 1)
+        x0 = (ring.size - len(values)) * step  # Right-aligned while filling up
+        scale = (self.height - 2) / top
+        points = []
+        for i, value in enumerate(values):
+            points.append(x0 + i * step)
+            points.append(self.height - 1 - min(value, top) * scale)
+        self.canvas.coords(self.line, *points)
+
+
+def _region_label(region):
+    """Short form of a region name: "NJ" for "MDDS_NJ_HOSTS"; names that
+    don't follow the pattern are shown whole"""
+    return region.partition("_")[2].removesuffix("_HOSTS") or region
+
+
+class _InstanceRow:
+    """Widgets and history for one terminal instance"""
+
+    def __init__(self, panel, manager, row, history):
+        self.manager = manager
+        self.cpu = RingBuffer(history)
+        self.rss = RingBuffer(history)
+        self.shown = {}  # Field -> text last shown
+        self.labels = {}
+        self.sparklines = {}
+        self.widgets = []
+        for column, key in enumerate(StatusPanel.FIELDS):
+            if key in ("cpu", "rss"):
+                # Sparkline with the current value next to it
+                widget = ttk.Frame(panel)
+                sparkline = Sparkline(
+                    widget, color="#d62728" if key == "cpu" else "#2ca02c"
+                )
+                sparkline.canvas.pack(side=tk.LEFT)
+                self.sparklines[key] = sparkline
+                self.labels[key] = ttk.Label(widget, text="", width=7)
+                self.labels[key].pack(side=tk.LEFT, padx=(4, 0))
+            else:
+                widget = self.labels[key] = ttk.Label(panel, text="")
+            widget.grid(row=row, column=column, sticky=tk.W, padx=(0, 10))
+            self.widgets.append(widget)
+
+    def _show(self, key, text):
+        if self.shown.get(key) != text:
+            self.shown[key] = text
+            self.labels[key].config(text=text)
+
+    def refresh(self):
+        manager = self.manager
+        running = manager.is_running()
+        if manager.has_crashed():
+            state = "Crashed"
+        elif not running:
+            state = "Stopped"
+        else:
+            state = "Ready" if manager.ready else "Starting"
+        sampler = manager.resource_sampler
+        sample = sampler.latest() if running and sampler else None
+        cpu = sample.cpu_percent if sample else 0.0
+        rss = sample.rss_bytes / (1024 * 1024) if sample else 0.0
+        self.cpu.append(cpu)
+        self.rss.append(rss)
+
+        if running and manager.started_at:
+            uptime = format_duration(time.monotonic() - manager.started_at)
+        else:
+            uptime = "-"
+        if manager.ready_at and manager.started_at:
+            ready = f"{manager.ready_at - manager.started_at:.1f}s"
+        else:
+            ready = "-"
+        self._show("name", manager.name)
+        self._show("state", state)
+        self._show("uptime", uptime)
+        self._show("ready", ready)
+        self._show("rate", f"{manager.metrics.output_rate.rate():.0f}/s")
+        self._show("cpu", f"{cpu:.0f}%" if sample else "")
+        self._show("rss", f"{rss:.0f} MB" if sample else "")
+        self._show(
+            "regions",
+            f"{_region_label(manager.current_mdds_region)}/"
+            f"{_region_label(manager.current_fpss_region)}",
+        )
+        self._show("restarts", str(manager.metrics.restart_count()))
+        # CPU is scaled to at least one full core, RSS to its own peak
+        self.sparklines["cpu"].draw(self.cpu, ceiling=max(100.0, *self.cpu.ordered()))
+        self.sparklines["rss"].draw(self.rss)
+
+
+class StatusPanel(ttk.LabelFrame):
+    """Compact live status of every terminal instance.
+
+    Refreshes on a fixed timer (default once a second) on the Tk thread.
+    Each refresh reads a few attributes per instance, appends to
+    preallocated ring buffers and redraws each sparkline with a single
+    coords() call; labels are only reconfigured when their text changes.
+    Nothing is done while the window is minimized.
+    """
+
+    FIELDS = (
+        "name",
+        "state",
+        "uptime",
+        "ready",
+        "rate",
+        "cpu",
+        "rss",
+        "regions",
+        "restarts",
+    )
+    HEADINGS = {
+        "name": "Instance",
+        "state": "State",
+        "uptime": "Uptime",
+        "ready": "Ready in",
+        "rate": "Lines",
+        "cpu": "JVM CPU",
+        "rss": "JVM RSS",
+        "regions": "MDDS/FPSS",
+        "restarts": "Restarts",
+    }
+
+    def __init__(self, parent, managers, interval=1.0, history=60, log_callback=print):
+        super().__init__(parent, text="Status", padding=(8, 4))
+        self.interval_ms = int(interval * 1000)
+        self.history = history
+        self.log_callback = log_callback
+        self.rows = []
+        self._last_error = None  # Logged once, not on every tick
+        for column, key in enumerate(self.FIELDS):
+            ttk.Label(self, text=self.HEADINGS[key], foreground="#606060").grid(
+                row=0, column=column, sticky=tk.W, padx=(0, 10)
+            )
+        self.set_managers(managers)
+        self.after(0, self._tick)
+
+    def set_managers(self, managers):
+        """Show one row per manager (e.g. once the pool is attached)"""
+        managers = list(managers)
+        if [row.manager for row in self.rows] == managers:
+            return
+        for row in self.rows:
+            for widget in row.widgets:
+                widget.destroy()
+        self.rows = [
+            _InstanceRow(self, manager, i + 1, self.history)
+            for i, manager in enumerate(managers)
+        ]
+
+    def refresh(self):
+        for row in self.rows:
+            row.refresh()
+
+    def _tick(self):
+        try:
+            if self.winfo_viewable():
+                self.refresh()
+            self._last_error = None
+        except tk.TclError:
+            return  # Window closed
+        except Exception as e:
+            message = f"Status panel refresh failed: {e}"
+            if message != self._last_error:
+                self._last_error = message
+                self.log_callback(message)
+        self.after(self.interval_ms, self._tick)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark appending terminal output to the log view, with and without
+level highlighting
+"""
+
+import argparse
+import random
+import time
+import tkinter as tk
+
+from app.log_index import LogIndex
+from app.ui.main_window import configure_level_tags, insert_log_lines
+
+SAMPLE_LINES = [
+    "[2026-01-05 09:30:00.123] INFO: Request /v2/hist/stock/quote served in 3 ms",
+    "[2026-01-05 09:30:00.125] INFO: FPSS: received 1532 trades",
+    "[2026-01-05 09:30:00.127] WARN: MDDS response took 1204 ms",
+    "[2026-01-05 09:30:00.131] ERROR: Disconnected from FPSS server nj-a",
+    "java.net.SocketException: Connection reset",
+    "\tat java.base/sun.nio.ch.NioSocketImpl.implRead(NioSocketImpl.java:318)",
+]
+WEIGHTS = [70, 20, 5, 2, 1, 2]
+
+
+def make_lines(count, seed=1):
+    rng = random.Random(seed)
+    return rng.choices(SAMPLE_LINES, WEIGHTS, k=count)
+
+
+def run_untagged(text, lines, batch):
+    """Same work without highlighting: lines are indexed for search as usual
+    but inserted without level tags"""
+    index = LogIndex()
+    for i in range(0, len(lines), batch):
+        chunk = lines[i : i + batch]
+        for line in chunk:
+            index.add(line)
+        text.insert(tk.END, "\n".join(chunk) + "\n")
+        text.see(tk.END)
+        text.update_idletasks()
+
+
+def run_tagged(text, lines, batch):
+    """What MainWindow._append_log does: index, tag per level, insert"""
+    index = LogIndex()
+    for i in range(0, len(lines), batch):
+        insert_log_lines(text, index, "\n".join(lines[i : i + batch]))
+        text.see(tk.END)
+        text.update_idletasks()
+
+
+def measure(root, runner, lines, batch, repeats):
+    """Best of `repeats` runs, in lines per second"""
+    best = None
+    for _ in range(repeats):
+        text = tk.Text(root, wrap=tk.WORD, height=30, width=120)
+        text.pack()
+        configure_level_tags(text)
+        started = time.perf_counter()
+        runner(text, lines, batch)
+        elapsed = time.perf_counter() - started
+        text.destroy()
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=50000)
+    parser.add_argument(
+        "--batches",
+        default="1,20,200",
+        help="Comma-separated lines per insert (1 = a line per callback)",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    lines = make_lines(args.lines)
+
+    print(
+        f"{'Batch':>6} {'Untagged lines/s':>18} {'Tagged lines/s':>16} {'Overhead':>9}"
+    )
+    for batch in (int(b) for b in args.batches.split(",")):
+        plain = measure(root, run_untagged, lines, batch, args.repeats)
+        tagged = measure(root, run_tagged, lines, batch, args.repeats)
+        print(
+            f"{batch:>6} {plain:>18,.0f} {tagged:>16,.0f} "
+            f"{(plain / tagged - 1) * 100:>8.1f}%"
+        )
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
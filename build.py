@@ -79,6 +79,9 @@ def build_executable():
         cmd.append(f"--add-data={icon_dir}{separator}app/resources")
         print(f"Adding icon resources from {icon_dir}")
 
+    # psutil is imported on first use (CPU/RSS sampling, port preflight)
+    cmd.append("--hidden-import=psutil")
+
     # Add icon if available
     if icon_param:
         cmd.append(icon_param)
@@ -1,14 +1,472 @@
-import tkinter as tk
-from tkinter import messagebox
-import time
-import sys
+from app.startup_profiler import profiler
+
+import argparse
 import os
-from app.terminal_manager import TerminalManager
-from app.ui.main_window import MainWindow
-from app.ui import set_window_icon
+import threading
+import sys
+
+
+def build_arg_parser():
+    """Build the command line parser; no subcommand starts the GUI"""
+    parser = argparse.ArgumentParser(
+        prog="thetadata-terminal-manager",
+        description="ThetaData Terminal Manager",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Record operation spans and write them on exit "
+        "(.jsonl for JSON lines, otherwise Chrome trace format)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics "
+        "(or set metrics_port in config.json)",
+    )
+    parser.add_argument(
+        "--control-port",
+        type=int,
+        metavar="PORT",
+        help="Serve the control API on 127.0.0.1:PORT (token in control_api.json)",
+    )
+    parser.add_argument(
+        "--control-socket",
+        metavar="PATH",
+        help="Serve the control API on a Unix socket",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print a phase-by-phase startup timing breakdown",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    bench = subparsers.add_parser(
+        "benchmark", help="Load-test the terminal's HTTP port"
+    )
+    bench.add_argument("--host", default="127.0.0.1")
+    bench.add_argument("--port", type=int, default=25510)
+    bench.add_argument(
+        "--mix",
+        default="/v2/system/mdds/status:1",
+        help="Weighted request paths, e.g. '/v2/list/roots/stock:3,/v2/system/mdds/status:1'",
+    )
+    bench.add_argument(
+        "--concurrency",
+        default="1,4,16",
+        help="Comma-separated concurrency levels, one step each",
+    )
+    bench.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per concurrency step"
+    )
+    bench.add_argument("--timeout", type=float, default=10.0)
+    bench.add_argument("--json", help="Write the full results to this file")
+    bench.add_argument(
+        "--sample-interval", type=float, default=1.0, help="JVM sampling interval"
+    )
+    target = bench.add_mutually_exclusive_group()
+    target.add_argument("--pid", type=int, help="PID of the terminal JVM to sample")
+    target.add_argument(
+        "--launch",
+        action="store_true",
+        help="Launch the terminal with the saved credentials for the run",
+    )
+    target.add_argument(
+        "--standin",
+        action="store_true",
+        help="Benchmark a local stand-in server instead of the terminal (for CI)",
+    )
+    bench.add_argument(
+        "--standin-delay",
+        type=float,
+        default=0.0,
+        help="Mean stand-in response delay in milliseconds",
+    )
+    bench.add_argument("--ready-timeout", type=float, default=60.0)
+
+    e2e = subparsers.add_parser(
+        "e2e-benchmark",
+        help="Benchmark start, stop and the output path against a stand-in terminal",
+    )
+    e2e.add_argument(
+        "--scenarios",
+        default="startup,stop,sigterm,throughput,memory",
+        help="Comma-separated scenarios to run",
+    )
+    e2e.add_argument("--runs", type=int, default=3, help="Runs per scenario")
+    e2e.add_argument(
+        "--startup-delay",
+        type=float,
+        default=0.5,
+        help="Seconds the stand-in takes to log in",
+    )
+    e2e.add_argument(
+        "--lines", type=int, default=200000, help="Lines for the throughput run"
+    )
+    e2e.add_argument(
+        "--memory-rate", type=int, default=2000, help="Lines/s for the memory run"
+    )
+    e2e.add_argument(
+        "--memory-duration",
+        type=float,
+        default=15.0,
+        help="Seconds the memory run lasts",
+    )
+    e2e.add_argument("--ready-timeout", type=float, default=30.0)
+    e2e.add_argument("--baseline", help="Compare against this baseline file")
+    e2e.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Relative change allowed before it counts as a regression",
+    )
+    e2e.add_argument(
+        "--save-baseline", metavar="FILE", help="Save results as a baseline"
+    )
+    e2e.add_argument("--json", help="Write the full results to this file")
+
+    export = subparsers.add_parser(
+        "export-logs", help="Write archived terminal output for a time range"
+    )
+    export.add_argument("output", help="File to write")
+    export.add_argument("--instance", default="primary")
+    export.add_argument("--since", help="Start time, 'YYYY-mm-dd HH:MM[:SS]'")
+    export.add_argument("--until", help="End time, 'YYYY-mm-dd HH:MM[:SS]'")
+
+    analyze = subparsers.add_parser(
+        "analyze-logs", help="Summarize errors and disconnects in the terminal logs"
+    )
+    analyze.add_argument(
+        "--folder", help="Log folder (default ~/ThetaData/ThetaTerminal/logs)"
+    )
+    analyze.add_argument(
+        "--window", type=int, default=60, help="Minutes per reporting window"
+    )
+    analyze.add_argument("--json", help="Write the full report to this file")
+    analyze.add_argument("--no-cache", action="store_true", help="Re-read every file")
+
+    replay = subparsers.add_parser(
+        "replay", help="Replay a recorded session through the output pipeline"
+    )
+    replay.add_argument("recording", help="A .ttrec file")
+    speed = replay.add_mutually_exclusive_group()
+    speed.add_argument(
+        "--speed", type=float, default=1.0, help="Playback speed (2 = twice as fast)"
+    )
+    speed.add_argument(
+        "--max", action="store_true", help="As fast as possible (a load test)"
+    )
+    replay.add_argument("--gui", action="store_true", help="Replay into the log view")
+    replay.add_argument(
+        "--quiet", action="store_true", help="Don't print lines, only the summary"
+    )
+
+    headless = subparsers.add_parser(
+        "headless",
+        help="Run the terminal and any configured instances without the GUI",
+    )
+    headless.add_argument(
+        "--status-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between status lines (0 disables them)",
+    )
+
+    return parser
 
 
 def main():
+    args = build_arg_parser().parse_args()
+    if args.profile_startup:
+        profiler.enabled = True
+    trace_file = args.trace or os.environ.get("THETA_TRACE")
+    if trace_file:
+        enable_tracing(trace_file)
+    profiler.mark("python + argument parsing")
+
+    if args.command == "benchmark":
+        from app.benchmark import run_benchmark_command
+
+        sys.exit(run_benchmark_command(args))
+    if args.command == "e2e-benchmark":
+        from app.e2e_benchmark import run_e2e_benchmark_command
+
+        sys.exit(run_e2e_benchmark_command(args))
+    if args.command == "export-logs":
+        sys.exit(run_export_logs(args))
+    if args.command == "analyze-logs":
+        sys.exit(run_analyze_logs(args))
+    if args.command == "replay":
+        sys.exit(run_replay(args))
+
+    # One manager per user: later launches hand off to it and exit
+    instance_lock = acquire_instance_lock(args)
+    if instance_lock is None:
+        sys.exit(0 if args.command is None else 1)
+    profiler.mark("instance lock")
+
+    if args.command == "headless":
+        sys.exit(run_headless(args, instance_lock))
+
+    run_gui(args, instance_lock)
+
+
+def acquire_instance_lock(args):
+    """Take the single-instance lock, or hand this launch to the holder"""
+    import atexit
+    from app.instance_lock import InstanceLock
+
+    lock = InstanceLock()
+    if lock.acquire():
+        lock.serve()
+        atexit.register(lock.release)
+        return lock
+
+    reply = lock.send("activate", argv=sys.argv[1:])
+    if reply is None:
+        print(
+            "Another ThetaData Terminal Manager holds the lock but is not responding."
+        )
+    elif args.command is None:
+        print(f"ThetaData Terminal Manager is already running (PID {reply['pid']}).")
+    else:
+        print(
+            f"ThetaData Terminal Manager is already running (PID {reply['pid']}); "
+            "stop it before starting another."
+        )
+    return None
+
+
+def enable_tracing(path):
+    """Record spans for the whole session and export them at exit"""
+    import atexit
+    from app.tracing import tracer
+
+    tracer.enabled = True
+
+    def export():
+        tracer.export(path)
+        print(f"Trace written to {path}")
+
+    atexit.register(export)
+
+
+def start_metrics_server(port, log_callback=print):
+    """Serve the metrics of every terminal; returns None if the port is busy"""
+    from app.metrics import MetricsServer
+
+    try:
+        server = MetricsServer(port).start()
+    except OSError as e:
+        log_callback(f"Could not start metrics server on port {port}: {e}")
+        return None
+    log_callback(f"Serving metrics on http://127.0.0.1:{server.port}/metrics")
+    return server
+
+
+def start_log_retention(terminal_manager, log_callback=print):
+    """Keep the terminal's logs folder within the configured budget"""
+    from app.log_retention import LogRetention
+
+    retention = LogRetention.from_config(
+        terminal_manager.logs_folder, terminal_manager.config, log_callback
+    )
+    return retention.start() if retention else None
+
+
+def start_control_api(args, pool, failover, config, log_callback=print):
+    """Start the control API if enabled by arguments or config.json"""
+    from app.control_api import ControlAPI
+
+    api = ControlAPI.from_config(
+        pool,
+        config,
+        failover=failover,
+        socket_path=args.control_socket,
+        port=args.control_port,
+    )
+    if api is None:
+        return None
+    api.log_callback = log_callback
+    try:
+        return api.start()
+    except OSError as e:
+        log_callback(f"Could not start control API on {api.address}: {e}")
+        return None
+
+
+def run_export_logs(args):
+    """Stream archived output to a file; works while the manager runs"""
+    import time
+    from app.log_archive import LogArchive, parse_timestamp
+    from app.paths import manager_data_dir
+
+    try:
+        start = parse_timestamp(args.since) if args.since else None
+        end = parse_timestamp(args.until) if args.until else None
+    except ValueError as e:
+        print(e)
+        return 2
+    archive = LogArchive(os.path.join(manager_data_dir(), "logs", args.instance))
+    if not archive.segments():
+        print(f"No archived output for instance '{args.instance}'.")
+        return 1
+    started = time.perf_counter()
+    count = archive.export_range(args.output, start, end)
+    print(
+        f"Exported {count} lines to {args.output} "
+        f"in {time.perf_counter() - started:.2f}s."
+    )
+    return 0
+
+
+def run_analyze_logs(args):
+    """Print a summary of the terminal's log files"""
+    import json
+    from app.log_analyzer import LogAnalyzer
+
+    folder = args.folder or os.path.join(
+        os.path.expanduser("~"), "ThetaData", "ThetaTerminal", "logs"
+    )
+    analyzer = LogAnalyzer(folder, window_minutes=args.window)
+    if not analyzer.log_files():
+        print(f"No log files in {folder}.")
+        return 1
+    report = analyzer.run(use_cache=not args.no_cache)
+    print(report.format())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+    return 0
+
+
+def run_replay(args):
+    """Feed a recording through a terminal manager that has no terminal"""
+    import time
+    from app.session_recorder import recording_start_time
+    from app.terminal_manager import TerminalManager
+
+    try:
+        started = recording_start_time(args.recording)
+    except (OSError, ValueError) as e:
+        print(e)
+        return 1
+    speed = None if args.max else args.speed
+    manager = TerminalManager(name="replay", config_file=None, load=False)
+    print(
+        f"Replaying session recorded {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))} "
+        f"at {'max' if speed is None else f'{speed:g}x'} speed"
+    )
+
+    def summary(lines, elapsed):
+        rate = lines / elapsed if elapsed else 0.0
+        return f"Replayed {lines} lines in {elapsed:.2f}s ({rate:,.0f} lines/s)."
+
+    if not args.gui:
+        manager.set_log_callback((lambda line: None) if args.quiet else print)
+        print(summary(*manager.replay_recording(args.recording, speed)))
+        return 0
+
+    import tkinter as tk
+    from app.ui.main_window import MainWindow
+
+    root = tk.Tk()
+    root.title(
+        f"ThetaData Terminal Manager - Replay of {os.path.basename(args.recording)}"
+    )
+    main_window = MainWindow(root, manager)
+    stop_event = threading.Event()
+
+    def run():
+        result = manager.replay_recording(args.recording, speed, stop_event)
+        main_window._append_log(summary(*result))
+
+    threading.Thread(target=run, daemon=True).start()
+    root.mainloop()
+    stop_event.set()
+    return 0
+
+
+def run_headless(args, instance_lock):
+    """Run every configured terminal without a GUI until interrupted"""
+    import signal
+    from app.standby import FailoverManager
+    from app.terminal_manager import TerminalManager
+    from app.terminal_pool import TerminalPool
+
+    terminal_manager = TerminalManager()
+    terminal_manager.set_log_callback(lambda line: print(f"[primary] {line}"))
+    pool = TerminalPool.from_config(
+        terminal_manager.config, primary=terminal_manager, log_callback=print
+    )
+    pool.recover_orphans(terminal_manager.config.get("orphan_policy", "adopt"))
+    terminal_manager.start_config_watcher()
+    failover = FailoverManager.from_config(
+        pool, terminal_manager.config, log_callback=print
+    )
+    metrics_port = args.metrics_port or terminal_manager.config.get("metrics_port")
+    metrics_server = start_metrics_server(metrics_port) if metrics_port else None
+    control_api = start_control_api(args, pool, failover, terminal_manager.config)
+    log_retention = start_log_retention(terminal_manager)
+
+    stop_event = threading.Event()
+
+    def activate(message):
+        print("Another launch was redirected to this instance.")
+        return {}
+
+    instance_lock.on_command("activate", activate)
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    pool.start_all()
+    if failover:
+        failover.start()
+    try:
+        interval = args.status_interval if args.status_interval > 0 else None
+        while not stop_event.wait(interval):
+            status = pool.status()
+            details = ", ".join(
+                f"{i['name']}={'crashed' if i['crashed'] else 'up' if i['running'] else 'down'}"
+                for i in status["instances"]
+            )
+            print(
+                f"Status: {status['running']}/{status['total']} running, "
+                f"{status['restarts']} restarts ({details})"
+            )
+            if failover:
+                fo = failover.status()
+                print(
+                    f"Failover: active={fo['active']}, standby ready={fo['standby_ready']}, "
+                    f"failovers={fo['failovers']}, last={fo['last_failover_ms']} ms"
+                )
+    finally:
+        print("Stopping terminals...")
+        if failover:
+            failover.stop()
+        pool.stop_supervisor()
+        pool.stop_all()
+        if metrics_server:
+            metrics_server.stop()
+        if control_api:
+            control_api.stop()
+        if log_retention:
+            log_retention.stop()
+    return 0
+
+
+def run_gui(args, instance_lock):
+    # Only what the first frame needs is imported and done before it paints
+    import tkinter as tk
+    from tkinter import messagebox
+
+    from app.ui import set_window_icon
+    from app.ui.main_window import MainWindow
+
+    profiler.mark("import tkinter + UI")
+
     root = tk.Tk()
     root.title("ThetaData Terminal Manager")
 
@@ -17,16 +475,89 @@ def main():
         print("Window icon set successfully")
     else:
         print("Could not set window icon")
+    profiler.mark("create Tk root")
 
-    # Create the terminal manager
-    terminal_manager = TerminalManager()
+    # Create the main window; the terminal manager and the feature modules it
+    # imports are loaded after the first paint
+    main_window = MainWindow(root)
+    profiler.mark("build main window")
+
+    def activate(message):
+        # A second launch: bring this window to the front instead
+        main_window.dispatcher.post(main_window.bring_to_front)
+        return {}
+
+    instance_lock.on_command("activate", activate)
+
+    # Paint the first frame before any non-essential imports or file I/O
+    root.update()
+    profiler.mark("first paint")
+
+    pool = None
+    failover = None
+    control_api = None
+
+    def deferred_startup():
+        nonlocal pool, failover, control_api
+        from app.standby import FailoverManager
+        from app.terminal_manager import TerminalManager
+        from app.terminal_pool import TerminalPool
+
+        profiler.mark("import terminal manager")
+        terminal_manager = TerminalManager(load=False)
+        main_window.attach_manager(terminal_manager)
+        terminal_manager.load_settings()
+        profiler.mark("read config.json + properties")
+
+        # Additional terminal instances configured in config.json, if any
+        pool = TerminalPool.from_config(
+            terminal_manager.config,
+            primary=terminal_manager,
+            log_callback=main_window._append_log,
+        )
+        pool.start_supervisor()
 
-    # Create the main window
-    main_window = MainWindow(root, terminal_manager)
+        # Optional warm standby for fast failover of the primary terminal
+        failover = FailoverManager.from_config(pool, terminal_manager.config)
+        main_window.attach_pool(pool)
+
+        # Adopt or reap terminals that outlived a crashed manager (no other
+        # manager can own them: we hold the instance lock). Reaping can take
+        # seconds, so it runs off the UI thread.
+        def recover_orphans():
+            pool.recover_orphans(terminal_manager.config.get("orphan_policy", "adopt"))
+            main_window._update_ui_state()
+            if failover:
+                failover.log_callback = main_window._append_log
+                failover.start()
+
+        threading.Thread(target=recover_orphans, daemon=True).start()
+
+        # Pick up config changes made outside the manager
+        terminal_manager.start_config_watcher()
+
+        metrics_port = args.metrics_port or terminal_manager.config.get("metrics_port")
+        if metrics_port:
+            start_metrics_server(metrics_port, main_window._append_log)
+
+        # Old terminal logs are compressed and expired in the background
+        start_log_retention(terminal_manager, main_window._append_log)
+
+        # Scripting access; attached after the pool so every instance is tapped
+        control_api = start_control_api(
+            args, pool, failover, terminal_manager.config, main_window._append_log
+        )
+        profiler.mark("pool, standby, config watcher")
+        profiler.report()
+
+        # Populate credentials and check for the JAR (may prompt)
+        main_window.finish_startup()
+
+    root.after(0, deferred_startup)
 
     # Set up proper exit handling
     def on_closing():
-        if terminal_manager.is_running():
+        if pool and pool.any_running():
             if messagebox.askyesno(
                 "Confirm Exit",
                 "Terminal is still running. Do you want to stop it and exit?",
@@ -44,13 +575,16 @@ def main():
                     try:
                         # Set a shorter timeout for exit scenarios
                         import threading
-                        import time
 
                         stop_success = False
 
                         def stop_terminal():
                             nonlocal stop_success
-                            stop_success = terminal_manager.stop_terminal()
+                            if failover:
+                                failover.stop()
+                            pool.stop_supervisor()
+                            pool.stop_all()
+                            stop_success = not pool.any_running()
 
                         stop_thread = threading.Thread(
                             target=stop_terminal, daemon=True
@@ -64,14 +598,15 @@ def main():
                             print("Warning: Terminal may not have stopped cleanly")
 
                         # Force cleanup and exit
-                        terminal_manager.cleanup()
+                        for instance in pool.instances.values():
+                            instance.cleanup()
 
                     except Exception as e:
                         print(f"Error during shutdown: {e}")
 
                     finally:
                         # Schedule window destruction on main thread
-                        root.after(0, force_exit)
+                        main_window.dispatcher.post(force_exit)
 
                 def force_exit():
                     # Additional cleanup for Windows to help release file handles
@@ -105,6 +640,15 @@ def main():
     # Start the UI loop
     root.mainloop()
 
+    # Remove the control socket so the next launch starts cleanly
+    if control_api:
+        control_api.stop()
+
 
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # Worker processes of the log analyzer re-run the executable
+        import multiprocessing
+
+        multiprocessing.freeze_support()
     main()